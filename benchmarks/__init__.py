@@ -0,0 +1,6 @@
+"""
+Offline benchmark harness for cockroachdb-mcp-client.
+
+Runs the CLI against a local mock MCP server and a mock LLM provider so client
+performance can be measured and compared run over run without any network.
+"""
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark the context codec against the pure-Python parsers.
+
+    python -m benchmarks.codec --size 1000000 --repeat 5
+"""
+
+import json
+import time
+
+import typer
+import yaml
+
+from cockroachdb_mcp_client import codec
+
+app = typer.Typer(add_completion=False)
+
+
+def make_context(size: int) -> dict:
+    """A context of roughly ``size`` bytes of JSON: a prompt plus many examples."""
+    examples = []
+    while len(examples) * 200 < size:
+        i = len(examples)
+        examples.append(
+            {
+                "input": f"Summarize ticket {i}: " + "disk latency spike " * 4,
+                "output": f"Ticket {i} reports slow disks.",
+                "tags": ["ops", i],
+            }
+        )
+    return {
+        "context_name": "large",
+        "context_version": "1.0.0",
+        "body": {
+            "model": "mock",
+            "system": "You summarize tickets.",
+            "examples": examples,
+        },
+    }
+
+
+def best_of(repeat: int, fn) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run_codec_benchmarks(size: int, repeat: int) -> dict:
+    context = make_context(size)
+    as_json = json.dumps(context).encode()
+    as_yaml = yaml.dump(context, sort_keys=False)
+    cases = {
+        "json_load": (
+            lambda: json.loads(as_json.decode()),
+            lambda: codec.load_document(as_json),
+        ),
+        "json_dump": (
+            lambda: json.dumps(context).encode(),
+            lambda: codec.encode_json(context),
+        ),
+        "yaml_load": (
+            lambda: yaml.safe_load(as_yaml),
+            lambda: codec.load_document(as_yaml),
+        ),
+        "yaml_dump": (
+            lambda: yaml.dump(context, sort_keys=False),
+            lambda: codec.dump_yaml(context),
+        ),
+    }
+    results = []
+    for name, (baseline, fast) in cases.items():
+        before = best_of(repeat, baseline)
+        after = best_of(repeat, fast)
+        results.append(
+            {
+                "case": name,
+                "baseline_seconds": round(before, 5),
+                "codec_seconds": round(after, 5),
+                "speedup": round(before / after, 2) if after else None,
+            }
+        )
+    return {
+        "backends": codec.backends(),
+        "parameters": {
+            "json_bytes": len(as_json),
+            "yaml_bytes": len(as_yaml),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+@app.command()
+def main(
+    size: int = typer.Option(1_000_000, help="Approximate JSON size of the context"),
+    repeat: int = typer.Option(5, help="Runs per case; the fastest is reported"),
+):
+    typer.echo(json.dumps(run_codec_benchmarks(size, repeat), indent=2))
+
+
+if __name__ == "__main__":
+    app()
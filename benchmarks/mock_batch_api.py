@@ -0,0 +1,232 @@
+import email.parser
+import email.policy
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _reply(request: dict) -> str:
+    content = request["messages"][-1]["content"]
+    return str(content).upper()
+
+
+class MockBatchAPI(ThreadingHTTPServer):
+    """
+    In-memory stand-in for the OpenAI Batch and Anthropic Message Batches APIs.
+
+    Point the SDKs at it with ``OPENAI_BASE_URL=<url>/v1`` and
+    ``ANTHROPIC_BASE_URL=<url>``. Every job reports as in progress for
+    ``polls_until_done`` status requests and then completes, answering each
+    request with its last message upper-cased; inputs listed in ``failing``
+    get an error result instead.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, polls_until_done: int = 1, failing=()):
+        super().__init__(("127.0.0.1", 0), MockBatchHandler)
+        self.polls_until_done = polls_until_done
+        self.failing = set(failing)
+        self.files = {}
+        self.jobs = {}
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> "MockBatchAPI":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def submit(self, kind: str, requests: list) -> dict:
+        job = {"id": f"batch_{uuid.uuid4().hex[:12]}", "kind": kind, "polls": 0}
+        job["requests"] = requests
+        with self.lock:
+            self.jobs[job["id"]] = job
+        return job
+
+    def poll(self, job_id: str) -> dict | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job:
+                job["polls"] += 1
+            return job
+
+    def done(self, job: dict) -> bool:
+        return job["polls"] > self.polls_until_done
+
+    def results(self, job: dict):
+        """Yield ``(custom_id, request, error)`` for each request of a job."""
+        for custom_id, request in job["requests"]:
+            content = request["messages"][-1]["content"]
+            error = "Injected failure" if content in self.failing else None
+            yield custom_id, request, error
+
+
+class MockBatchHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload=None, text: str = None):
+        if text is not None:
+            body = text.encode()
+            content_type = "application/binary"
+        else:
+            body = json.dumps(payload).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def do_POST(self):
+        path = self.path.split("?")[0]
+        with self.server.lock:
+            self.server.requests.append(("POST", path))
+        if path == "/v1/files":
+            return self._upload()
+        data = json.loads(self._body() or b"{}")
+        if path == "/v1/batches":
+            lines = self.server.files[data["input_file_id"]].splitlines()
+            requests = [
+                (line["custom_id"], line["body"]) for line in map(json.loads, lines)
+            ]
+            job = self.server.submit("openai", requests)
+            return self._send(200, self._openai_job(job))
+        if path == "/v1/messages/batches":
+            requests = [(r["custom_id"], r["params"]) for r in data["requests"]]
+            job = self.server.submit("anthropic", requests)
+            return self._send(200, self._anthropic_job(job))
+        self._send(404, {"error": {"message": "Not found"}})
+
+    def _upload(self):
+        raw = self._body()
+        header = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode()
+        parser = email.parser.BytesParser(policy=email.policy.default)
+        message = parser.parsebytes(header + raw)
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                file_id = f"file-{uuid.uuid4().hex[:12]}"
+                self.server.files[file_id] = part.get_payload(decode=True).decode()
+                return self._send(200, {"id": file_id, "object": "file"})
+        self._send(400, {"error": {"message": "No file"}})
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        with self.server.lock:
+            self.server.requests.append(("GET", path))
+        parts = path.strip("/").split("/")
+        if parts[:2] == ["v1", "batches"] and len(parts) == 3:
+            job = self.server.poll(parts[2])
+            if job:
+                return self._send(200, self._openai_job(job))
+        if parts[:2] == ["v1", "files"] and parts[-1] == "content":
+            content = self.server.files.get(parts[2])
+            if content is not None:
+                return self._send(200, text=content)
+        if parts[:3] == ["v1", "messages", "batches"] and len(parts) == 4:
+            job = self.server.poll(parts[3])
+            if job:
+                return self._send(200, self._anthropic_job(job))
+        if parts[:3] == ["v1", "messages", "batches"] and parts[-1] == "results":
+            job = self.server.jobs.get(parts[3])
+            if job:
+                return self._send(200, text=self._anthropic_results(job))
+        self._send(404, {"error": {"message": "Not found"}})
+
+    def _openai_job(self, job: dict) -> dict:
+        payload = {
+            "id": job["id"],
+            "object": "batch",
+            "endpoint": "/v1/chat/completions",
+            "status": "in_progress",
+            "request_counts": {
+                "total": len(job["requests"]),
+                "completed": 0,
+                "failed": 0,
+            },
+        }
+        if not self.server.done(job):
+            return payload
+        output, errors = [], []
+        for custom_id, request, error in self.server.results(job):
+            if error:
+                body = {"error": {"message": error}}
+                record = {"custom_id": custom_id, "response": {"status_code": 400}}
+                record["response"]["body"] = body
+                errors.append(json.dumps(record))
+                continue
+            message = {"role": "assistant", "content": _reply(request)}
+            body = {
+                "choices": [{"index": 0, "message": message}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2},
+            }
+            record = {"custom_id": custom_id, "response": {"status_code": 200}}
+            record["response"]["body"] = body
+            output.append(json.dumps(record))
+        counts = payload["request_counts"]
+        counts["completed"], counts["failed"] = len(output), len(errors)
+        payload["status"] = "completed"
+        for key, lines in (("output_file_id", output), ("error_file_id", errors)):
+            if lines:
+                file_id = f"file-{job['id']}-{key[:3]}"
+                self.server.files[file_id] = "\n".join(lines) + "\n"
+                payload[key] = file_id
+        return payload
+
+    def _anthropic_job(self, job: dict) -> dict:
+        done = self.server.done(job)
+        payload = {
+            "id": job["id"],
+            "type": "message_batch",
+            "processing_status": "ended" if done else "in_progress",
+            "request_counts": {
+                "processing": 0 if done else len(job["requests"]),
+                "succeeded": 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "results_url": None,
+        }
+        if done:
+            results = list(self.server.results(job))
+            errored = sum(1 for _, _, error in results if error)
+            payload["request_counts"]["errored"] = errored
+            payload["request_counts"]["succeeded"] = len(results) - errored
+            payload["results_url"] = (
+                f"{self.server.url}/v1/messages/batches/{job['id']}/results"
+            )
+        return payload
+
+    def _anthropic_results(self, job: dict) -> str:
+        lines = []
+        for custom_id, request, error in self.server.results(job):
+            if error:
+                result = {
+                    "type": "errored",
+                    "error": {"type": "error", "error": {"message": error}},
+                }
+            else:
+                result = {
+                    "type": "succeeded",
+                    "message": {
+                        "content": [{"type": "text", "text": _reply(request)}],
+                        "usage": {"input_tokens": 10, "output_tokens": 2},
+                    },
+                }
+            lines.append(json.dumps({"custom_id": custom_id, "result": result}))
+        return "\n".join(lines) + "\n"
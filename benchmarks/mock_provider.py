@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from cockroachdb_mcp_client import metrics
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+
+
+class MockProvider(BaseLLMProvider):
+    """
+    Fake LLM provider with a fixed per-call latency plus a token generation rate.
+
+    Every call "generates" ``output_tokens`` tokens at ``tokens_per_second``
+    after ``latency`` seconds, and reports usage like the real providers do.
+    """
+
+    latency = 0.05
+    tokens_per_second = 0.0
+    output_tokens = 50
+
+    def _duration(self) -> float:
+        generation = (
+            self.output_tokens / self.tokens_per_second
+            if self.tokens_per_second
+            else 0.0
+        )
+        return self.latency + generation
+
+    def _respond(self, input_text: str) -> str:
+        metrics.report(
+            tokens_in=len(str(input_text)) // 4, tokens_out=self.output_tokens
+        )
+        return f"echo: {input_text}"
+
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        time.sleep(self._duration())
+        return self._respond(input_text)
+
+    async def arun(self, context: dict, input_text: str, stream: bool = False) -> str:
+        await asyncio.sleep(self._duration())
+        return self._respond(input_text)
+
+
+def register(
+    name: str = "mock",
+    latency: float = 0.05,
+    tokens_per_second: float = 0.0,
+    output_tokens: int = 50,
+) -> type:
+    """Register a configured ``MockProvider`` subclass in ``PROVIDERS``."""
+    provider = type(
+        "MockProvider",
+        (MockProvider,),
+        {
+            "latency": latency,
+            "tokens_per_second": tokens_per_second,
+            "output_tokens": output_tokens,
+        },
+    )
+    PROVIDERS[name] = provider
+    return provider
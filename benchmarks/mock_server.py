@@ -0,0 +1,189 @@
+import hashlib
+import json
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+
+class MockMCPServer(ThreadingHTTPServer):
+    """
+    In-memory stand-in for the MCP server's ``/contexts`` API.
+
+    ``latency`` is added to every response, ``payload_size`` pads each
+    context's description to roughly that many bytes, and ``count`` contexts
+    are created up front. With ``paginate`` the index honors ``limit`` and
+    ``cursor`` query parameters and returns ``next_cursor``; with ``etags``
+    single-context responses carry an ETag and honor ``If-None-Match``; with
+    ``batch`` the server advertises ``POST /contexts/batch/{get,delete}``.
+    Requests and client connections are recorded so tests and benchmarks can
+    check how the client uses the server.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        payload_size: int = 0,
+        count: int = 0,
+        paginate: bool = True,
+        etags: bool = True,
+        batch: bool = False,
+    ):
+        super().__init__(("127.0.0.1", 0), MockMCPHandler)
+        self.latency = latency
+        self.paginate = paginate
+        self.etags = etags
+        self.batch = batch
+        #: Statuses returned, one per request, before requests are served.
+        self.faults = []
+        self.payload_size = payload_size
+        self.contexts = {}
+        self.requests = []
+        self.connections = set()
+        self.lock = threading.Lock()
+        for i in range(count):
+            self.add_context(f"context-{i}")
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def add_context(self, name: str, **body) -> str:
+        context_id = str(uuid.uuid4())
+        if not body:
+            body = {"description": f"{name} context".ljust(self.payload_size, ".")}
+        with self.lock:
+            self.contexts[context_id] = {
+                "id": context_id,
+                "context_name": name,
+                "context_version": "1.0.0",
+                "body": body,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }
+        return context_id
+
+    def replica(self, latency: float = None) -> "MockMCPServer":
+        """Another server over the same contexts, like a replica of one cluster."""
+        other = MockMCPServer(
+            latency=self.latency if latency is None else latency,
+            paginate=self.paginate,
+            etags=self.etags,
+            batch=self.batch,
+        )
+        other.contexts = self.contexts
+        other.lock = self.lock
+        return other
+
+    def start(self) -> "MockMCPServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class MockMCPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _record(self) -> bool:
+        """Log the request; returns False once an injected fault was sent."""
+        with self.server.lock:
+            self.server.requests.append((self.command, self.path.split("?")[0]))
+            self.server.connections.add(self.client_address)
+            fault = self.server.faults.pop(0) if self.server.faults else None
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if fault is not None:
+            length = int(self.headers.get("Content-Length", 0))
+            self.rfile.read(length)
+            self._send(fault, {"detail": "Injected fault"})
+            return False
+        return True
+
+    def _send(self, status: int, payload=None, etag: str = None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if not self._record():
+            return
+        path, _, query = self.path.partition("?")
+        path = path.rstrip("/")
+        params = dict(parse_qsl(query))
+        if path == "/capabilities" and self.server.batch:
+            return self._send(200, {"features": ["batch_get", "batch_delete"]})
+        if path == "/contexts":
+            with self.server.lock:
+                refs = [
+                    {k: c[k] for k in ("id", "context_name", "created_at")}
+                    for c in self.server.contexts.values()
+                ]
+            if not self.server.paginate or "limit" not in params:
+                return self._send(200, {"contexts": refs})
+            start = int(params.get("cursor", 0))
+            end = start + int(params["limit"])
+            page = {"contexts": refs[start:end]}
+            if end < len(refs):
+                page["next_cursor"] = str(end)
+            return self._send(200, page)
+        context = self.server.contexts.get(path.rsplit("/", 1)[-1])
+        if path.startswith("/contexts/") and context:
+            if not self.server.etags:
+                return self._send(200, context)
+            digest = hashlib.sha256(json.dumps(context, sort_keys=True).encode())
+            etag = f'"{digest.hexdigest()[:16]}"'
+            if self.headers.get("If-None-Match") == etag:
+                return self._send(304, etag=etag)
+            return self._send(200, context, etag=etag)
+        self._send(404, {"detail": "Not found"})
+
+    def do_POST(self):
+        if not self._record():
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        data = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0].rstrip("/")
+        if path.startswith("/contexts/batch/") and self.server.batch:
+            return self._batch(path.rsplit("/", 1)[-1], data.get("ids", []))
+        context_id = self.server.add_context(
+            data.get("context_name", "unnamed"), **data.get("body", {})
+        )
+        self._send(200, self.server.contexts[context_id])
+
+    def _batch(self, action: str, ids: list):
+        with self.server.lock:
+            found = [i for i in ids if i in self.server.contexts]
+            missing = [i for i in ids if i not in self.server.contexts]
+            if action == "get":
+                payload = {"contexts": [self.server.contexts[i] for i in found]}
+            elif action == "delete":
+                for i in found:
+                    del self.server.contexts[i]
+                payload = {"deleted": found}
+            else:
+                return self._send(404, {"detail": "Not found"})
+        self._send(200, {**payload, "missing": missing})
+
+    def do_DELETE(self):
+        if not self._record():
+            return
+        context_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+        with self.server.lock:
+            removed = self.server.contexts.pop(context_id, None)
+        if removed is None:
+            return self._send(404, {"detail": "Not found"})
+        self._send(200, {"deleted": context_id})
@@ -0,0 +1,235 @@
+"""
+Run the offline benchmark scenarios and write machine-readable results.
+
+    python -m benchmarks.run --contexts 2000 --inputs 1000 --output bench.json
+    python -m benchmarks.run --baseline bench.json --max-regression 0.25
+"""
+
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import typer
+from typer.testing import CliRunner
+
+from benchmarks.mock_provider import register
+from benchmarks.mock_server import MockMCPServer
+from cockroachdb_mcp_client import __version__
+from cockroachdb_mcp_client import client as client_module
+from cockroachdb_mcp_client.cli import app as cli_app
+
+app = typer.Typer(add_completion=False)
+
+
+def invoke(args: list) -> tuple:
+    # Each scenario starts with a fresh connection pool, like a new CLI process.
+    client_module._clients.clear()
+    started = time.perf_counter()
+    result = CliRunner().invoke(cli_app, args)
+    return result, time.perf_counter() - started
+
+
+def scenario(name: str, server: MockMCPServer, items: int, args: list) -> dict:
+    server.requests.clear()
+    server.connections.clear()
+    result, seconds = invoke(args)
+    if result.exit_code != 0:
+        typer.echo(result.output, err=True)
+    return {
+        "scenario": name,
+        "exit_code": result.exit_code,
+        "seconds": round(seconds, 4),
+        "items": items,
+        "items_per_second": round(items / seconds, 2) if seconds else None,
+        "server_requests": len(server.requests),
+        "server_connections": len(server.connections),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    contexts: int,
+    server_latency: float,
+    payload_size: int,
+    inputs: int,
+    llm_latency: float,
+    tokens_per_second: float,
+    concurrency: int,
+) -> dict:
+    register("mock", latency=llm_latency, tokens_per_second=tokens_per_second)
+    server = MockMCPServer(
+        latency=server_latency, payload_size=payload_size, count=contexts
+    ).start()
+    previous_url = os.environ.get("MCP_SERVER_URL")
+    os.environ["MCP_SERVER_URL"] = server.url
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp = Path(tmp)
+            results.append(
+                scenario(
+                    "list", server, contexts, ["list", "contexts", "--output", "json"]
+                )
+            )
+            export_dir = tmp / "export"
+            results.append(
+                scenario(
+                    "export_all",
+                    server,
+                    contexts,
+                    [
+                        "export",
+                        "all",
+                        "-o",
+                        str(export_dir),
+                        "--output",
+                        "json",
+                        "--workers",
+                        str(concurrency),
+                    ],
+                )
+            )
+
+            bulk = tmp / "contexts.jsonl"
+            with bulk.open("w") as f:
+                for i in range(contexts):
+                    body = {"description": f"bulk {i}".ljust(payload_size, ".")}
+                    f.write(json.dumps({"context_name": f"bulk-{i}", "body": body}))
+                    f.write("\n")
+            results.append(
+                scenario(
+                    "bulk_create",
+                    server,
+                    contexts,
+                    ["create", "contexts", str(bulk), "-c", str(concurrency)],
+                )
+            )
+
+            context_file = tmp / "context.json"
+            context_file.write_text(json.dumps({"body": {"model": "mock"}}))
+            input_file = tmp / "inputs.txt"
+            input_file.write_text("\n".join(f"prompt {i}" for i in range(inputs)))
+            results.append(
+                scenario(
+                    "simulate",
+                    server,
+                    inputs,
+                    [
+                        "simulate",
+                        "context",
+                        "-p",
+                        "mock",
+                        "-f",
+                        str(context_file),
+                        "-i",
+                        str(input_file),
+                        "-o",
+                        str(tmp / "results.jsonl"),
+                        "--output",
+                        "jsonl",
+                        "-c",
+                        str(concurrency),
+                    ],
+                )
+            )
+    finally:
+        server.stop()
+        if previous_url is None:
+            os.environ.pop("MCP_SERVER_URL", None)
+        else:
+            os.environ["MCP_SERVER_URL"] = previous_url
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "version": __version__,
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "parameters": {
+            "contexts": contexts,
+            "server_latency": server_latency,
+            "payload_size": payload_size,
+            "inputs": inputs,
+            "llm_latency": llm_latency,
+            "tokens_per_second": tokens_per_second,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> list:
+    """Return a message for each scenario slower than baseline by more than allowed."""
+    before = {r["scenario"]: r for r in baseline.get("results", [])}
+    regressions = []
+    for result in report["results"]:
+        old = before.get(result["scenario"])
+        if not old or not old["seconds"]:
+            continue
+        change = result["seconds"] / old["seconds"] - 1
+        result["change_vs_baseline"] = round(change, 4)
+        if change > max_regression:
+            regressions.append(
+                f"{result['scenario']}: {old['seconds']}s -> {result['seconds']}s "
+                f"({change:+.0%})"
+            )
+    return regressions
+
+
+@app.command()
+def main(
+    contexts: int = typer.Option(500, help="Contexts on the mock server"),
+    server_latency: float = typer.Option(0.002, help="Mock server latency (s)"),
+    payload_size: int = typer.Option(2048, help="Approximate bytes per context"),
+    inputs: int = typer.Option(500, help="Inputs for the simulate scenario"),
+    llm_latency: float = typer.Option(0.05, help="Mock provider latency (s)"),
+    tokens_per_second: float = typer.Option(0.0, help="Mock generation rate"),
+    concurrency: int = typer.Option(16, help="Workers for bulk scenarios"),
+    output: Path = typer.Option(None, help="Write the JSON report here"),
+    baseline: Path = typer.Option(None, help="Previous report to compare against"),
+    max_regression: float = typer.Option(
+        0.25, help="Allowed slowdown vs baseline before failing (0.25 = 25%)"
+    ),
+):
+    report = run_benchmarks(
+        contexts,
+        server_latency,
+        payload_size,
+        inputs,
+        llm_latency,
+        tokens_per_second,
+        concurrency,
+    )
+    regressions = (
+        compare(report, json.loads(baseline.read_text()), max_regression)
+        if baseline
+        else []
+    )
+
+    text = json.dumps(report, indent=2)
+    if output:
+        output.write_text(text)
+    typer.echo(text)
+    for message in regressions:
+        typer.echo(f"Regression: {message}", err=True)
+    if regressions or any(r["exit_code"] for r in report["results"]):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
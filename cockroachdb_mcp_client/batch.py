@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchResult:
+    index: int
+    input: Any
+    output: Optional[str] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+async def run_batch(
+    llm,
+    context: dict,
+    inputs: Iterable[tuple[int, Any]],
+    concurrency: int = 1,
+    stream: bool = False,
+    stop: Callable[[], bool] = None,
+    stream_out: TextIO = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Run every ``(index, input)`` pair through ``llm.arun`` and yield results in
+    input order.
+
+    Up to ``concurrency`` provider calls are kept in flight on the running event
+    loop. A failing input yields a result carrying the exception instead of
+    aborting the batch. Providers without a native ``arun`` fall back to threads
+    from the loop's default executor, which is sized to ``concurrency``.
+
+    Streamed text is written to ``stream_out`` (stdout by default) and each
+    result carries the assembled text. Once ``stop()`` returns true no further
+    inputs are pulled, and queued calls that have not started are dropped
+    without a result.
+    """
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=concurrency))
+    semaphore = asyncio.Semaphore(concurrency)
+    kwargs = {"stream": stream}
+    if stream and stream_out is not None:
+        kwargs["out"] = stream_out
+
+    async def call(index: int, input_text: Any) -> Optional[BatchResult]:
+        async with semaphore:
+            if stop is not None and stop():
+                return None
+            try:
+                output = await llm.arun(context, input_text, **kwargs)
+                return BatchResult(index, input_text, output)
+            except Exception as e:
+                return BatchResult(index, input_text, error=e)
+
+    # Allow a few queued calls per slot so a slow head-of-line input does not
+    # leave the other slots idle while we wait to emit it. A serial batch pulls
+    # the next input only after emitting the previous result.
+    window = 1 if concurrency == 1 else concurrency * 4
+    pending = deque()
+    inputs = iter(inputs)
+    try:
+        while stop is None or not stop():
+            item = next(inputs, None)
+            if item is None:
+                break
+            pending.append(asyncio.ensure_future(call(*item)))
+            if len(pending) >= window:
+                result = await pending.popleft()
+                if result is not None:
+                    yield result
+        while pending:
+            result = await pending.popleft()
+            if result is not None:
+                yield result
+    finally:
+        for task in pending:
+            task.cancel()
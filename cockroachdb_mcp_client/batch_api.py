@@ -0,0 +1,121 @@
+import json
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+from cockroachdb_mcp_client.utils import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 10.0
+MAX_POLL_INTERVAL = 300.0
+
+
+@dataclass
+class BatchStatus:
+    """Progress of one provider batch job."""
+
+    done: bool
+    state: str
+    completed: int = 0
+    failed: int = 0
+    total: int = 0
+
+
+@dataclass
+class BatchItem:
+    """The outcome of one request in a finished batch job."""
+
+    custom_id: str
+    output: Optional[str] = None
+    error: Optional[str] = None
+
+
+def custom_id(index: int) -> str:
+    return f"input-{index}"
+
+
+def index_of(custom_id: str) -> int:
+    return int(custom_id.rsplit("-", 1)[-1])
+
+
+def submit(
+    llm,
+    context: dict,
+    items: Iterable[tuple[int, str]],
+    on_submit: Callable[[list[str]], None] = None,
+) -> list[str]:
+    """
+    Pack ``(index, input)`` pairs into as few provider batch jobs as the
+    provider allows and return their job IDs. Each request's custom ID
+    carries its input index, so results can be put back in order from the
+    job IDs alone.
+
+    ``on_submit`` is called with the IDs submitted so far after every job,
+    so they can be saved before a later submission fails.
+    """
+    jobs = []
+    chunk = []
+
+    def flush():
+        jobs.append(llm.submit_batch(chunk))
+        if on_submit:
+            on_submit(list(jobs))
+
+    for index, input_text in items:
+        chunk.append((custom_id(index), llm.build_request(context, input_text)))
+        if len(chunk) >= llm.max_batch_requests:
+            flush()
+            chunk = []
+    if chunk:
+        flush()
+    return jobs
+
+
+def wait(
+    llm,
+    job_ids: list[str],
+    interval: float = POLL_INTERVAL,
+    max_interval: float = MAX_POLL_INTERVAL,
+    on_poll: Callable[[str, BatchStatus], None] = None,
+) -> dict[str, BatchStatus]:
+    """
+    Poll every job until it has finished, doubling the delay between polls
+    up to ``max_interval``. ``on_poll`` is called with each job's status.
+    """
+    statuses = {}
+    pending = list(job_ids)
+    delay = interval
+    while True:
+        for job_id in pending:
+            statuses[job_id] = llm.batch_status(job_id)
+            if on_poll:
+                on_poll(job_id, statuses[job_id])
+        pending = [job_id for job_id in pending if not statuses[job_id].done]
+        if not pending:
+            return statuses
+        time.sleep(delay)
+        delay = min(delay * 2, max_interval)
+
+
+def collect(llm, job_ids: list[str]) -> dict[int, BatchItem]:
+    """Results of finished jobs keyed by input index."""
+    results = {}
+    for job_id in job_ids:
+        for item in llm.batch_results(job_id):
+            results[index_of(item.custom_id)] = item
+    return results
+
+
+def state_path(output_file: Path) -> Path:
+    """Where the job IDs of an unfinished run writing ``output_file`` are kept."""
+    return output_file.with_name(output_file.name + ".jobs.json")
+
+
+def load_jobs(path: Path) -> list[str]:
+    return json.loads(path.read_text())["jobs"] if path.exists() else []
+
+
+def save_jobs(path: Path, provider: str, job_ids: list[str]):
+    atomic_write_text(path, json.dumps({"provider": provider, "jobs": job_ids}))
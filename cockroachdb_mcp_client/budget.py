@@ -0,0 +1,220 @@
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Optional
+from cockroachdb_mcp_client.config import resolve_price
+from cockroachdb_mcp_client.ratelimit import estimate_prompt_tokens
+
+# USD per million (input, output) tokens, matched by model-name prefix.
+# ``pricing:`` in the config file takes precedence.
+MODEL_PRICES = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "claude-3-haiku": (0.25, 1.25),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-sonnet": (3.00, 15.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-opus": (15.00, 75.00),
+}
+
+# Prices of prompt tokens read from / written to the provider's prompt cache,
+# as multiples of the input price, matched by model-name prefix.
+CACHE_PRICE_FACTORS = {"claude": (0.1, 1.25), "gpt": (0.5, 1.0)}
+DEFAULT_CACHE_PRICE_FACTORS = (1.0, 1.0)
+
+# Planning assumptions when a request does not cap its output.
+DEFAULT_OUTPUT_TOKENS = 1024
+DEFAULT_LATENCY = 1.0  # seconds before the first output token
+DEFAULT_OUTPUT_RATE = 50.0  # output tokens per second
+
+
+def price_for(model: str) -> tuple[float, float] | None:
+    """``(input, output)`` USD per million tokens for ``model``, if known."""
+    price = resolve_price(model)
+    if price:
+        return price
+    matches = [prefix for prefix in MODEL_PRICES if (model or "").startswith(prefix)]
+    return MODEL_PRICES[max(matches, key=len)] if matches else None
+
+
+def cost_of(
+    model: str,
+    tokens_in: int,
+    tokens_out: int,
+    cache_read: int = 0,
+    cache_write: int = 0,
+) -> float | None:
+    """
+    USD for a call's usage. ``tokens_in`` counts every prompt token; the
+    ``cache_read`` and ``cache_write`` shares of it are priced at the
+    provider's prompt-cache rates.
+    """
+    price = price_for(model)
+    if price is None:
+        return None
+    read_factor, write_factor = DEFAULT_CACHE_PRICE_FACTORS
+    for prefix, factors in CACHE_PRICE_FACTORS.items():
+        if (model or "").startswith(prefix):
+            read_factor, write_factor = factors
+    prompt = (
+        tokens_in
+        - cache_read
+        - cache_write
+        + cache_read * read_factor
+        + cache_write * write_factor
+    )
+    return (prompt * price[0] + tokens_out * price[1]) / 1_000_000
+
+
+def build_request(llm, context: dict, input_text) -> dict:
+    """The provider request for ``input_text``, built without calling the API."""
+    if hasattr(llm, "build_request"):
+        return llm.build_request(context, input_text)
+    body = context.get("body") or {}
+    request = {
+        "model": body.get("model") or type(llm).__name__,
+        "messages": [{"role": "user", "content": str(input_text)}],
+    }
+    if "max_tokens" in body:
+        request["max_tokens"] = body["max_tokens"]
+    return request
+
+
+@dataclass
+class Plan:
+    """Estimated size, cost and duration of a batch."""
+
+    model: str
+    inputs: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cost: Optional[float] = None
+    seconds: float = 0.0
+    limited_by: str = "concurrency"
+    per_input: list = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("per_input")
+        return data
+
+
+def plan_batch(
+    llm,
+    context: dict,
+    inputs: Iterable,
+    concurrency: int = 1,
+    latency: float = DEFAULT_LATENCY,
+    output_rate: float = DEFAULT_OUTPUT_RATE,
+) -> Plan:
+    """
+    Estimate tokens, cost and wall time of running ``inputs`` through ``llm``.
+
+    Prompt tokens are estimated locally from the request each input would
+    send; output tokens are the request's ``max_tokens``, so the cost is an
+    upper bound. Time assumes ``concurrency`` calls in flight, each taking
+    ``latency`` plus its output at ``output_rate``, and never beats the
+    provider's client-side ``rpm``/``tpm`` limits.
+    """
+    plan = None
+    work = 0.0
+    for input_text in inputs:
+        request = build_request(llm, context, input_text)
+        if plan is None:
+            plan = Plan(request.get("model"))
+        prompt = estimate_prompt_tokens(request)
+        output = int(request.get("max_tokens") or DEFAULT_OUTPUT_TOKENS)
+        plan.inputs += 1
+        plan.prompt_tokens += prompt
+        plan.output_tokens += output
+        plan.per_input.append((prompt, output))
+        work += latency + output / output_rate
+    if plan is None:
+        plan = Plan(build_request(llm, context, "").get("model"))
+
+    plan.cost = cost_of(plan.model, plan.prompt_tokens, plan.output_tokens)
+    plan.seconds = work / max(concurrency, 1)
+    limiter = llm.limiter_for(plan.model) if hasattr(llm, "limiter_for") else None
+    if limiter and limiter.requests and plan.inputs:
+        seconds = plan.inputs / limiter.requests.rate
+        if seconds > plan.seconds:
+            plan.seconds, plan.limited_by = seconds, "rpm"
+    if limiter and limiter.tokens and plan.inputs:
+        seconds = (plan.prompt_tokens + plan.output_tokens) / limiter.tokens.rate
+        if seconds > plan.seconds:
+            plan.seconds, plan.limited_by = seconds, "tpm"
+    return plan
+
+
+def inputs_within(plan: Plan, max_cost: float = None, max_tokens: int = None) -> int:
+    """How many of the planned inputs fit the budget at their estimated size."""
+    spent_tokens = spent_cost = 0.0
+    for count, (prompt, output) in enumerate(plan.per_input):
+        spent_tokens += prompt + output
+        spent_cost += cost_of(plan.model, prompt, output) or 0.0
+        if max_tokens is not None and spent_tokens > max_tokens:
+            return count
+        if max_cost is not None and spent_cost > max_cost:
+            return count
+    return plan.inputs
+
+
+class Budget:
+    """
+    Spend cap for a batch, fed with the usage providers report for each call.
+
+    Plug ``record`` into a ``MetricsRecorder`` as its ``on_call`` hook and
+    check ``exhausted`` before scheduling more work. Calls already in flight
+    when the cap is reached still complete, so the spend can overshoot by at
+    most those calls.
+    """
+
+    def __init__(self, model: str, max_cost: float = None, max_tokens: int = None):
+        if max_cost is not None and price_for(model) is None:
+            raise ValueError(
+                f"No price known for model {model!r}; add it under pricing: in "
+                "the config file or use a token budget"
+            )
+        self.model = model
+        self.max_cost = max_cost
+        self.max_tokens = max_tokens
+        self.tokens_in = 0
+        self.tokens_out = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def record(self, call: dict):
+        if call.get("kind") != "llm":
+            return
+        with self._lock:
+            self.calls += 1
+            self.tokens_in += call.get("tokens_in", 0)
+            self.tokens_out += call.get("tokens_out", 0)
+            self.cache_read_tokens += call.get("cache_read_tokens", 0)
+            self.cache_write_tokens += call.get("cache_write_tokens", 0)
+
+    @property
+    def tokens(self) -> int:
+        return self.tokens_in + self.tokens_out
+
+    @property
+    def cost(self) -> float | None:
+        return cost_of(
+            self.model,
+            self.tokens_in,
+            self.tokens_out,
+            self.cache_read_tokens,
+            self.cache_write_tokens,
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return True
+        if self.max_cost is not None:
+            return self.cost >= self.max_cost
+        return False
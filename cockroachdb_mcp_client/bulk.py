@@ -0,0 +1,111 @@
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class BulkResult:
+    context_id: str
+    status: str  # "ok", "missing" or "failed"
+    context: Optional[dict] = None
+    error: Optional[Exception] = None
+
+
+def read_ids(args: Iterable[str], ids_file: Path = None) -> list[str]:
+    """
+    Collect context ids from arguments (``-`` reads stdin) and ``ids_file``,
+    one per line, skipping blanks and ``#`` comments and dropping duplicates.
+    """
+    ids = []
+
+    def add_lines(lines):
+        for line in lines:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                ids.append(line)
+
+    for arg in args or []:
+        if arg == "-":
+            add_lines(sys.stdin)
+        else:
+            ids.append(arg)
+    if ids_file:
+        with ids_file.open() as f:
+            add_lines(f)
+    return list(dict.fromkeys(ids))
+
+
+def _chunks(ids: list[str], size: int) -> Iterator[list[str]]:
+    for start in range(0, len(ids), size):
+        yield ids[start : start + size]
+
+
+def _batch(client: MCPClient, action: str, chunk: list[str]) -> list[BulkResult]:
+    try:
+        response = client.post(f"/contexts/batch/{action}", json={"ids": chunk})
+        response.raise_for_status()
+        payload = codec.loads_json(response.content)
+    except Exception as e:
+        return [BulkResult(cid, "failed", error=e) for cid in chunk]
+    missing = set(payload.get("missing", []))
+    if action == "get":
+        found = {c["id"]: c for c in payload.get("contexts", [])}
+    else:
+        found = {cid: None for cid in payload.get("deleted", [])}
+    results = []
+    for cid in chunk:
+        if cid in found:
+            results.append(BulkResult(cid, "ok", found[cid]))
+        elif cid in missing:
+            results.append(BulkResult(cid, "missing"))
+        else:
+            error = RuntimeError("Not reported by the batch endpoint")
+            results.append(BulkResult(cid, "failed", error=error))
+    return results
+
+
+def _single(client: MCPClient, action: str, context_id: str) -> BulkResult:
+    try:
+        if action == "get":
+            response = client.get(f"/contexts/{context_id}")
+        else:
+            response = client.delete(f"/contexts/{context_id}")
+        if response.status_code == 404:
+            return BulkResult(context_id, "missing")
+        response.raise_for_status()
+        context = codec.loads_json(response.content) if action == "get" else None
+        return BulkResult(context_id, "ok", context)
+    except Exception as e:
+        return BulkResult(context_id, "failed", error=e)
+
+
+def run_bulk(
+    client: MCPClient,
+    action: str,
+    ids: list[str],
+    concurrency: int = DEFAULT_CONCURRENCY,
+) -> Iterator[BulkResult]:
+    """
+    Get or delete many contexts, yielding one result per id in input order.
+
+    Uses ``POST /contexts/batch/<action>`` in chunks of ``BATCH_SIZE`` when
+    the server advertises it, and otherwise keeps ``concurrency`` single
+    requests in flight over the client's pooled connections.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        if client.supports(f"batch_{action}"):
+            chunks = _chunks(ids, BATCH_SIZE)
+            for results in pool.map(lambda c: _batch(client, action, c), chunks):
+                yield from results
+        else:
+            yield from pool.map(lambda cid: _single(client, action, cid), ids)
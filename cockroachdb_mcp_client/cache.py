@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from cockroachdb_mcp_client.config import resolve_cache_options
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "cockroachdb-mcp-client"
+DEFAULT_TTL = 7 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def request_key(provider: str, request: dict) -> str:
+    """Stable hash of the effective provider request."""
+    payload = json.dumps(
+        {"provider": provider, "request": request}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk LLM response cache with TTL expiry and LRU eviction.
+
+    Entries live in a SQLite database, so several threads or processes can read
+    and write the same cache concurrently.
+    """
+
+    def __init__(
+        self,
+        path: Path = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.path = Path(path) if path else DEFAULT_CACHE_DIR / "responses.sqlite"
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value FROM responses WHERE key = ? AND created > ?",
+            (key, now - self.ttl),
+        ).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def put(self, key: str, value: str):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (key, value, now, now),
+            )
+            conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        self._connect().execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def open_response_cache(
+    enabled: bool | None = None, ttl: float | None = None
+) -> ResponseCache | None:
+    """
+    Open the response cache if enabled by flag or by ``cache.enabled`` in config.
+    """
+    options = resolve_cache_options()
+    if enabled is None:
+        enabled = bool(options.get("enabled", False))
+    if not enabled:
+        return None
+    return ResponseCache(
+        path=options.get("path"),
+        ttl=ttl if ttl is not None else float(options.get("ttl", DEFAULT_TTL)),
+        max_entries=int(options.get("max_entries", DEFAULT_MAX_ENTRIES)),
+    )
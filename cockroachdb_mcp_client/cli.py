@@ -1,15 +1,51 @@
+import importlib
 import typer
-from cockroachdb_mcp_client.commands import create, get, list_, delete
-from cockroachdb_mcp_client.commands import export
-from cockroachdb_mcp_client.commands import run
-from cockroachdb_mcp_client.commands import simulate
-from rich.console import Console
-from rich.align import Align
-from rich.panel import Panel
+from typer.core import TyperGroup
 from cockroachdb_mcp_client.logging_config import setup_logging
 from cockroachdb_mcp_client import __version__
 
-app = typer.Typer(name="cockroachdb-mcp-client", help="Model Context Protocol CLI for CockroachDB")
+# Subcommand name -> (module, help). Modules are imported only when their
+# subcommand is resolved, so `--version` or `list contexts` never pay for the
+# LLM SDKs pulled in by `run`/`simulate`.
+COMMANDS = {
+    "create": ("cockroachdb_mcp_client.commands.create", "Create a new context"),
+    "get": ("cockroachdb_mcp_client.commands.get", "Get a context by ID"),
+    "list": ("cockroachdb_mcp_client.commands.list_", "List all contexts"),
+    "delete": ("cockroachdb_mcp_client.commands.delete", "Delete a context by ID"),
+    "export": ("cockroachdb_mcp_client.commands.export", "Export a context to a file"),
+    "run": (
+        "cockroachdb_mcp_client.commands.run",
+        "Simulate or invoke a model context with an LLM",
+    ),
+    "simulate": (
+        "cockroachdb_mcp_client.commands.simulate",
+        "Run a batch of inputs against a model context",
+    ),
+}
+
+
+class LazyGroup(TyperGroup):
+    def list_commands(self, ctx):
+        return list(COMMANDS) + [
+            name for name in super().list_commands(ctx) if name not in COMMANDS
+        ]
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands and cmd_name in COMMANDS:
+            module_name, help_text = COMMANDS[cmd_name]
+            module = importlib.import_module(module_name)
+            group = typer.main.get_group(module.app)
+            group.name = cmd_name
+            group.help = help_text
+            self.commands[cmd_name] = group
+        return super().get_command(ctx, cmd_name)
+
+
+app = typer.Typer(
+    name="cockroachdb-mcp-client",
+    help="Model Context Protocol CLI for CockroachDB",
+    cls=LazyGroup,
+)
 
 
 @app.callback(invoke_without_command=True)
@@ -19,6 +55,9 @@ def main(
         False, "--version", "-v", help="Show version and exit"
     ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
+    profile: str = typer.Option(
+        None, "--profile", help="Config profile to use (or set MCP_PROFILE)"
+    ),
 ):
     setup_logging(log_level)
     show_banner()
@@ -30,22 +69,31 @@ def main(
         typer.echo(ctx.get_help())
         raise typer.Exit()
 
+    from cockroachdb_mcp_client.config import (
+        config_path,
+        get_settings,
+        select_profile,
+    )
 
-app.add_typer(create.app, name="create", help="Create a new context")
-app.add_typer(get.app, name="get", help="Get a context by ID")
-app.add_typer(list_.app, name="list", help="List all contexts")
-app.add_typer(delete.app, name="delete", help="Delete a context by ID")
-app.add_typer(export.app, name="export", help="Export a context to a file")
-app.add_typer(
-    run.app, name="run", help="Simulate or invoke a model context with an LLM"
-)
-app.add_typer(
-    simulate.app, name="simulate", help="Run a batch of inputs against a model context"
-)
+    if profile:
+        select_profile(profile)
+        ctx.call_on_close(lambda: select_profile(None))
+
+    # Validate the config file once up front instead of failing mid-command.
+    try:
+        get_settings()
+    except ValueError as e:
+        typer.echo(f"❌ Invalid config {config_path()}: {e}", err=True)
+        raise typer.Exit(code=1)
 
 
 def show_banner():
-    console = Console()
+    from rich.console import Console
+    from rich.align import Align
+    from rich.panel import Panel
+
+    # stderr keeps stdout clean for piped json/jsonl output.
+    console = Console(stderr=True)
     title = "[bold cyan]cockroachdb-mcp-client[/bold cyan]"
     subtitle = "[white]Model Context Protocol CLI for CockroachDB[/white]"
     version = f"[dim]v{__version__}[/dim]"
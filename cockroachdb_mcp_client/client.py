@@ -0,0 +1,261 @@
+import gzip
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+import requests
+from requests.adapters import HTTPAdapter
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client import metrics as metrics_module
+from cockroachdb_mcp_client.metrics import MetricsRecorder, http_label
+from cockroachdb_mcp_client.transport import (
+    DEFAULT_BREAKER_RESET,
+    DEFAULT_BREAKER_THRESHOLD,
+    DEFAULT_DEADLINE,
+    DEFAULT_MAX_RETRIES,
+    ReplicaSet,
+    RetryPolicy,
+)
+from cockroachdb_mcp_client.config import (
+    resolve_http_options,
+    resolve_servers,
+    resolve_token,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_PAGE_SIZE = 100
+
+
+class MCPClient:
+    """
+    HTTP client for the MCP server backed by one keep-alive connection pool.
+
+    Every command goes through a shared instance (see ``get_client``) so bulk
+    operations reuse TCP/TLS connections instead of reconnecting per request.
+    ``base_url`` may list several replicas of the same server; requests are
+    balanced across them and fail over to another replica on connection
+    errors. Requests are retried according to ``retry``, and each replica's
+    circuit breaker short-circuits it once it is clearly down.
+    """
+
+    def __init__(
+        self,
+        base_url: str | list[str],
+        token: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        gzip_requests: bool = False,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        deadline: float | None = DEFAULT_DEADLINE,
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        breaker_reset: float = DEFAULT_BREAKER_RESET,
+        balance: str = "round_robin",
+    ):
+        urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        self.replicas = ReplicaSet(urls, balance, breaker_threshold, breaker_reset)
+        #: The first replica; used to name the server in messages and caches.
+        self.base_url = self.replicas[0].url
+        self.timeout = timeout
+        self.gzip_requests = gzip_requests
+        self.retry = RetryPolicy(max_retries=max_retries, deadline=deadline)
+        self._capabilities = None
+        #: Optional recorder timing every round trip (see ``--metrics``).
+        self.metrics: MetricsRecorder | None = None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=len(self.replicas), pool_maxsize=pool_size
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        if "json" in kwargs:
+            body = codec.encode_json(kwargs.pop("json"))
+            headers = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+            if self.gzip_requests:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+            kwargs["data"], kwargs["headers"] = body, headers
+        if self.metrics is None:
+            return self._send(method, path, kwargs)
+        with self.metrics.measure("http", http_label(method, path)) as call:
+            response = self._send(method, path, kwargs)
+            call["error"] = response.status_code >= 400
+            return response
+
+    def _send(self, method: str, path: str, kwargs: dict) -> requests.Response:
+        """
+        Send with failover and retries; each attempt's timeout is capped by the
+        deadline. A failed replica is swapped for another one immediately;
+        backoff only starts once every available replica has been tried.
+        """
+        started = time.monotonic()
+        attempt = 0
+        tried = set()
+        while True:
+            replica = self.replicas.choose(exclude=tried)
+            elapsed = time.monotonic() - started
+            remaining = self.retry.remaining(elapsed)
+            timeout = kwargs["timeout"]
+            if remaining is not None and timeout is not None:
+                timeout = max(min(timeout, remaining), 0.001)
+            url = f"{replica.url}/{path.lstrip('/')}"
+            logger.debug("%s %s", method, url)
+            sent = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, url, **{**kwargs, "timeout": timeout}
+                )
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self.replicas.mark_unreachable(replica)
+                tried.add(replica)
+                retryable = self.retry.retryable(method, exc=e)
+                if retryable and self.replicas.has_alternative(tried):
+                    continue
+                elapsed = time.monotonic() - started
+                delay = self.retry.backoff(method, attempt, elapsed, exc=e)
+                if delay is None:
+                    raise
+                logger.warning("Retrying %s %s after %s", method, path, e)
+            except requests.RequestException:
+                # Not retried, but it still settles a half-open probe.
+                replica.breaker.record_failure()
+                raise
+            else:
+                replica.observe(time.monotonic() - sent)
+                if response.status_code >= 500:
+                    replica.breaker.record_failure()
+                else:
+                    replica.breaker.record_success()
+                tried.add(replica)
+                retryable = self.retry.retryable(method, response=response)
+                if retryable and self.replicas.has_alternative(tried):
+                    logger.warning(
+                        "HTTP %d from %s; trying another replica",
+                        response.status_code,
+                        replica.url,
+                    )
+                    continue
+                elapsed = time.monotonic() - started
+                delay = self.retry.backoff(method, attempt, elapsed, response=response)
+                if delay is None:
+                    return response
+                logger.warning(
+                    "Retrying %s %s after HTTP %d", method, path, response.status_code
+                )
+            metrics_module.report(retries=1)
+            time.sleep(delay)
+            attempt += 1
+            tried.clear()
+
+    def check_health(self, path: str = "/contexts?limit=1") -> dict:
+        """
+        Probe every replica in parallel, recording latency and taking the
+        unreachable ones out of rotation. Returns ``{url: healthy}``.
+        """
+
+        def probe(replica):
+            sent = time.monotonic()
+            try:
+                response = self.session.get(
+                    f"{replica.url}/{path.lstrip('/')}",
+                    timeout=min(self.timeout, 5.0),
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                self.replicas.mark_unreachable(replica)
+                return False
+            replica.observe(time.monotonic() - sent)
+            if response.status_code >= 500:
+                replica.breaker.record_failure()
+                return False
+            replica.breaker.record_success()
+            return True
+
+        with ThreadPoolExecutor(max_workers=len(self.replicas)) as pool:
+            healthy = list(pool.map(probe, self.replicas))
+        return {r.url: ok for r, ok in zip(self.replicas, healthy)}
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def iter_contexts(
+        self, page_size: int = DEFAULT_PAGE_SIZE, limit: int | None = None
+    ) -> Iterator[dict]:
+        """
+        Yield contexts from ``/contexts`` one page at a time.
+
+        Pages are requested with ``limit``/``cursor`` query parameters and
+        followed via the ``next_cursor`` field of each response. A server
+        without pagination returns everything in one page with no cursor.
+        """
+        params = {"limit": page_size}
+        yielded = 0
+        while True:
+            response = self.get("/contexts", params=params)
+            response.raise_for_status()
+            page = codec.loads_json(response.content)
+            for context in page.get("contexts", []):
+                if limit is not None and yielded >= limit:
+                    return
+                yield context
+                yielded += 1
+            cursor = page.get("next_cursor")
+            if not cursor or (limit is not None and yielded >= limit):
+                return
+            params = {"limit": page_size, "cursor": cursor}
+
+    def supports(self, feature: str) -> bool:
+        """
+        Whether the server advertises ``feature`` (e.g. ``batch_delete``) in
+        ``GET /capabilities``. Probed once; servers without the endpoint
+        support nothing optional.
+        """
+        if self._capabilities is None:
+            response = self.get("/capabilities")
+            try:
+                payload = codec.loads_json(response.content) if response.ok else {}
+                features = payload.get("features", [])
+            except ValueError:
+                features = []
+            self._capabilities = set(features)
+        return feature in self._capabilities
+
+    def close(self):
+        self.session.close()
+
+
+_clients: dict = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(server: str = None, token: str = None) -> MCPClient:
+    """
+    Return the process-wide client for the resolved server(s) and token.
+    """
+    servers = resolve_servers(server)
+    token = resolve_token(token)
+    key = (tuple(servers), token)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MCPClient(servers, token, **resolve_http_options())
+            _clients[key] = client
+        return client
@@ -0,0 +1,117 @@
+"""
+YAML and JSON encoding shared by context files, server payloads and output.
+
+Uses libyaml's C loader and dumper when PyYAML was built with it, and
+``orjson`` when it is installed, falling back to the pure-Python
+implementations otherwise. PyYAML is imported on first use so commands that
+never touch YAML do not pay for it at startup.
+
+Content hashes and cache keys deliberately keep using ``json.dumps``: their
+exact bytes must not depend on which backend is installed.
+"""
+
+import functools
+import json
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+JSON = "json"
+YAML = "yaml"
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml():
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    return yaml, loader, dumper
+
+
+def backends() -> dict:
+    """The implementation behind each format, e.g. for benchmark reports."""
+    _, loader, _ = _yaml()
+    return {
+        JSON: "orjson" if orjson else "json",
+        YAML: "libyaml" if loader.__name__.startswith("C") else "python",
+    }
+
+
+def loads_json(data: str | bytes):
+    """Parse JSON from ``str`` or ``bytes`` (e.g. ``response.content``)."""
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_json(value, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Encode ``value`` for people and scripts reading the CLI's output.
+
+    The text is exactly what ``json.dumps`` (with ``indent=2`` when asked)
+    has always printed, whichever backend is installed.
+    """
+    return json.dumps(value, indent=2 if indent else None, sort_keys=sort_keys)
+
+
+def encode_json(value) -> bytes:
+    """
+    Encode ``value`` as compact UTF-8 JSON for request bodies and storage.
+
+    Values orjson cannot encode (e.g. integers beyond 64 bits) go through
+    ``json`` instead.
+    """
+    if orjson:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(value, separators=(",", ":")).encode()
+
+
+def load_yaml(data: str | bytes):
+    yaml, loader, _ = _yaml()
+    return yaml.load(data, Loader=loader)
+
+
+def dump_yaml(value, sort_keys: bool = False) -> str:
+    yaml, _, dumper = _yaml()
+    return yaml.dump(value, Dumper=dumper, sort_keys=sort_keys)
+
+
+def detect_format(data: str | bytes) -> str:
+    """
+    ``json`` if the document starts like a JSON object or array, else ``yaml``.
+
+    Only the first non-blank character is inspected, so detection costs the
+    same for any file size and does not depend on the file name.
+    """
+    if isinstance(data, bytes):
+        head = data[:64].lstrip(b"\xef\xbb\xbf \t\r\n")[:1]
+        return JSON if head in (b"{", b"[") else YAML
+    head = data[:64].lstrip("﻿ \t\r\n")[:1]
+    return JSON if head in ("{", "[") else YAML
+
+
+def load_document(data: str | bytes):
+    """
+    Parse a JSON or YAML document, choosing the parser from its content.
+
+    YAML flow collections such as ``{name: x}`` also start with a brace; they
+    fail the JSON parse and are read as YAML instead.
+    """
+    if detect_format(data) == JSON:
+        try:
+            return loads_json(data)
+        except ValueError:
+            pass
+    return load_yaml(data)
+
+
+def load_file(path: Path):
+    """Parse a JSON or YAML file, whatever its suffix."""
+    return load_document(Path(path).read_bytes())
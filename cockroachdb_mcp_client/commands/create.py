@@ -1,23 +1,106 @@
-import json
+import glob
 import logging
+import queue
+import sys
+import threading
 import requests
 import typer
-import yaml
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Iterator
 from rich import print
+from cockroachdb_mcp_client import codec
 from cockroachdb_mcp_client.utils import handle_connection_error
-from cockroachdb_mcp_client.config import resolve_server, resolve_token
+from cockroachdb_mcp_client.client import MCPClient, get_client
+from cockroachdb_mcp_client.config import resolve_default
+from cockroachdb_mcp_client.metrics import MetricsRecorder, emit_report
 from cockroachdb_mcp_client.logging_config import setup_logging
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
-def post_context(base_url: str, headers: dict, data: dict) -> requests.Response:
-    """POST to /contexts with retry logic."""
-    return requests.post(f"{base_url}/contexts", json=data, headers=headers)
+def post_context(client: MCPClient, data: dict) -> requests.Response:
+    """POST to /contexts; the client retries only when it is safe to resend."""
+    return client.post("/contexts", json=data)
+
+
+CONTEXT_SUFFIXES = (".yaml", ".yml", ".json")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def parse_context_file(file: Path) -> dict:
+    return codec.load_file(file)
+
+
+def iter_context_items(source: str) -> Iterator[tuple[str, object]]:
+    """
+    Yield ``(key, data)`` for every context in ``source``.
+
+    ``source`` is a directory of YAML/JSON files, a glob pattern, a JSONL file,
+    or ``-`` for JSONL on stdin. ``key`` identifies the item in checkpoints. A
+    parse failure is yielded as the exception in place of ``data``.
+    """
+    path = Path(source)
+    if source == "-" or path.suffix.lower() in JSONL_SUFFIXES:
+        name = "stdin" if source == "-" else str(path)
+        stream = sys.stdin if source == "-" else path.open()
+        try:
+            for lineno, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield f"{name}:{lineno}", codec.loads_json(line)
+                except ValueError as e:
+                    yield f"{name}:{lineno}", e
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        return
+
+    if path.is_dir():
+        files = sorted(
+            p
+            for p in path.iterdir()
+            if p.is_file()
+            and not p.name.startswith(".")
+            and p.suffix.lower() in CONTEXT_SUFFIXES
+        )
+    else:
+        files = sorted(Path(p) for p in glob.glob(source, recursive=True))
+
+    for file in files:
+        try:
+            yield str(file), parse_context_file(file)
+        except Exception as e:
+            yield str(file), e
+
+
+def load_checkpoint(checkpoint: Path | None) -> set:
+    if checkpoint is None or not checkpoint.exists():
+        return set()
+    return {line.strip() for line in checkpoint.read_text().splitlines() if line}
+
+
+def _parse_in_background(
+    source: str, done: set, counts: dict, depth: int
+) -> queue.Queue:
+    """Parse ``source`` on a background thread, feeding a bounded queue."""
+    items = queue.Queue(maxsize=depth)
+
+    def produce():
+        try:
+            for key, data in iter_context_items(source):
+                if key in done:
+                    counts["skipped"] += 1
+                else:
+                    items.put((key, data))
+        except Exception as e:
+            items.put((source, e))
+        items.put(None)
+
+    threading.Thread(target=produce, daemon=True).start()
+    return items
 
 
 @app.command("context")
@@ -37,32 +120,20 @@ def create_context(
         print(f"[red]❌ File {file} does not exist.[/red]")
         raise typer.Exit(code=1)
 
+    client = get_client(server, token)
+
     try:
-        content = file.read_text()
-        if file.suffix.lower() in [".yaml", ".yml"]:
-            data = yaml.safe_load(content)
-        elif file.suffix.lower() == ".json":
-            data = json.loads(content)
-        else:
-            print("[yellow]⚠️ Unknown file type. Attempting YAML parse...[/yellow]")
-            data = yaml.safe_load(content)
-
-        base_url = resolve_server(server)
-        headers = (
-            {"Authorization": f"Bearer {resolve_token(token)}"}
-            if resolve_token(token)
-            else {}
-        )
+        data = parse_context_file(file)
 
-        logger.debug("Posting to %s/contexts with headers=%s", base_url, headers)
-        response = post_context(base_url, headers, data)
+        logger.debug("Posting to %s/contexts", client.base_url)
+        response = post_context(client, data)
         response.raise_for_status()
 
-        ctx_name = response.json().get("context_name", "unknown")
+        ctx_name = codec.loads_json(response.content).get("context_name", "unknown")
         print(f"[green]✅ Context created:[/green] {ctx_name}")
 
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except requests.RequestException as e:
         logger.exception("HTTP error while creating context")
         print(f"[red]❌ Request failed:[/red] {e}")
@@ -71,3 +142,103 @@ def create_context(
         logger.exception("Unexpected error during context creation")
         print(f"[red]❌ Error parsing or sending request:[/red] {e}")
         raise typer.Exit(code=1)
+
+
+@app.command("contexts")
+def create_contexts(
+    source: str = typer.Argument(
+        ..., help="Directory, glob pattern, JSONL file, or '-' for JSONL on stdin"
+    ),
+    concurrency: int = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Number of POSTs in flight [default: defaults.create_concurrency or 8]",
+    ),
+    checkpoint: Path = typer.Option(
+        None,
+        "--checkpoint",
+        help="File recording created items; items listed in it are skipped on rerun",
+    ),
+    server: str = typer.Option(None, "--server", help="Override MCP server URL"),
+    token: str = typer.Option(None, "--token", help="Bearer token for auth"),
+    metrics: str = typer.Option(
+        None, "--metrics", help="Print an HTTP metrics summary: table or json"
+    ),
+    metrics_file: Path = typer.Option(
+        None, "--metrics-file", help="Write metrics in Prometheus text format"
+    ),
+    log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
+):
+    """
+    Create many contexts from a directory, glob, or JSONL stream.
+    """
+    setup_logging(log_level)
+    if concurrency is None:
+        concurrency = resolve_default("create_concurrency", 8)
+
+    client = get_client(server, token)
+    recorder = MetricsRecorder() if metrics or metrics_file else None
+    client.metrics = recorder
+    if len(client.replicas) > 1:
+        health = client.check_health()
+        logger.info("Replicas healthy: %d/%d", sum(health.values()), len(health))
+    done = load_checkpoint(checkpoint)
+    if done:
+        print(f"[cyan]Resuming: {len(done)} items already created[/cyan]")
+
+    counts = {"created": 0, "failed": 0, "skipped": 0}
+    items = _parse_in_background(source, done, counts, depth=concurrency * 4)
+    checkpoint_file = checkpoint.open("a") if checkpoint else None
+
+    def create_one(data: dict) -> dict:
+        response = post_context(client, data)
+        response.raise_for_status()
+        return codec.loads_json(response.content)
+
+    def collect(finished):
+        for future in finished:
+            key = pending.pop(future)
+            try:
+                created = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                logger.warning("Failed to create context from %s: %s", key, e)
+                print(f"[red]❌ Failed:[/red] {key}: {e}")
+                continue
+            counts["created"] += 1
+            print(
+                f"[green]✅ Context created:[/green] "
+                f"{created.get('context_name', 'unknown')} ({key})"
+            )
+            if checkpoint_file:
+                checkpoint_file.write(key + "\n")
+                checkpoint_file.flush()
+
+    pending = {}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while (item := items.get()) is not None:
+                key, data = item
+                if isinstance(data, Exception):
+                    counts["failed"] += 1
+                    print(f"[red]❌ Could not parse {key}:[/red] {data}")
+                    continue
+                pending[pool.submit(create_one, data)] = key
+                if len(pending) >= concurrency:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+            collect(list(pending))
+    finally:
+        if checkpoint_file:
+            checkpoint_file.close()
+
+    print(
+        f"[bold]Created {counts['created']}, failed {counts['failed']}, "
+        f"skipped {counts['skipped']}[/bold]"
+    )
+    if recorder:
+        emit_report(recorder, metrics, metrics_file)
+    if counts["failed"]:
+        raise typer.Exit(code=1)
@@ -1,55 +1,92 @@
 import typer
 import requests
 import logging
+from pathlib import Path
 from rich import print
-from cockroachdb_mcp_client.config import resolve_server, resolve_token
+from cockroachdb_mcp_client.bulk import DEFAULT_CONCURRENCY, read_ids, run_bulk
+from cockroachdb_mcp_client.client import MCPClient, get_client
 from cockroachdb_mcp_client.utils import handle_connection_error
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
-def delete_from_server(
-    base_url: str, context_id: str, headers: dict
-) -> requests.Response:
-    return requests.delete(f"{base_url}/contexts/{context_id}", headers=headers)
+def delete_from_server(client: MCPClient, context_id: str) -> requests.Response:
+    return client.delete(f"/contexts/{context_id}")
+
+
+def delete_many(client: MCPClient, ids: list[str], concurrency: int):
+    counts = {"ok": 0, "missing": 0, "failed": 0}
+    for result in run_bulk(client, "delete", ids, concurrency):
+        counts[result.status] += 1
+        if result.status == "missing":
+            logger.warning("Context %s not found", result.context_id)
+        elif result.status == "failed":
+            logger.warning("Failed to delete %s: %s", result.context_id, result.error)
+            print(f"[red]❌ Failed:[/red] {result.context_id}: {result.error}")
+    print(
+        f"[bold]Deleted {counts['ok']}, missing {counts['missing']}, "
+        f"failed {counts['failed']}[/bold]"
+    )
+    if counts["missing"] or counts["failed"]:
+        raise typer.Exit(code=1)
 
 
 @app.command("context")
 def delete_context(
-    context_id: str,
+    context_ids: list[str] = typer.Argument(
+        None, help="Context UUIDs; '-' reads them from stdin, one per line"
+    ),
+    ids_file: Path = typer.Option(
+        None, "--ids-file", help="File with one context UUID per line"
+    ),
+    concurrency: int = typer.Option(
+        DEFAULT_CONCURRENCY,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Requests in flight when the server has no batch endpoint",
+    ),
     server: str = typer.Option(None, "--server", help="Override MCP server URL"),
     token: str = typer.Option(None, "--token", help="Bearer token for auth"),
     yes: bool = typer.Option(False, "--yes", "-y", help="Skip confirmation"),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """
-    Delete a context by its UUID.
+    Delete one or more contexts by UUID.
+
+    Several contexts are deleted in one batch request when the server
+    supports it, or concurrently otherwise, after a single confirmation.
     """
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
 
+    ids = read_ids(context_ids, ids_file)
+    if not ids:
+        print("[red]❌ No context IDs given.[/red]")
+        raise typer.Exit(code=1)
+
     if not yes:
-        confirm = typer.confirm(
-            f"Are you sure you want to delete context {context_id}?"
-        )
+        if "-" in (context_ids or []):
+            print("[red]❌ Pass --yes when reading IDs from stdin.[/red]")
+            raise typer.Exit(code=1)
+        target = f"context {ids[0]}" if len(ids) == 1 else f"{len(ids)} contexts"
+        confirm = typer.confirm(f"Are you sure you want to delete {target}?")
         if not confirm:
             typer.echo("Cancelled.")
             raise typer.Exit()
 
+    client = get_client(server, token)
+
     try:
-        base_url = resolve_server(server)
-        headers = (
-            {"Authorization": f"Bearer {resolve_token(token)}"}
-            if resolve_token(token)
-            else {}
-        )
+        if len(ids) > 1 or ids_file:
+            delete_many(client, ids, concurrency)
+            return
 
-        logger.debug("Sending DELETE to %s/contexts/%s", base_url, context_id)
-        response = delete_from_server(base_url, context_id, headers)
+        context_id = ids[0]
+        logger.debug("Sending DELETE to %s/contexts/%s", client.base_url, context_id)
+        response = delete_from_server(client, context_id)
 
         if response.status_code == 404:
             print(f"[yellow]⚠️ Context {context_id} not found.[/yellow]")
@@ -58,8 +95,10 @@ def delete_context(
         response.raise_for_status()
         print(f"[green]✅ Deleted:[/green] {context_id}")
 
+    except typer.Exit:
+        raise
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except requests.RequestException as e:
         logger.exception("HTTP error while deleting context")
         print(f"[red]❌ Request failed:[/red] {e}")
@@ -1,25 +1,27 @@
 import typer
 import requests
-import yaml
-import json
+import hashlib
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 from rich import print
-from cockroachdb_mcp_client.config import resolve_server, resolve_token
-from cockroachdb_mcp_client.utils import handle_connection_error
-from tenacity import retry, stop_after_attempt, wait_fixed
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.client import MCPClient, get_client
+from cockroachdb_mcp_client.config import resolve_default
+from cockroachdb_mcp_client.metrics import MetricsRecorder, emit_report
+from cockroachdb_mcp_client.utils import atomic_write_text, handle_connection_error
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
-def fetch_context(base_url: str, context_id: str, headers: dict) -> dict:
-    response = requests.get(f"{base_url}/contexts/{context_id}", headers=headers)
+def fetch_context(client: MCPClient, context_id: str) -> dict | None:
+    """Fetch a context, or return None if the server does not have it."""
+    response = client.get(f"/contexts/{context_id}")
     if response.status_code == 404:
-        raise typer.Exit(code=1)
+        return None
     response.raise_for_status()
-    return response.json()
+    return codec.loads_json(response.content)
 
 
 @app.command("context")
@@ -38,18 +40,13 @@ def export_context(
 
     setup_logging(log_level)
 
+    client = get_client(server, token)
+
     try:
-        base_url = resolve_server(server)
-        headers = (
-            {"Authorization": f"Bearer {resolve_token(token)}"}
-            if resolve_token(token)
-            else {}
-        )
-        logger.debug("Exporting context %s from %s", context_id, base_url)
+        logger.debug("Exporting context %s from %s", context_id, client.base_url)
 
-        try:
-            context = fetch_context(base_url, context_id, headers)
-        except typer.Exit:
+        context = fetch_context(client, context_id)
+        if context is None:
             print(f"[yellow]⚠️ Context {context_id} not found.[/yellow]")
             return
 
@@ -57,80 +54,204 @@ def export_context(
         context.pop("created_at", None)
         file.parent.mkdir(parents=True, exist_ok=True)
 
-        if output == "json":
-            file.write_text(json.dumps(context, indent=2))
-        elif output == "yaml":
-            file.write_text(yaml.dump(context, sort_keys=False))
-        else:
+        if output not in ("json", "yaml"):
             print("[red]❌ Unsupported output format[/red]")
             raise typer.Exit(code=1)
+        atomic_write_text(file, serialize_context(context, output))
 
         print(f"[green]✅ Exported context to:[/green] {file}")
 
+    except typer.Exit:
+        raise
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except Exception as e:
         logger.exception("Export failed")
         print(f"[red]❌ Export failed:[/red] {e}")
         raise typer.Exit(code=1)
 
 
+MANIFEST_NAME = ".mcp-export-manifest.json"
+
+
+def serialize_context(context: dict, output: str) -> str:
+    if output == "json":
+        return codec.dumps_json(context, indent=True)
+    return codec.dump_yaml(context)
+
+
+def load_manifest(output_dir: Path) -> dict:
+    manifest_path = output_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        return codec.loads_json(manifest_path.read_bytes()).get("contexts", {})
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable manifest %s: %s", manifest_path, e)
+        return {}
+
+
+def save_manifest(output_dir: Path, entries: dict):
+    atomic_write_text(
+        output_dir / MANIFEST_NAME,
+        codec.dumps_json({"contexts": entries}, indent=True, sort_keys=True),
+    )
+
+
+def export_one(
+    client: MCPClient,
+    ref: dict,
+    output_dir: Path,
+    output: str,
+    previous: dict | None,
+) -> tuple[str, dict, Path]:
+    """
+    Export a single context, returning its status, manifest entry and path.
+
+    With a ``previous`` manifest entry the fetch is skipped when the index
+    reports the same ``created_at`` and the file was written in the same
+    format, and the write is skipped when the serialized content hash is
+    unchanged.
+    """
+    context_id = ref["id"]
+    ext = "yaml" if output == "yaml" else "json"
+    if (
+        previous
+        and ref.get("created_at")
+        and ref.get("created_at") == previous.get("created_at")
+        and previous["file"].endswith(f".{ext}")
+        and (output_dir / previous["file"]).exists()
+    ):
+        return "unchanged", previous, output_dir / previous["file"]
+
+    context = fetch_context(client, context_id)
+    if context is None:
+        raise LookupError(f"Context {context_id} not found")
+    created_at = context.pop("created_at", None)
+    context.pop("id", None)
+
+    filename = f"{context['context_name']}-{context_id[:8]}.{ext}"
+    file_path = output_dir / filename
+    content = serialize_context(context, output)
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    entry = {"created_at": created_at, "hash": digest, "file": filename}
+
+    if previous and previous.get("hash") == digest and file_path.exists():
+        return "unchanged", entry, file_path
+
+    atomic_write_text(file_path, content)
+    return "exported", entry, file_path
+
+
 @app.command("all")
 def export_all(
     output_dir: Path = typer.Option(
         ..., "--output-dir", "-o", help="Directory to save exported files"
     ),
     output: str = typer.Option("yaml", help="Format: json or yaml"),
+    workers: int = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Number of contexts fetched in parallel [default: defaults.workers or 4]",
+    ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Skip contexts unchanged since the last export (tracked in a manifest)",
+    ),
     server: str = typer.Option(None, "--server", help="Override MCP server URL"),
     token: str = typer.Option(None, "--token", help="Bearer token for auth"),
+    metrics: str = typer.Option(
+        None, "--metrics", help="Print an HTTP metrics summary: table or json"
+    ),
+    metrics_file: Path = typer.Option(
+        None, "--metrics-file", help="Write metrics in Prometheus text format"
+    ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """Export all contexts to the specified directory."""
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
+    if workers is None:
+        workers = resolve_default("workers", 4)
 
-    base_url = resolve_server(server)
-    headers = (
-        {"Authorization": f"Bearer {resolve_token(token)}"}
-        if resolve_token(token)
-        else {}
-    )
+    client = get_client(server, token)
+    recorder = MetricsRecorder() if metrics or metrics_file else None
+    client.metrics = recorder
+    if len(client.replicas) > 1:
+        health = client.check_health()
+        logger.info("Replicas healthy: %d/%d", sum(health.values()), len(health))
 
     output_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(output_dir) if incremental else {}
+    manifest = {}
+    counts = {"exported": 0, "unchanged": 0, "failed": 0}
 
     try:
-        index_response = requests.get(f"{base_url}/contexts", headers=headers)
-        index_response.raise_for_status()
-        context_refs = index_response.json().get("contexts", [])
 
-        if not context_refs:
-            print("[yellow]⚠️ No contexts found to export.[/yellow]")
-            raise typer.Exit()
+        def collect(finished):
+            for future in finished:
+                context_id = pending.pop(future)
+                try:
+                    status, entry, file_path = future.result()
+                except Exception as e:
+                    counts["failed"] += 1
+                    if context_id in previous:
+                        manifest[context_id] = previous[context_id]
+                    logger.warning(
+                        "Failed to export context %s: %s", context_id, str(e)
+                    )
+                    print(f"[red]❌ Failed to export context {context_id}:[/red] {e}")
+                    continue
 
-        for ref in context_refs:
-            context_id = ref["id"]
-            try:
-                context = fetch_context(base_url, context_id, headers)
-                context.pop("id", None)
-                context.pop("created_at", None)
+                counts[status] += 1
+                manifest[context_id] = entry
+                if status == "exported":
+                    print(f"[green]✅ Exported:[/green] {file_path}")
+                else:
+                    logger.debug("Unchanged: %s", file_path)
 
-                ext = "yaml" if output == "yaml" else "json"
-                filename = f"{context['context_name']}-{context_id[:8]}.{ext}"
-                file_path = output_dir / filename
+        # Fetches start while later index pages are still being read; at most
+        # a few per worker are queued so huge registries stay in bounded memory.
+        pending = {}
+        seen = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for ref in client.iter_contexts():
+                seen += 1
+                future = pool.submit(
+                    export_one,
+                    client,
+                    ref,
+                    output_dir,
+                    output,
+                    previous.get(ref["id"]),
+                )
+                pending[future] = ref["id"]
+                if len(pending) >= workers * 4:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(finished)
+            collect(list(pending))
 
-                if output == "yaml":
-                    file_path.write_text(yaml.dump(context, sort_keys=False))
-                else:
-                    file_path.write_text(json.dumps(context, indent=2))
+        if not seen:
+            print("[yellow]⚠️ No contexts found to export.[/yellow]")
+            raise typer.Exit()
 
-                print(f"[green]✅ Exported:[/green] {file_path}")
-            except Exception as e:
-                logger.warning("Failed to export context %s: %s", context_id, str(e))
-                print(f"[red]❌ Failed to export context {context_id}:[/red] {e}")
+        if incremental:
+            save_manifest(output_dir, manifest)
+        print(
+            f"[bold]Exported {counts['exported']}, unchanged {counts['unchanged']}, "
+            f"failed {counts['failed']}[/bold]"
+        )
+        if recorder:
+            emit_report(recorder, metrics, metrics_file)
 
+    except typer.Exit:
+        raise
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except Exception as e:
         logger.exception("Failed to export all contexts")
         print(f"[red]❌ Failed to fetch context list:[/red] {e}")
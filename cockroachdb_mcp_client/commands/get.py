@@ -1,55 +1,113 @@
 import typer
 import requests
-import json
 import logging
-from rich import print_json
-from cockroachdb_mcp_client.config import resolve_server, resolve_token
+from pathlib import Path
+from rich import print, print_json
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.bulk import DEFAULT_CONCURRENCY, read_ids, run_bulk
+from cockroachdb_mcp_client.client import MCPClient, get_client
+from cockroachdb_mcp_client.context_cache import open_context_cache
 from cockroachdb_mcp_client.utils import handle_connection_error
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
-def fetch_context(base_url: str, context_id: str, headers: dict) -> requests.Response:
-    return requests.get(f"{base_url}/contexts/{context_id}", headers=headers)
+def get_many(client: MCPClient, ids: list[str], output: str, concurrency: int):
+    counts = {"ok": 0, "missing": 0, "failed": 0}
+    contexts = []
+    for result in run_bulk(client, "get", ids, concurrency):
+        counts[result.status] += 1
+        if result.status == "missing":
+            logger.warning("Context %s not found", result.context_id)
+        elif result.status == "failed":
+            logger.warning("Failed to get %s: %s", result.context_id, result.error)
+        elif output == "jsonl":
+            typer.echo(codec.dumps_json(result.context))
+        else:
+            contexts.append(result.context)
+    if output == "json":
+        typer.echo(codec.dumps_json(contexts, indent=True))
+    typer.echo(
+        f"Fetched {counts['ok']}, missing {counts['missing']}, "
+        f"failed {counts['failed']}",
+        err=True,
+    )
+    if counts["missing"] or counts["failed"]:
+        raise typer.Exit(code=1)
 
 
 @app.command("context")
 def get_context(
-    context_id: str,
+    context_ids: list[str] = typer.Argument(
+        None, help="Context UUIDs; '-' reads them from stdin, one per line"
+    ),
+    ids_file: Path = typer.Option(
+        None, "--ids-file", help="File with one context UUID per line"
+    ),
+    output: str = typer.Option(
+        "json", help="Output format for several contexts: json or jsonl"
+    ),
+    concurrency: int = typer.Option(
+        DEFAULT_CONCURRENCY,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Requests in flight when the server has no batch endpoint",
+    ),
     server: str = typer.Option(None, "--server", help="Override MCP server URL"),
     token: str = typer.Option(None, "--token", help="Bearer token for auth"),
+    max_age: float = typer.Option(
+        0,
+        "--max-age",
+        help="Serve the local copy without revalidating if it is this many "
+        "seconds old or newer",
+    ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """
-    Get a specific context by its UUID.
+    Get one or more contexts by UUID.
+
+    A single context is kept in a local cache and revalidated with the server,
+    so an unchanged context is not re-downloaded and a cached copy is shown if
+    the server is unreachable. Several contexts are fetched in one batch
+    request when the server supports it, or concurrently otherwise.
     """
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
 
-    try:
-        base_url = resolve_server(server)
-        headers = (
-            {"Authorization": f"Bearer {resolve_token(token)}"}
-            if resolve_token(token)
-            else {}
-        )
+    ids = read_ids(context_ids, ids_file)
+    if not ids:
+        print("[red]❌ No context IDs given.[/red]")
+        raise typer.Exit(code=1)
+    if output not in ("json", "jsonl"):
+        print(f"[red]❌ Unsupported output format: {output}[/red]")
+        raise typer.Exit(code=1)
+
+    client = get_client(server, token)
 
-        logger.debug("Fetching context ID %s from %s", context_id, base_url)
-        response = fetch_context(base_url, context_id, headers)
+    try:
+        if len(ids) > 1 or ids_file:
+            get_many(client, ids, output, concurrency)
+            return
 
-        if response.status_code == 404:
+        context_id = ids[0]
+        logger.debug("Fetching context ID %s from %s", context_id, client.base_url)
+        try:
+            context = open_context_cache().fetch(client, context_id, max_age)
+        except requests.HTTPError as e:
+            if e.response is None or e.response.status_code != 404:
+                raise
             print(f"[yellow]⚠️ Context {context_id} not found.[/yellow]")
             raise typer.Exit(code=1)
 
-        response.raise_for_status()
-        print_json(json.dumps(response.json()))
+        print_json(data=context)
 
+    except typer.Exit:
+        raise
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except requests.RequestException as e:
         logger.exception("HTTP error while getting context")
         print(f"[red]❌ Request failed:[/red] {e}")
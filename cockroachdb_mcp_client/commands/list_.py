@@ -1,59 +1,138 @@
 import typer
 import requests
-import json
 import logging
-from rich import print_json
-from cockroachdb_mcp_client.config import resolve_server, resolve_token
+from fnmatch import fnmatchcase
+from itertools import islice
+from typing import Iterable, Iterator
+from rich import print
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.client import DEFAULT_PAGE_SIZE, MCPClient, get_client
 from cockroachdb_mcp_client.utils import handle_connection_error
-from tenacity import retry, stop_after_attempt, wait_fixed
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
+OUTPUT_FORMATS = ("json", "yaml", "jsonl", "table")
+TABLE_FIELDS = ("id", "context_name", "created_at")
+TABLE_WIDTHS = {"id": 36, "created_at": 32}
+FIELD_ALIASES = {"name": "context_name"}
 
-@retry(stop=stop_after_attempt(3), wait=wait_fixed(2), reraise=True)
-def fetch_contexts(base_url: str, headers: dict) -> requests.Response:
-    return requests.get(f"{base_url}/contexts", headers=headers)
+
+def parse_filters(filters: list[str]) -> list[tuple[str, str]]:
+    """Parse ``key=pattern`` filters; patterns are shell-style globs."""
+    parsed = []
+    for item in filters:
+        key, sep, pattern = item.partition("=")
+        if not sep or not key:
+            raise typer.BadParameter(
+                f"Expected key=value, got {item!r}", param_hint="--filter"
+            )
+        parsed.append((FIELD_ALIASES.get(key, key), pattern))
+    return parsed
+
+
+def matches(context: dict, filters: list[tuple[str, str]]) -> bool:
+    return all(
+        fnmatchcase(str(context.get(key, "")), pattern) for key, pattern in filters
+    )
+
+
+def fetch_contexts(
+    client: MCPClient,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    limit: int | None = None,
+    filters: list[tuple[str, str]] = (),
+) -> Iterator[dict]:
+    """Lazily yield contexts matching ``filters``, stopping after ``limit``."""
+    if not filters:
+        if limit is not None:
+            page_size = max(1, min(page_size, limit))
+        return client.iter_contexts(page_size=page_size, limit=limit)
+    selected = (c for c in client.iter_contexts(page_size) if matches(c, filters))
+    return islice(selected, limit)
+
+
+def emit(contexts: Iterable[dict], output: str, fields: list[str] | None):
+    """Write each context as soon as it arrives instead of buffering the list."""
+    if fields:
+        contexts = ({f: c.get(f) for f in fields} for c in contexts)
+
+    if output == "jsonl":
+        for context in contexts:
+            typer.echo(codec.dumps_json(context))
+    elif output == "json":
+        typer.echo('{\n  "contexts": [')
+        separator = ""
+        for context in contexts:
+            body = codec.dumps_json(context, indent=True).replace("\n", "\n    ")
+            typer.echo(f"{separator}    {body}", nl=False)
+            separator = ",\n"
+        typer.echo("\n  ]\n}")
+    elif output == "yaml":
+        typer.echo("contexts:")
+        for context in contexts:
+            typer.echo(codec.dump_yaml([context]), nl=False)
+    elif output == "table":
+        columns = fields or list(TABLE_FIELDS)
+        widths = [max(len(c), TABLE_WIDTHS.get(c, 24)) for c in columns]
+
+        def row(values):
+            return "  ".join(f"{v:<{w}}" for v, w in zip(values, widths)).rstrip()
+
+        typer.echo(row(columns))
+        for context in contexts:
+            typer.echo(row(str(context.get(c, "")) for c in columns))
 
 
 @app.command("contexts")
 def list_contexts(
     server: str = typer.Option(None, "--server", help="Override MCP server URL"),
     token: str = typer.Option(None, "--token", help="Bearer token for auth"),
-    output: str = typer.Option("json", help="Output format: json or yaml"),
+    output: str = typer.Option(
+        "json", help="Output format: json, yaml, jsonl or table"
+    ),
+    limit: int = typer.Option(
+        None, "--limit", min=0, help="Stop after this many contexts"
+    ),
+    filter_: list[str] = typer.Option(
+        None,
+        "--filter",
+        help="Only show contexts where key matches a glob, e.g. name=summar* "
+        "(repeatable)",
+    ),
+    fields: str = typer.Option(
+        None, "--fields", help="Comma-separated fields to show, e.g. id,context_name"
+    ),
+    page_size: int = typer.Option(
+        DEFAULT_PAGE_SIZE, "--page-size", min=1, help="Contexts requested per page"
+    ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """
-    List all contexts from the MCP server.
+    List contexts from the MCP server, streaming pages as they arrive.
     """
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
 
+    if output not in OUTPUT_FORMATS:
+        print(f"[red]❌ Unsupported output format: {output}[/red]")
+        raise typer.Exit(code=1)
+    filters = parse_filters(filter_ or [])
+    columns = [
+        FIELD_ALIASES.get(f.strip(), f.strip())
+        for f in (fields or "").split(",")
+        if f.strip()
+    ]
+
+    client = get_client(server, token)
+
     try:
-        base_url = resolve_server(server)
-        headers = (
-            {"Authorization": f"Bearer {resolve_token(token)}"}
-            if resolve_token(token)
-            else {}
-        )
-
-        logger.debug("Fetching contexts from %s with headers=%s", base_url, headers)
-        response = fetch_contexts(base_url, headers)
-        response.raise_for_status()
-        data = response.json()
-
-        if output == "json":
-            print_json(json.dumps(data))
-        elif output == "yaml":
-            import yaml
-
-            print(yaml.dump(data, sort_keys=False))
-        else:
-            print(f"[red]❌ Unsupported output format: {output}[/red]")
+        logger.debug("Fetching contexts from %s", client.base_url)
+        emit(fetch_contexts(client, page_size, limit, filters), output, columns)
 
     except requests.ConnectionError:
-        handle_connection_error(base_url)
+        handle_connection_error(client.base_url)
     except requests.RequestException as e:
         logger.exception("HTTP error while listing contexts")
         print(f"[red]❌ Request failed:[/red] {e}")
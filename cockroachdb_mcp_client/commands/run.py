@@ -1,66 +1,244 @@
+import asyncio
 import typer
-import yaml
-import json
 import logging
 from pathlib import Path
 from rich import print
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.cache import open_response_cache
+from cockroachdb_mcp_client.config import resolve_default
+from cockroachdb_mcp_client.metrics import (
+    InstrumentedProvider,
+    MetricsRecorder,
+    emit_report,
+)
 from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.session import Session, session_path
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
+def run_turn(loop, llm, session: Session, input_text: str, stream: bool) -> str:
+    """
+    Send one input with the session's recent history and record the reply.
+
+    Providers that take no ``history`` get each input on its own.
+    """
+    history = session.history(input_text) if llm.supports_history else None
+    kwargs = {"history": history} if history else {}
+    reply = loop.run_until_complete(
+        llm.arun(session.context, input_text, stream=stream, **kwargs)
+    )
+    session.add_turn(input_text, reply)
+    return reply
+
+
+def repl(loop, llm, session: Session, stream: bool):
+    """Read inputs from stdin until EOF or ``/exit``, one model call per line."""
+    print("[dim]Type /reset to clear the history, /exit or Ctrl-D to quit.[/dim]")
+    while True:
+        try:
+            line = input("> ").strip()
+        except EOFError:
+            break
+        if not line:
+            continue
+        if line in ("/exit", "/quit"):
+            break
+        if line == "/reset":
+            session.reset()
+            print("[dim]History cleared.[/dim]")
+            continue
+        try:
+            reply = run_turn(loop, llm, session, line, stream)
+        except Exception as e:
+            logger.exception("LLM call failed")
+            print(f"[red]❌ Request failed:[/red] {e}")
+            continue
+        if not stream:
+            print(reply)
+
+
 @app.command("context")
 def run_context(
     provider: str = typer.Option(
-        ..., "--provider", "-p", help="LLM provider to use (e.g. openai, anthropic)"
+        None,
+        "--provider",
+        "-p",
+        help="LLM provider to use (e.g. openai, anthropic); a resumed --session "
+        "remembers it",
     ),
     file: Path = typer.Option(
-        ..., "--file", "-f", help="Path to context YAML or JSON file"
+        None, "--file", "-f", help="Path to context YAML or JSON file"
     ),
+    context_id: str = typer.Option(
+        None,
+        "--context-id",
+        help="Use a context from the MCP server instead of --file (cached locally)",
+    ),
+    context_max_age: float = typer.Option(
+        None,
+        "--context-max-age",
+        help="Seconds a cached --context-id is used without revalidating",
+    ),
+    server: str = typer.Option(None, "--server", help="Override MCP server URL"),
+    token: str = typer.Option(None, "--token", help="Bearer token for auth"),
     input_text: str = typer.Option(
-        ..., "--input", "-i", help="Input text to send to the model"
+        None,
+        "--input",
+        "-i",
+        help="Input text to send to the model; omit it for an interactive session",
+    ),
+    session_name: str = typer.Option(
+        None,
+        "--session",
+        help="Save the conversation under this name and continue it on later runs",
+    ),
+    history_tokens: int = typer.Option(
+        None,
+        "--history-tokens",
+        min=1,
+        help="Token window of earlier turns sent with each input [default: 8000]",
     ),
     stream: bool = typer.Option(False, "--stream", "-s", help="Stream model output"),
     model_override: str = typer.Option(
         None, "--model", help="Override model name (e.g. gpt-4, claude-3-sonnet)"
     ),
+    cache: bool = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help="Reuse cached responses for identical requests (default from config)",
+    ),
+    cache_ttl: float = typer.Option(
+        None, "--cache-ttl", help="Seconds a cached response stays valid"
+    ),
+    prompt_cache: bool = typer.Option(
+        None,
+        "--prompt-cache/--no-prompt-cache",
+        help="Mark the system prompt and examples as cacheable by the provider "
+        "(default from config)",
+    ),
+    examples: bool = typer.Option(
+        None,
+        "--examples/--no-examples",
+        help="Send the context's few-shot body.examples before each input "
+        "(default from config)",
+    ),
+    rpm: float = typer.Option(
+        None, "--rpm", help="Client-side limit on requests per minute"
+    ),
+    tpm: float = typer.Option(
+        None, "--tpm", help="Client-side limit on estimated tokens per minute"
+    ),
+    max_retries: int = typer.Option(
+        None, "--max-retries", help="Retries for throttled or failed provider calls"
+    ),
+    metrics: str = typer.Option(
+        None, "--metrics", help="Print a call metrics summary: table or json"
+    ),
+    metrics_file: Path = typer.Option(
+        None, "--metrics-file", help="Write metrics in Prometheus text format"
+    ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """
     Simulate an LLM call using the given provider and context.
+
+    Without ``--input`` this starts an interactive session that keeps the
+    provider client and context loaded between turns. ``--session NAME``
+    saves the history after every turn so a later run can pick it up.
     """
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
 
+    session = None
+    if session_name:
+        try:
+            path = session_path(session_name)
+        except ValueError as e:
+            print(f"[red]❌ {e}[/red]")
+            raise typer.Exit(code=1)
+        if path.exists():
+            session = Session.load(path)
+            provider = provider or session.provider
+
     if provider not in PROVIDERS:
         print(f"[red]❌ Unknown provider:[/red] {provider}")
         logger.error("Unsupported provider: %s", provider)
         raise typer.Exit(code=1)
 
-    if not file.exists():
+    if (file and context_id) or (session is None and not (file or context_id)):
+        print("[red]❌ Pass exactly one of --file or --context-id.[/red]")
+        raise typer.Exit(code=1)
+
+    if file and not file.exists():
         print(f"[red]❌ Context file not found:[/red] {file}")
         raise typer.Exit(code=1)
 
     try:
-        content = file.read_text()
-        context = (
-            yaml.safe_load(content)
-            if file.suffix.lower() in [".yaml", ".yml"]
-            else json.loads(content)
-        )
+        if context_id:
+            from cockroachdb_mcp_client.context_cache import load_registry_context
+
+            context = load_registry_context(context_id, server, token, context_max_age)
+        elif file:
+            context = codec.load_file(file)
+        else:
+            context = session.context
 
         if model_override:
             context["body"]["model"] = model_override
             logger.debug("Overriding model to: %s", model_override)
 
+        if session is None:
+            path = session_path(session_name) if session_name else None
+            session = Session(provider, context, path=path)
+        session.provider, session.context = provider, context
+        if history_tokens:
+            session.history_tokens = history_tokens
+
         logger.info("Running context with provider: %s", provider)
         llm = PROVIDERS[provider]()
-        result = llm.run(context, input_text, stream=stream)
+        llm.cache = open_response_cache(cache, cache_ttl)
+        llm.rate_limit_overrides = {
+            k: v
+            for k, v in {"rpm": rpm, "tpm": tpm, "max_retries": max_retries}.items()
+            if v is not None
+        }
+        if prompt_cache is None:
+            prompt_cache = resolve_default("prompt_cache", False)
+        llm.prompt_cache = prompt_cache
+        if examples is None:
+            examples = resolve_default("examples", False)
+        llm.examples = examples
+        llm.example_messages(context)  # reject malformed examples up front
+        if not llm.supports_history and (input_text is None or session_name):
+            print(
+                f"[yellow]⚠️ Provider {provider} does not accept conversation "
+                "history; each input is sent on its own.[/yellow]"
+            )
+        recorder = MetricsRecorder() if metrics or metrics_file else None
+        if recorder:
+            llm = InstrumentedProvider(llm, recorder)
 
-        if not stream:
-            print(f"[bold green]✅ Model Response:[/bold green]\n{result}")
+        # One loop for the whole session, so the async SDK client and its
+        # connections are reused across turns.
+        loop = asyncio.new_event_loop()
+        try:
+            if input_text is None:
+                repl(loop, llm, session, stream)
+            else:
+                result = run_turn(loop, llm, session, input_text, stream)
+                if not stream:
+                    print(f"[bold green]✅ Model Response:[/bold green]\n{result}")
+        finally:
+            loop.close()
+
+        if llm.cache:
+            stats = llm.cache.stats()
+            print(f"[dim]Cache: {stats['hits']} hits, {stats['misses']} misses[/dim]")
+        if recorder:
+            emit_report(recorder, metrics, metrics_file)
 
     except Exception as e:
         logger.exception("LLM run failed")
@@ -1,71 +1,603 @@
+import asyncio
+import functools
 import typer
-import yaml
-import json
 import logging
+import sys
 from pathlib import Path
+from typing import Iterator, TextIO
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.batch import BatchResult, run_batch
+from cockroachdb_mcp_client.budget import (
+    Budget,
+    Plan,
+    build_request,
+    inputs_within,
+    plan_batch,
+)
+from cockroachdb_mcp_client.cache import open_response_cache
+from cockroachdb_mcp_client.config import resolve_default
+from cockroachdb_mcp_client.metrics import (
+    InstrumentedProvider,
+    MetricsRecorder,
+    emit_report,
+)
 from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.sharding import merge_outputs, parse_shard, shard_of
 from rich import print
+from rich.console import Console
 
 app = typer.Typer()
 logger = logging.getLogger(__name__)
 
 
+def iter_inputs(inputs: Path) -> Iterator:
+    """
+    Yield inputs lazily from a text file (one per line), a JSONL file, or a
+    JSON array. JSONL records may be plain values or objects with an
+    ``input`` key. Only JSON arrays are loaded into memory at once.
+    """
+    suffix = inputs.suffix.lower()
+    if suffix == ".json":
+        yield from codec.loads_json(inputs.read_bytes())
+        return
+    with inputs.open() as f:
+        if suffix in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    record = codec.loads_json(line)
+                    yield record["input"] if isinstance(record, dict) else record
+        else:
+            for line in f:
+                if line.strip():
+                    yield line.strip()
+
+
+def completed_indices(output_file: Path) -> set:
+    """Indices of inputs that already have a successful record in ``output_file``."""
+    done = set()
+    if not output_file.exists():
+        return done
+    with output_file.open() as f:
+        for line in f:
+            try:
+                record = codec.loads_json(line)
+            except ValueError:
+                # A crash can leave a truncated final line; that input is rerun.
+                continue
+            if "error" not in record:
+                done.add(record["index"])
+    return done
+
+
+def _announce(items, stream: bool, console: Console):
+    """Print each input header as it is handed out, so streamed output follows it."""
+    for idx, input_text in items:
+        if stream:
+            console.print(f"\n[cyan]Input {idx + 1}:[/cyan] {input_text}")
+        yield idx, input_text
+
+
+def show_plan(plan: Plan, output: str, max_cost: float, max_tokens: int):
+    """Print a dry-run plan as JSON (for json/jsonl output) or text."""
+    covered = None
+    if max_tokens is not None or (max_cost is not None and plan.cost is not None):
+        covered = inputs_within(plan, max_cost, max_tokens)
+    if output in ("json", "jsonl"):
+        typer.echo(codec.dumps_json({**plan.to_dict(), "within_budget": covered}))
+        return
+    minutes, seconds = divmod(round(plan.seconds), 60)
+    cost = f"${plan.cost:.4f}" if plan.cost is not None else "unknown model price"
+    print(f"[bold]Plan for {plan.inputs} inputs on {plan.model}[/bold]")
+    print(f"  Prompt tokens: ~{plan.prompt_tokens:,}")
+    print(f"  Output tokens: up to {plan.output_tokens:,}")
+    print(f"  Cost: up to {cost}")
+    print(f"  Time: ~{minutes}m {seconds}s (limited by {plan.limited_by})")
+    if covered is not None:
+        print(f"  Budget: covers ~{covered} of {plan.inputs} inputs")
+
+
+def status_console(output: str) -> Console:
+    """Where progress goes: stderr when stdout carries JSON or JSONL."""
+    return Console(stderr=output in ("json", "jsonl"))
+
+
+def _emit(
+    item: BatchResult,
+    stream: bool,
+    output: str,
+    sink,
+    results: list,
+    console: Console,
+):
+    """Write one result to ``sink`` (flushed) and report it in ``output`` format."""
+    record = {"index": item.index, "input": item.input}
+    if item.ok:
+        record["output"] = item.output
+    else:
+        record["error"] = str(item.error)
+    if sink:
+        sink.write(codec.dumps_json(record) + "\n")
+        sink.flush()
+
+    if output == "jsonl":
+        typer.echo(codec.dumps_json(record))
+        return
+    if not stream:
+        console.print(f"\n[cyan]Input {item.index + 1}:[/cyan] {item.input}")
+    if not item.ok:
+        logger.warning(
+            "Failed to process input %d: %s", item.index + 1, str(item.error)
+        )
+        console.print(f"[red]❌ Failed on input {item.index + 1}:[/red] {item.error}")
+    else:
+        if not stream:
+            console.print(f"[green]Output:[/green] {item.output}")
+        if output == "json":
+            results.append({"input": item.input, "output": item.output})
+
+
+async def _simulate(
+    llm,
+    context: dict,
+    items,
+    concurrency: int,
+    stream: bool,
+    output: str,
+    sink: TextIO | None,
+    stop=None,
+):
+    """
+    Drive the whole batch from one event loop, emitting results in order.
+
+    Each record is appended to ``sink`` and flushed as soon as it completes.
+    Results are only accumulated in memory for ``--output json``. With
+    ``--output json`` or ``jsonl``, input headers and streamed text go to
+    stderr so stdout holds only the JSON.
+    """
+    results = []
+    console = status_console(output)
+    announced = _announce(items, stream, console)
+    stream_out = sys.stderr if console.stderr else None
+    batch = run_batch(llm, context, announced, concurrency, stream, stop, stream_out)
+    async for item in batch:
+        _emit(item, stream, output, sink, results, console)
+    return results
+
+
+def _simulate_batch_api(
+    llm,
+    provider: str,
+    context: dict,
+    pending_items,
+    output: str,
+    sink: TextIO | None,
+    job_ids: list[str],
+    state_file: Path | None,
+    poll_interval: float,
+):
+    """
+    Run the inputs as provider batch jobs, or pick up ``job_ids`` submitted
+    by an earlier run, and emit the results in input order once they finish.
+    """
+    from cockroachdb_mcp_client import batch_api
+
+    console = status_console(output)
+    say = console.print if output != "jsonl" else lambda *args: None
+    if not job_ids:
+        save = None
+        if state_file:
+            save = functools.partial(batch_api.save_jobs, state_file, provider)
+        job_ids = batch_api.submit(llm, context, pending_items(), on_submit=save)
+        if not job_ids:
+            return []
+        logger.info("Submitted batch jobs %s", ",".join(job_ids))
+        say(
+            f"[cyan]Submitted batch job(s) {','.join(job_ids)}; if interrupted, "
+            f"resume with --batch-job {','.join(job_ids)}[/cyan]"
+        )
+
+    last_state = {}
+
+    def on_poll(job_id, status):
+        if last_state.get(job_id) != status.state:
+            last_state[job_id] = status.state
+            say(
+                f"[dim]Batch {job_id}: {status.state} "
+                f"({status.completed + status.failed}/{status.total})[/dim]"
+            )
+
+    batch_api.wait(llm, job_ids, poll_interval, on_poll=on_poll)
+    collected = batch_api.collect(llm, job_ids)
+    results = []
+    for index, input_text in pending_items():
+        item = collected.get(index)
+        if item is None:
+            error = RuntimeError(f"No result in batch job(s) {','.join(job_ids)}")
+            result = BatchResult(index, input_text, error=error)
+        elif item.error is not None:
+            result = BatchResult(index, input_text, error=RuntimeError(item.error))
+        else:
+            result = BatchResult(index, input_text, item.output)
+        _emit(result, False, output, sink, results, console)
+    if state_file and state_file.exists():
+        state_file.unlink()
+    return results
+
+
 @app.command("context")
 def simulate_context(
     provider: str = typer.Option(..., "--provider", "-p", help="LLM provider to use"),
-    file: Path = typer.Option(..., "--file", "-f", help="Path to context YAML or JSON"),
+    file: Path = typer.Option(
+        None, "--file", "-f", help="Path to context YAML or JSON"
+    ),
+    context_id: str = typer.Option(
+        None,
+        "--context-id",
+        help="Use a context from the MCP server instead of --file (cached locally)",
+    ),
+    context_max_age: float = typer.Option(
+        None,
+        "--context-max-age",
+        help="Seconds a cached --context-id is used without revalidating",
+    ),
+    server: str = typer.Option(None, "--server", help="Override MCP server URL"),
+    token: str = typer.Option(None, "--token", help="Bearer token for auth"),
     inputs: Path = typer.Option(
-        ..., "--inputs", "-i", help="Text file or JSON array of inputs"
+        ..., "--inputs", "-i", help="Text file, JSONL file or JSON array of inputs"
+    ),
+    output: str = typer.Option("text", help="Output format: text, json or jsonl"),
+    output_file: Path = typer.Option(
+        None,
+        "--output-file",
+        "-o",
+        help="Append each result to this JSONL file as soon as it completes",
+    ),
+    resume: bool = typer.Option(
+        False, "--resume", help="Skip inputs already completed in --output-file"
+    ),
+    shard: str = typer.Option(
+        None,
+        "--shard",
+        help="Only run inputs in shard i of N (i/N, 0-based), chosen by a stable "
+        "hash of each input; combine the outputs with 'simulate merge'",
     ),
-    output: str = typer.Option("text", help="Output format: text or json"),
     stream: bool = typer.Option(False, "--stream", "-s", help="Stream each response"),
+    concurrency: int = typer.Option(
+        None,
+        "--concurrency",
+        "-c",
+        min=1,
+        help="Number of provider calls in flight [default: defaults.concurrency or 1]",
+    ),
+    cache: bool = typer.Option(
+        None,
+        "--cache/--no-cache",
+        help="Reuse cached responses for identical requests (default from config)",
+    ),
+    cache_ttl: float = typer.Option(
+        None, "--cache-ttl", help="Seconds a cached response stays valid"
+    ),
+    prompt_cache: bool = typer.Option(
+        None,
+        "--prompt-cache/--no-prompt-cache",
+        help="Mark the system prompt and examples as cacheable by the provider "
+        "(default from config)",
+    ),
+    examples: bool = typer.Option(
+        None,
+        "--examples/--no-examples",
+        help="Send the context's few-shot body.examples before each input "
+        "(default from config)",
+    ),
+    rpm: float = typer.Option(
+        None, "--rpm", help="Client-side limit on requests per minute"
+    ),
+    tpm: float = typer.Option(
+        None, "--tpm", help="Client-side limit on estimated tokens per minute"
+    ),
+    max_retries: int = typer.Option(
+        None, "--max-retries", help="Retries for throttled or failed provider calls"
+    ),
+    dry_run: bool = typer.Option(
+        False,
+        "--dry-run",
+        help="Estimate tokens, cost and time locally without calling the provider",
+    ),
+    budget: float = typer.Option(
+        None, "--budget", help="Stop scheduling inputs once this many USD are spent"
+    ),
+    token_budget: int = typer.Option(
+        None,
+        "--token-budget",
+        help="Stop scheduling inputs once this many tokens are used",
+    ),
+    batch_api: bool = typer.Option(
+        False,
+        "--batch-api",
+        help="Submit the inputs as provider batch jobs and wait for the results",
+    ),
+    batch_job: str = typer.Option(
+        None,
+        "--batch-job",
+        help="Collect the results of already submitted batch job IDs "
+        "(comma-separated) instead of submitting new ones",
+    ),
+    poll_interval: float = typer.Option(
+        10.0,
+        "--poll-interval",
+        help="Seconds before the first batch status poll; doubles up to 5 minutes",
+    ),
+    metrics: str = typer.Option(
+        None, "--metrics", help="Print a call metrics summary: table or json"
+    ),
+    metrics_file: Path = typer.Option(
+        None, "--metrics-file", help="Write metrics in Prometheus text format"
+    ),
     log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
 ):
     """
     Run a batch of inputs through a model context.
+
+    ``--budget`` and ``--token-budget`` count the usage reported by the
+    provider; calls already in flight when the cap is reached still finish.
+
+    ``--batch-api`` sends everything as provider batch jobs (OpenAI Batch,
+    Anthropic Message Batches) instead. The job IDs are kept next to
+    ``--output-file`` so ``--resume`` picks up unfinished jobs, or they can
+    be passed back with ``--batch-job``.
     """
     from cockroachdb_mcp_client.logging_config import setup_logging
 
     setup_logging(log_level)
+    batch_api = batch_api or batch_job is not None
+    if batch_api:
+        # Batch jobs run on the provider's side: nothing is sent or timed here.
+        conflicts = {
+            "--stream": stream,
+            "--budget": budget is not None,
+            "--token-budget": token_budget is not None,
+            "--concurrency": concurrency is not None,
+            "--metrics": metrics is not None,
+            "--metrics-file": metrics_file is not None,
+        }
+        given = [name for name, used in conflicts.items() if used]
+        if given:
+            print(
+                f"[red]❌ --batch-api cannot be combined with {', '.join(given)}.[/red]"
+            )
+            raise typer.Exit(code=1)
+    if concurrency is None:
+        # Streamed responses would interleave, so a configured default only
+        # applies without --stream; an explicit --concurrency is rejected below.
+        concurrency = 1 if stream else resolve_default("concurrency", 1)
 
     if provider not in PROVIDERS:
         print(f"[red]❌ Unknown provider:[/red] {provider}")
         raise typer.Exit(code=1)
 
-    if not file.exists() or not inputs.exists():
+    if batch_api and not PROVIDERS[provider].supports_batch_api:
+        print(f"[red]❌ Provider {provider} has no batch API; drop --batch-api.[/red]")
+        raise typer.Exit(code=1)
+
+    if (file is None) == (context_id is None):
+        print("[red]❌ Pass exactly one of --file or --context-id.[/red]")
+        raise typer.Exit(code=1)
+
+    if (file and not file.exists()) or not inputs.exists():
         print("[red]❌ Context or input file not found.[/red]")
         raise typer.Exit(code=1)
 
+    if stream and concurrency > 1:
+        print("[red]❌ --stream cannot be combined with --concurrency > 1.[/red]")
+        raise typer.Exit(code=1)
+
+    if resume and output_file is None:
+        print("[red]❌ --resume requires --output-file.[/red]")
+        raise typer.Exit(code=1)
+
+    try:
+        shard_index, shard_count = parse_shard(shard) if shard else (0, 1)
+    except ValueError as e:
+        print(f"[red]❌ {e}[/red]")
+        raise typer.Exit(code=1)
+
     try:
-        with file.open() as f:
-            context = (
-                yaml.safe_load(f) if file.suffix.endswith("yaml") else json.load(f)
+        if context_id:
+            from cockroachdb_mcp_client.context_cache import load_registry_context
+
+            context = load_registry_context(context_id, server, token, context_max_age)
+        else:
+            context = codec.load_file(file)
+
+        done = completed_indices(output_file) if resume else set()
+        if done:
+            print(
+                f"[cyan]Resuming: {len(done)} inputs already completed[/cyan]",
+                file=sys.stderr,
             )
 
-        with inputs.open() as f:
-            if inputs.suffix.endswith(".json"):
-                input_lines = json.load(f)
-            else:
-                input_lines = [line.strip() for line in f.readlines() if line.strip()]
+        def pending_items():
+            return (
+                (idx, input_text)
+                for idx, input_text in enumerate(iter_inputs(inputs))
+                if idx not in done
+                and (
+                    shard_count == 1 or shard_of(input_text, shard_count) == shard_index
+                )
+            )
+
+        items = pending_items()
 
         llm = PROVIDERS[provider]()
-        results = []
+        llm.cache = open_response_cache(cache, cache_ttl)
+        llm.rate_limit_overrides = {
+            k: v
+            for k, v in {"rpm": rpm, "tpm": tpm, "max_retries": max_retries}.items()
+            if v is not None
+        }
+        if prompt_cache is None:
+            prompt_cache = resolve_default("prompt_cache", False)
+        llm.prompt_cache = prompt_cache
+        if examples is None:
+            examples = resolve_default("examples", False)
+        llm.examples = examples
+        llm.example_messages(context)  # reject malformed examples up front
+        if dry_run:
+            texts = (input_text for _, input_text in items)
+            plan = plan_batch(llm, context, texts, concurrency)
+            show_plan(plan, output, budget, token_budget)
+            return
+
+        if batch_api:
+            from cockroachdb_mcp_client.batch_api import load_jobs, state_path
 
-        for idx, input_text in enumerate(input_lines):
-            print(f"\n[cyan]Input {idx + 1}:[/cyan] {input_text}")
+            state_file = state_path(output_file) if output_file else None
+            if batch_job:
+                job_ids = batch_job.split(",")
+            elif resume and state_file:
+                job_ids = load_jobs(state_file)
+            else:
+                job_ids = []
+            sink = output_file.open("a" if resume else "w") if output_file else None
             try:
-                result = llm.run(context, input_text, stream=stream)
-                if not stream:
-                    print(f"[green]Output:[/green] {result}")
-                    results.append({"input": input_text, "output": result})
-            except Exception as e:
-                logger.warning("Failed to process input %d: %s", idx + 1, str(e))
-                print(f"[red]❌ Failed on input {idx + 1}:[/red] {e}")
+                results = _simulate_batch_api(
+                    llm,
+                    provider,
+                    context,
+                    pending_items,
+                    output,
+                    sink,
+                    job_ids,
+                    state_file,
+                    poll_interval,
+                )
+            finally:
+                if sink:
+                    sink.close()
+            if output == "json":
+                typer.echo(codec.dumps_json(results, indent=True))
+            return
 
-        if output == "json" and not stream:
-            print(json.dumps(results, indent=2))
+        console = status_console(output)
+        cap = None
+        if budget is not None or token_budget is not None:
+            model = build_request(llm, context, "").get("model")
+            cap = Budget(model, budget, token_budget)
+        recorder = None
+        if metrics or metrics_file or cap or prompt_cache:
+            recorder = MetricsRecorder(on_call=cap.record if cap else None)
+            llm = InstrumentedProvider(llm, recorder)
+        stop = (lambda: cap.exhausted) if cap else None
+        sink = output_file.open("a" if resume else "w") if output_file else None
+        try:
+            results = asyncio.run(
+                _simulate(llm, context, items, concurrency, stream, output, sink, stop)
+            )
+        finally:
+            if sink:
+                sink.close()
+        if cap and cap.exhausted:
+            spent = f"{cap.tokens:,} tokens"
+            if cap.cost is not None:
+                spent += f", ${cap.cost:.4f}"
+            logger.warning("Budget reached after %d calls (%s)", cap.calls, spent)
+            if output != "jsonl":
+                console.print(
+                    f"[yellow]⚠️ Budget reached after {cap.calls} calls ({spent}); "
+                    "remaining inputs were not run.[/yellow]"
+                )
+        if llm.cache and output != "jsonl":
+            stats = llm.cache.stats()
+            console.print(
+                f"[dim]Cache: {stats['hits']} hits, {stats['misses']} misses[/dim]"
+            )
+
+        if prompt_cache and output != "jsonl":
+            rows = recorder.summary()
+            read = sum(row["cache_read_tokens"] for row in rows)
+            written = sum(row["cache_write_tokens"] for row in rows)
+            console.print(
+                f"[dim]Prompt cache: {read} tokens read, {written} written[/dim]"
+            )
+
+        if output == "json":
+            typer.echo(codec.dumps_json(results, indent=True))
+        if metrics or metrics_file:
+            emit_report(recorder, metrics, metrics_file, stderr=console.stderr)
 
     except Exception as e:
         logger.exception("Simulation failed")
         print(f"[red]❌ Simulation failed:[/red] {e}")
         raise typer.Exit(code=1)
+
+
+@app.command("merge")
+def merge_shards(
+    shard_files: list[Path] = typer.Argument(
+        ..., help="--output-file JSONL files written by 'simulate context --shard'"
+    ),
+    output_file: Path = typer.Option(
+        None, "--output-file", "-o", help="Write the merged JSONL here (default stdout)"
+    ),
+    inputs: Path = typer.Option(
+        None,
+        "--inputs",
+        "-i",
+        help="The full input file, to detect inputs no shard wrote at all",
+    ),
+    log_level: str = typer.Option("INFO", "--log-level", help="Set logging level"),
+):
+    """
+    Combine shard outputs in original input order and report the inputs that
+    are missing or failed. Resuming a run on the merged file re-runs exactly
+    those inputs.
+    """
+    from cockroachdb_mcp_client.logging_config import setup_logging
+
+    setup_logging(log_level)
+
+    absent = [
+        str(path) for path in shard_files + [inputs] if path and not path.exists()
+    ]
+    if absent:
+        print(f"[red]❌ File not found:[/red] {', '.join(absent)}", file=sys.stderr)
+        raise typer.Exit(code=1)
+
+    merged = merge_outputs(shard_files)
+    total = None
+    if inputs:
+        total = sum(1 for _ in iter_inputs(inputs))
+    failed = merged.failed
+    missing = merged.missing(total)
+
+    lines = (codec.dumps_json(record) + "\n" for record in merged.ordered())
+    if output_file:
+        with output_file.open("w") as f:
+            f.writelines(lines)
+    else:
+        sys.stdout.writelines(lines)
+
+    print(
+        f"[bold]Merged {len(merged.records)} results from {merged.files} files: "
+        f"{len(failed)} failed, {len(missing)} missing[/bold]",
+        file=sys.stderr,
+    )
+    if merged.skipped:
+        print(
+            f"[yellow]⚠️ Skipped {merged.skipped} lines that are not result "
+            "records (truncated, or without an index).[/yellow]",
+            file=sys.stderr,
+        )
+    for label, indices in (("Failed", failed), ("Missing", missing)):
+        if indices:
+            shown = ", ".join(str(i) for i in indices[:20])
+            more = f" (+{len(indices) - 20} more)" if len(indices) > 20 else ""
+            print(f"[yellow]{label} inputs:[/yellow] {shown}{more}", file=sys.stderr)
+    if failed or missing:
+        if output_file:
+            print(
+                "Re-run them with 'simulate context --resume "
+                f"--output-file {output_file}' and the same inputs.",
+                file=sys.stderr,
+            )
+        raise typer.Exit(code=1)
@@ -1,23 +1,261 @@
+import functools
 import os
-import yaml
+import threading
 from pathlib import Path
+from typing import Literal, Optional
+from pydantic import BaseModel, ConfigDict
 
 DEFAULT_SERVER = "http://localhost:8081"
+CONFIG_PATH = Path.home() / ".config" / "cockroachdb-mcp-client" / "config.yaml"
 
 
-def load_config():
-    config_path = Path.home() / ".config" / "cockroachdb-mcp-client" / "config.yaml"
-    if config_path.exists():
-        with config_path.open() as f:
-            return yaml.safe_load(f) or {}
+class Section(BaseModel):
+    # Unknown keys inside a known section are almost always typos.
+    model_config = ConfigDict(extra="forbid")
+
+
+class HTTPSettings(Section):
+    pool_size: Optional[int] = None
+    timeout: Optional[float] = None
+    gzip_requests: Optional[bool] = None
+    max_retries: Optional[int] = None
+    deadline: Optional[float] = None
+    breaker_threshold: Optional[int] = None
+    breaker_reset: Optional[float] = None
+    balance: Optional[Literal["round_robin", "least_latency"]] = None
+
+
+class ProviderSettings(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    api_key: Optional[str] = None
+
+
+class CacheSettings(Section):
+    enabled: Optional[bool] = None
+    ttl: Optional[float] = None
+    max_entries: Optional[int] = None
+    path: Optional[Path] = None
+
+
+class ContextCacheSettings(Section):
+    max_age: Optional[float] = None
+    path: Optional[Path] = None
+
+
+class RateLimitSettings(Section):
+    rpm: Optional[float] = None
+    tpm: Optional[float] = None
+    max_retries: Optional[int] = None
+    base_delay: Optional[float] = None
+    max_delay: Optional[float] = None
+
+
+class PriceSettings(Section):
+    """USD per million tokens."""
+
+    input: float
+    output: float
+
+
+class DefaultSettings(Section):
+    """Defaults for command options that are not given on the command line."""
+
+    concurrency: Optional[int] = None
+    workers: Optional[int] = None
+    create_concurrency: Optional[int] = None
+    prompt_cache: Optional[bool] = None
+    examples: Optional[bool] = None
+
+
+class Settings(BaseModel):
+    """
+    The validated configuration file for the active profile.
+
+    Top-level keys other than the known sections are kept as extras, so
+    third-party providers can read their own ``<config_section>: {api_key}``.
+    """
+
+    model_config = ConfigDict(extra="allow")
+
+    server: Optional[str] = None
+    servers: list[str] = []
+    token: Optional[str] = None
+    http: HTTPSettings = HTTPSettings()
+    openai: ProviderSettings = ProviderSettings()
+    anthropic: ProviderSettings = ProviderSettings()
+    cache: CacheSettings = CacheSettings()
+    context_cache: ContextCacheSettings = ContextCacheSettings()
+    rate_limits: dict[str, dict[str, RateLimitSettings]] = {}
+    pricing: dict[str, PriceSettings] = {}
+    defaults: DefaultSettings = DefaultSettings()
+
+    def provider(self, section: str) -> ProviderSettings:
+        value = getattr(self, section, None)
+        if value is None:
+            value = (self.model_extra or {}).get(section)
+        if isinstance(value, ProviderSettings):
+            return value
+        return ProviderSettings.model_validate(value or {})
+
+
+def config_path() -> Path:
+    return Path(os.getenv("MCP_CONFIG_FILE") or CONFIG_PATH)
+
+
+@functools.lru_cache(maxsize=None)
+def _read_config(path: Path) -> dict:
+    if path.exists():
+        from cockroachdb_mcp_client import codec
+
+        return codec.load_yaml(path.read_bytes()) or {}
     return {}
 
 
+def load_config() -> dict:
+    """The raw config file as a dict, read and parsed once per process."""
+    return _read_config(config_path())
+
+
+def _merge(base: dict, override: dict) -> dict:
+    merged = dict(base)
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _settings(raw: dict, profile: str | None) -> Settings:
+    raw = dict(raw)
+    profiles = raw.pop("profiles", None) or {}
+    profile = profile or raw.get("profile")
+    raw.pop("profile", None)
+    if profile:
+        if profile not in profiles:
+            known = ", ".join(sorted(profiles)) or "none defined"
+            raise ValueError(f"Unknown config profile {profile!r} ({known})")
+        raw = _merge(raw, profiles[profile] or {})
+    return Settings.model_validate(raw)
+
+
+# (raw config, profile, settings) of the last validation.
+_validated = (None, None, None)
+_validated_lock = threading.Lock()
+# Profile chosen with --profile; a plain global rather than a ContextVar so
+# the worker threads of bulk commands see it too.
+_selected_profile = None
+
+
+def select_profile(profile: str | None):
+    """Use ``profile`` instead of ``MCP_PROFILE``/``profile:``; None undoes it."""
+    global _selected_profile
+    _selected_profile = profile
+
+
+def get_settings() -> Settings:
+    """
+    The typed settings for the active profile (``--profile``, ``MCP_PROFILE``
+    or ``profile:`` in the file). Parsed and validated once; environment
+    variables are still consulted on every ``resolve_*`` call and take
+    precedence.
+    """
+    global _validated
+    raw = load_config()
+    profile = _selected_profile or os.getenv("MCP_PROFILE") or None
+    with _validated_lock:
+        if _validated[0] is not raw or _validated[1] != profile:
+            _validated = (raw, profile, _settings(raw, profile))
+        return _validated[2]
+
+
+def reload_config():
+    """Forget the parsed config so the next lookup re-reads the file."""
+    _read_config.cache_clear()
+
+
 def resolve_server(cli_value: str = None) -> str:
     if cli_value:
         return cli_value
-    return os.getenv("MCP_SERVER_URL") or load_config().get("server") or DEFAULT_SERVER
+    return os.getenv("MCP_SERVER_URL") or get_settings().server or DEFAULT_SERVER
+
+
+def resolve_servers(cli_value: str = None) -> list[str]:
+    """
+    All MCP server replicas to use: a comma-separated ``--server`` or
+    ``MCP_SERVER_URLS``, then ``MCP_SERVER_URL``, then ``servers:`` or
+    ``server:`` in the config file.
+    """
+    value = cli_value or os.getenv("MCP_SERVER_URLS")
+    if not value and not os.getenv("MCP_SERVER_URL"):
+        value = get_settings().servers
+    if not value:
+        value = resolve_server()
+    if isinstance(value, str):
+        value = value.split(",")
+    return [url.strip().rstrip("/") for url in value if url and url.strip()]
 
 
 def resolve_token(cli_value: str = None) -> str | None:
-    return cli_value or os.getenv("MCP_API_TOKEN") or load_config().get("token")
+    return cli_value or os.getenv("MCP_API_TOKEN") or get_settings().token
+
+
+def resolve_http_options() -> dict:
+    """Connection pool, timeout and retry settings for the MCP server client."""
+    options = get_settings().http.model_dump(exclude_none=True)
+    env = {
+        "pool_size": ("MCP_POOL_SIZE", int),
+        "timeout": ("MCP_TIMEOUT", float),
+        "balance": ("MCP_BALANCE", str),
+        "gzip_requests": (
+            "MCP_GZIP_REQUESTS",
+            lambda v: v.lower() in ("1", "true", "yes"),
+        ),
+        "max_retries": ("MCP_MAX_RETRIES", int),
+        "deadline": ("MCP_DEADLINE", float),
+    }
+    for key, (name, convert) in env.items():
+        if os.getenv(name):
+            options[key] = convert(os.environ[name])
+    return options
+
+
+def resolve_provider_key(section: str) -> str | None:
+    """The ``api_key`` of a provider's config section, if set."""
+    return get_settings().provider(section).api_key if section else None
+
+
+def resolve_cache_options() -> dict:
+    """Response cache settings from the ``cache:`` config section."""
+    return get_settings().cache.model_dump(exclude_none=True)
+
+
+def resolve_context_cache_options() -> dict:
+    """Local context cache settings from the ``context_cache:`` config section."""
+    return get_settings().context_cache.model_dump(exclude_none=True)
+
+
+def resolve_default(name: str, fallback):
+    """A command option default from the ``defaults:`` config section."""
+    value = getattr(get_settings().defaults, name)
+    return fallback if value is None else value
+
+
+def resolve_rate_limit(provider: str, model: str) -> dict:
+    """
+    Rate-limit settings (rpm, tpm, max_retries, ...) for a provider and model,
+    merging ``rate_limits.<provider>.default`` with the model-specific entry.
+    """
+    limits = get_settings().rate_limits.get(provider, {})
+    merged = {}
+    for key in ("default", model):
+        if key in limits:
+            merged.update(limits[key].model_dump(exclude_none=True))
+    return merged
+
+
+def resolve_price(model: str) -> tuple[float, float] | None:
+    """``(input, output)`` USD per million tokens from ``pricing.<model>``."""
+    price = get_settings().pricing.get(model)
+    return (price.input, price.output) if price else None
@@ -0,0 +1,196 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+import requests
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.cache import DEFAULT_CACHE_DIR
+from cockroachdb_mcp_client.client import MCPClient, get_client
+from cockroachdb_mcp_client.config import resolve_context_cache_options
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = DEFAULT_CACHE_DIR / "contexts.sqlite"
+DEFAULT_MAX_AGE = 60.0
+
+
+def content_hash(context: dict) -> str:
+    return hashlib.sha256(json.dumps(context, sort_keys=True).encode()).hexdigest()
+
+
+class ContextCache:
+    """
+    Local content-addressed cache of contexts fetched from MCP servers.
+
+    Context documents are stored once per content hash; a ref table maps each
+    (server, context id) to its current hash, ETag, ``created_at`` and the
+    time it was last validated. Refs validated within ``max_age`` seconds are
+    served without a round trip. Older refs are revalidated with
+    ``If-None-Match``, and served stale when the server cannot be reached.
+    """
+
+    def __init__(self, path: Path = None, max_age: float = DEFAULT_MAX_AGE):
+        self.path = Path(path) if path else DEFAULT_PATH
+        self.max_age = max_age
+        self.counts = {"fresh": 0, "revalidated": 0, "fetched": 0, "stale": 0}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS objects ("
+            "hash TEXT PRIMARY KEY, document TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS refs ("
+            "server TEXT NOT NULL, context_id TEXT NOT NULL, hash TEXT NOT NULL, "
+            "etag TEXT, created_at TEXT, validated REAL NOT NULL, "
+            "PRIMARY KEY (server, context_id))"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, outcome: str):
+        with self._lock:
+            self.counts[outcome] += 1
+
+    def lookup(self, server: str, context_id: str) -> dict | None:
+        """The cached ref (with its ``context``) for a server and id, if any."""
+        row = (
+            self._connect()
+            .execute(
+                "SELECT refs.hash, etag, created_at, validated, document "
+                "FROM refs JOIN objects USING (hash) "
+                "WHERE server = ? AND context_id = ?",
+                (server, context_id),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        digest, etag, created_at, validated, document = row
+        return {
+            "hash": digest,
+            "etag": etag,
+            "created_at": created_at,
+            "validated": validated,
+            "context": codec.loads_json(document),
+        }
+
+    def store(self, server: str, context_id: str, context: dict, etag: str = None):
+        digest = content_hash(context)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR IGNORE INTO objects VALUES (?, ?)",
+                (digest, codec.encode_json(context).decode()),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO refs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    server,
+                    context_id,
+                    digest,
+                    etag,
+                    context.get("created_at"),
+                    time.time(),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM refs)"
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return digest
+
+    def touch(self, server: str, context_id: str):
+        self._connect().execute(
+            "UPDATE refs SET validated = ? WHERE server = ? AND context_id = ?",
+            (time.time(), server, context_id),
+        )
+
+    def forget(self, server: str, context_id: str):
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM refs WHERE server = ? AND context_id = ?",
+            (server, context_id),
+        )
+        conn.execute("DELETE FROM objects WHERE hash NOT IN (SELECT hash FROM refs)")
+
+    def fetch(self, client: MCPClient, context_id: str, max_age: float = None) -> dict:
+        """
+        Return a context by id, going to the server only when the cached copy
+        is older than ``max_age`` seconds (``0`` always revalidates).
+
+        Raises ``requests.HTTPError`` for a 404 or for other errors when
+        nothing is cached.
+        """
+        server = client.base_url
+        max_age = self.max_age if max_age is None else max_age
+        cached = self.lookup(server, context_id)
+        if cached and time.time() - cached["validated"] < max_age:
+            self._count("fresh")
+            return cached["context"]
+
+        headers = {"If-None-Match": cached["etag"]} if cached and cached["etag"] else {}
+        try:
+            response = client.get(f"/contexts/{context_id}", headers=headers)
+            if response.status_code >= 500:
+                response.raise_for_status()
+        except requests.RequestException as e:
+            if cached is None:
+                raise
+            logger.warning(
+                "Using cached context %s; could not revalidate: %s", context_id, e
+            )
+            self._count("stale")
+            return cached["context"]
+
+        if response.status_code == 304 and cached:
+            self.touch(server, context_id)
+            self._count("revalidated")
+            return cached["context"]
+        if response.status_code == 404:
+            self.forget(server, context_id)
+        response.raise_for_status()
+
+        context = codec.loads_json(response.content)
+        # Servers without ETags send the full document every time; an unchanged
+        # document hashes to the stored object, so only the ref is updated.
+        self.store(server, context_id, context, response.headers.get("ETag"))
+        self._count("fetched")
+        return context
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def open_context_cache(max_age: float | None = None) -> ContextCache:
+    """Open the context cache using the ``context_cache:`` config section."""
+    options = resolve_context_cache_options()
+    if max_age is None:
+        max_age = float(options.get("max_age", DEFAULT_MAX_AGE))
+    return ContextCache(path=options.get("path"), max_age=max_age)
+
+
+def load_registry_context(
+    context_id: str,
+    server: str = None,
+    token: str = None,
+    max_age: float | None = None,
+) -> dict:
+    """Resolve a context id on the MCP server through the local context cache."""
+    return open_context_cache(max_age).fetch(get_client(server, token), context_id)
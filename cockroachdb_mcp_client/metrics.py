@@ -0,0 +1,261 @@
+import json
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# The call currently being measured, so code deep inside a provider can attach
+# token counts, retries or first-token time without changing return types.
+_current_call: ContextVar = ContextVar("current_call", default=None)
+
+_UUID = re.compile(r"[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,}")
+
+
+def report(**fields):
+    """Attach ``fields`` (tokens_in, tokens_out, retries, ...) to the current call."""
+    call = _current_call.get()
+    if call is not None:
+        for key, value in fields.items():
+            numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+            if numeric and key in call:
+                call[key] += value
+            else:
+                call[key] = value
+
+
+def mark_first_token():
+    """Record the time-to-first-token of the current streaming call, once."""
+    call = _current_call.get()
+    if call is not None and call.get("first_token_at") is None:
+        call["first_token_at"] = time.perf_counter()
+
+
+def percentile(values: list, q: float) -> float:
+    """Linear-interpolated percentile of ``values`` (0.0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+class MetricsRecorder:
+    """Collects per-call latency, token and retry metrics for one CLI run."""
+
+    def __init__(self, on_call=None):
+        self.calls = []
+        #: Called with each finished call's record, e.g. ``Budget.record``.
+        self.on_call = on_call
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, kind: str, name: str):
+        call = {
+            "kind": kind,
+            "name": name,
+            "tokens_in": 0,
+            "tokens_out": 0,
+            "cache_read_tokens": 0,
+            "cache_write_tokens": 0,
+            "retries": 0,
+            "error": False,
+            "first_token_at": None,
+        }
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        try:
+            yield call
+        except BaseException:
+            call["error"] = True
+            raise
+        finally:
+            end = time.perf_counter()
+            _current_call.reset(token)
+            call["latency"] = end - start
+            first = call.pop("first_token_at")
+            call["ttft"] = (first - start) if first is not None else call["latency"]
+            call["ended"] = end
+            with self._lock:
+                self.calls.append(call)
+            if self.on_call:
+                self.on_call(call)
+
+    def summary(self) -> list:
+        """One summary row per (kind, name) with latency percentiles and rates."""
+        groups = {}
+        with self._lock:
+            calls = list(self.calls)
+        for call in calls:
+            groups.setdefault((call["kind"], call["name"]), []).append(call)
+
+        rows = []
+        for (kind, name), group in sorted(groups.items()):
+            latencies = [c["latency"] for c in group]
+            elapsed = max(c["ended"] for c in group) - self.started
+            errors = sum(c["error"] for c in group)
+            row = {
+                "kind": kind,
+                "name": name,
+                "calls": len(group),
+                "errors": errors,
+                "error_rate": errors / len(group),
+                "throughput": len(group) / elapsed if elapsed > 0 else 0.0,
+                "tokens_in": sum(c["tokens_in"] for c in group),
+                "tokens_out": sum(c["tokens_out"] for c in group),
+                "cache_read_tokens": sum(c["cache_read_tokens"] for c in group),
+                "cache_write_tokens": sum(c["cache_write_tokens"] for c in group),
+                "retries": sum(c["retries"] for c in group),
+                "ttft_p50": percentile([c["ttft"] for c in group], 0.5),
+            }
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}"] = percentile(latencies, q)
+            rows.append(row)
+        return rows
+
+    def to_prometheus(self) -> str:
+        """Render the summary in the Prometheus text exposition format."""
+        lines = [
+            "# HELP mcp_client_call_latency_seconds Call latency by kind and name.",
+            "# TYPE mcp_client_call_latency_seconds summary",
+        ]
+        counters = []
+        with self._lock:
+            calls = list(self.calls)
+        for row in self.summary():
+            labels = f'kind="{row["kind"]}",name="{row["name"]}"'
+            for q in QUANTILES:
+                lines.append(
+                    f'mcp_client_call_latency_seconds{{{labels},quantile="{q}"}} '
+                    f'{row[f"p{int(q * 100)}"]:.6f}'
+                )
+            total = sum(
+                c["latency"]
+                for c in calls
+                if (c["kind"], c["name"]) == (row["kind"], row["name"])
+            )
+            lines.append(f"mcp_client_call_latency_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(
+                f"mcp_client_call_latency_seconds_count{{{labels}}} {row['calls']}"
+            )
+            counters.append((labels, row))
+
+        for metric, key, help_text in (
+            ("mcp_client_call_errors_total", "errors", "Failed calls."),
+            ("mcp_client_retries_total", "retries", "Retried attempts."),
+            ("mcp_client_tokens_in_total", "tokens_in", "Prompt tokens."),
+            ("mcp_client_tokens_out_total", "tokens_out", "Completion tokens."),
+            (
+                "mcp_client_cache_read_tokens_total",
+                "cache_read_tokens",
+                "Prompt tokens read from the provider's prompt cache.",
+            ),
+            (
+                "mcp_client_cache_write_tokens_total",
+                "cache_write_tokens",
+                "Prompt tokens written to the provider's prompt cache.",
+            ),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for labels, row in counters:
+                lines.append(f"{metric}{{{labels}}} {row[key]}")
+        return "\n".join(lines) + "\n"
+
+
+def http_label(method: str, path: str) -> str:
+    """Low-cardinality label for an MCP request, e.g. ``GET /contexts/{id}``."""
+    return f"{method} {_UUID.sub('{id}', path.split('?')[0])}"
+
+
+class InstrumentedProvider:
+    """
+    Wraps an LLM provider so every ``run``/``arun`` call is measured.
+
+    Attribute access falls through to the wrapped provider, so it can be used
+    anywhere a provider is expected.
+    """
+
+    def __init__(self, llm, recorder: MetricsRecorder):
+        self._llm = llm
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._llm, name)
+
+    def _label(self, context: dict) -> str:
+        return (context.get("body") or {}).get("model") or type(self._llm).__name__
+
+    def run(self, context: dict, input_text: str, **kwargs) -> str:
+        with self._recorder.measure("llm", self._label(context)):
+            return self._llm.run(context, input_text, **kwargs)
+
+    async def arun(self, context: dict, input_text: str, **kwargs) -> str:
+        with self._recorder.measure("llm", self._label(context)):
+            return await self._llm.arun(context, input_text, **kwargs)
+
+
+def emit_report(
+    recorder: MetricsRecorder,
+    fmt: str,
+    prometheus_file: Path = None,
+    stderr: bool = False,
+):
+    """
+    Print the metrics summary as a table or JSON and optionally export it.
+
+    With ``stderr`` the summary is printed there, for commands whose stdout
+    carries JSON or JSONL results.
+    """
+    rows = recorder.summary()
+    if fmt == "json":
+        print(json.dumps(rows, indent=2), file=sys.stderr if stderr else sys.stdout)
+    elif fmt == "table":
+        from rich.console import Console
+        from rich.table import Table
+
+        table = Table(title="Call metrics")
+        for column in (
+            "kind",
+            "name",
+            "calls",
+            "errors",
+            "p50",
+            "p95",
+            "p99",
+            "ttft p50",
+            "calls/s",
+            "tokens in",
+            "tokens out",
+            "cache read",
+            "cache write",
+            "retries",
+        ):
+            table.add_column(column)
+        for row in rows:
+            table.add_row(
+                row["kind"],
+                row["name"],
+                str(row["calls"]),
+                f"{row['errors']} ({row['error_rate']:.1%})",
+                f"{row['p50'] * 1000:.0f}ms",
+                f"{row['p95'] * 1000:.0f}ms",
+                f"{row['p99'] * 1000:.0f}ms",
+                f"{row['ttft_p50'] * 1000:.0f}ms",
+                f"{row['throughput']:.2f}",
+                str(row["tokens_in"]),
+                str(row["tokens_out"]),
+                str(row["cache_read_tokens"]),
+                str(row["cache_write_tokens"]),
+                str(row["retries"]),
+            )
+        Console(stderr=stderr).print(table)
+    if prometheus_file:
+        prometheus_file.write_text(recorder.to_prometheus())
@@ -1,45 +1,176 @@
-from .base import BaseLLMProvider
-import anthropic
-import os
-from cockroachdb_mcp_client.config import load_config
+from typing import AsyncIterator, Iterator, TextIO
+from .base import SDKProvider
+from cockroachdb_mcp_client.batch_api import BatchItem, BatchStatus
+from cockroachdb_mcp_client import metrics
 
+# The Messages API requires max_tokens; contexts can set their own.
+DEFAULT_MAX_TOKENS = 1024
+EPHEMERAL = {"type": "ephemeral"}
 
-class AnthropicProvider(BaseLLMProvider):
-    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
-        api_key = os.getenv("ANTHROPIC_API_KEY") or load_config().get(
-            "anthropic", {}
-        ).get("api_key")
 
-        if not api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY not set.")
+class AnthropicProvider(SDKProvider):
+    api_key_env = "ANTHROPIC_API_KEY"
+    config_section = "anthropic"
+    supports_batch_api = True
+    max_batch_requests = 100_000
 
-        client = anthropic.Anthropic(api_key=api_key)
+    def create_client(self):
+        import anthropic
 
-        model = context.get("body", {}).get("model", "claude-3-opus-20240229")
-        system_msg = context.get("body", {}).get(
-            "description", "You are a helpful assistant."
+        return anthropic.Anthropic(api_key=self.api_key, max_retries=0)
+
+    def create_async_client(self):
+        import anthropic
+
+        return anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=0)
+
+    def build_request(
+        self, context: dict, input_text: str, history: list = None
+    ) -> dict:
+        body = context.get("body", {})
+        model = body.get("model", "claude-3-opus-20240229")
+        system_msg = body.get("description", "You are a helpful assistant.")
+        examples = self.example_messages(context)
+        if self.prompt_cache:
+            # Cache breakpoints after the system prompt and the last example.
+            system_msg = [
+                {"type": "text", "text": system_msg, "cache_control": EPHEMERAL}
+            ]
+            if examples:
+                last = examples[-1]
+                last["content"] = [
+                    {
+                        "type": "text",
+                        "text": last["content"],
+                        "cache_control": EPHEMERAL,
+                    }
+                ]
+        return {
+            "model": model,
+            "max_tokens": body.get("max_tokens", DEFAULT_MAX_TOKENS),
+            "system": system_msg,
+            "messages": [
+                *examples,
+                *(history or []),
+                {"role": "user", "content": input_text},
+            ],
+        }
+
+    def _delta(self, chunk) -> str | None:
+        if chunk.type == "message_start":
+            # Output tokens come from message_delta, whose count is cumulative.
+            self.report_usage(chunk.message.usage, "input_tokens")
+        elif chunk.type == "message_delta":
+            metrics.report(tokens_out=getattr(chunk.usage, "output_tokens", 0) or 0)
+        elif chunk.type == "content_block_delta":
+            return chunk.delta.text
+
+    def stream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> Iterator[str]:
+        request = self.build_request(context, input_text, history)
+        events = self.call_with_retry(
+            request, lambda: self.client.messages.create(**request, stream=True)
+        )
+        for chunk in events:
+            delta = self._delta(chunk)
+            if delta:
+                yield delta
+
+    async def astream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> AsyncIterator[str]:
+        request = self.build_request(context, input_text, history)
+        events = await self.acall_with_retry(
+            request,
+            lambda: self.async_client.messages.create(**request, stream=True),
+        )
+        async for chunk in events:
+            delta = self._delta(chunk)
+            if delta:
+                yield delta
+
+    def run(
+        self,
+        context: dict,
+        input_text: str,
+        stream: bool = False,
+        history: list = None,
+        out: TextIO = None,
+    ) -> str:
+        if stream:
+            return self.stream_text(context, input_text, history, out)
+        request = self.build_request(context, input_text, history)
+        key, cached = self.cache_lookup(request)
+        if cached is not None:
+            return cached
+        response = self.call_with_retry(
+            request, lambda: self.client.messages.create(**request)
         )
-        user_prompt = input_text
+        self.report_usage(
+            getattr(response, "usage", None), "input_tokens", "output_tokens"
+        )
+        text = response.content[0].text.strip()
+        self.cache_store(key, text)
+        return text
 
+    async def arun(
+        self,
+        context: dict,
+        input_text: str,
+        stream: bool = False,
+        history: list = None,
+        out: TextIO = None,
+    ) -> str:
         if stream:
-            stream_resp = client.messages.create(
-                model=model,
-                max_tokens=1024,
-                system=system_msg,
-                messages=[{"role": "user", "content": user_prompt}],
-                stream=True,
-            )
-            # stream is a generator
-            for chunk in stream_resp:
-                if chunk.type == "content_block_delta":
-                    print(chunk.delta.text or "", end="", flush=True)
-            print()
-            return ""
-        else:
-            response = client.messages.create(
-                model=model,
-                max_tokens=1024,
-                system=system_msg,
-                messages=[{"role": "user", "content": user_prompt}],
-            )
-            return response.content[0].text.strip()
+            return await self.astream_text(context, input_text, history, out)
+        request = self.build_request(context, input_text, history)
+        key, cached = await self.acache_lookup(request)
+        if cached is not None:
+            return cached
+        response = await self.acall_with_retry(
+            request, lambda: self.async_client.messages.create(**request)
+        )
+        self.report_usage(
+            getattr(response, "usage", None), "input_tokens", "output_tokens"
+        )
+        text = response.content[0].text.strip()
+        await self.acache_store(key, text)
+        return text
+
+    def submit_batch(self, requests: list[tuple[str, dict]]) -> str:
+        job = self.call_with_retry(
+            {},
+            lambda: self.client.messages.batches.create(
+                requests=[{"custom_id": cid, "params": r} for cid, r in requests]
+            ),
+        )
+        return job.id
+
+    def batch_status(self, job_id: str) -> BatchStatus:
+        job = self.call_with_retry(
+            {}, lambda: self.client.messages.batches.retrieve(job_id)
+        )
+        counts = job.request_counts
+        failed = counts.errored + counts.canceled + counts.expired
+        return BatchStatus(
+            job.processing_status == "ended",
+            job.processing_status,
+            counts.succeeded,
+            failed,
+            counts.processing + counts.succeeded + failed,
+        )
+
+    def batch_results(self, job_id: str) -> Iterator[BatchItem]:
+        entries = self.call_with_retry(
+            {}, lambda: self.client.messages.batches.results(job_id)
+        )
+        for entry in entries:
+            result = entry.result
+            if result.type == "succeeded":
+                text = result.message.content[0].text.strip()
+                yield BatchItem(entry.custom_id, output=text)
+                continue
+            error = getattr(getattr(result, "error", None), "error", None)
+            message = getattr(error, "message", None) or result.type
+            yield BatchItem(entry.custom_id, error=message)
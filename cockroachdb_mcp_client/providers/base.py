@@ -1,10 +1,305 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
+import threading
+import time
 from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator, TextIO
+from cockroachdb_mcp_client.cache import ResponseCache, request_key
+from cockroachdb_mcp_client import metrics
+from cockroachdb_mcp_client.config import resolve_provider_key, resolve_rate_limit
+from cockroachdb_mcp_client.ratelimit import RateLimiter, estimate_request_tokens
+from cockroachdb_mcp_client.streaming import StreamSink
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts(function, name: str) -> bool:
+    """Whether ``function`` takes the keyword argument ``name``."""
+    params = inspect.signature(function).parameters
+    return name in params or any(
+        p.kind is inspect.Parameter.VAR_KEYWORD for p in params.values()
+    )
 
 
 class BaseLLMProvider(ABC):
+    #: Environment variable and config section holding the provider API key.
+    api_key_env: str = None
+    config_section: str = None
+    #: Whether the provider implements ``submit_batch``, ``batch_status`` and
+    #: ``batch_results`` for ``simulate --batch-api`` (see ``batch_api``).
+    supports_batch_api: bool = False
+    #: Most requests one provider batch job accepts.
+    max_batch_requests: int = 50_000
+
+    def __init__(self, api_key: str = None, cache: ResponseCache = None):
+        self._api_key = api_key
+        self.cache = cache
+        self._client_lock = threading.Lock()
+        self._limiters = {}
+        #: Settings applied on top of the ``rate_limits`` config for every model.
+        self.rate_limit_overrides = {}
+        #: Mark the context's static prefix as cacheable by the provider.
+        self.prompt_cache = False
+        #: Send the context's few-shot ``body.examples`` ahead of each input.
+        self.examples = False
+
+    @property
+    def api_key(self) -> str:
+        """The provider API key, resolved once from env or config."""
+        if self._api_key is None:
+            self._api_key = os.getenv(self.api_key_env) or resolve_provider_key(
+                self.config_section
+            )
+            if not self._api_key:
+                raise RuntimeError(f"{self.api_key_env} not set.")
+        return self._api_key
+
+    def cache_lookup(self, request: dict) -> tuple[str | None, str | None]:
+        """Return ``(key, cached_text)`` for ``request``; both None without a cache."""
+        if getattr(self, "cache", None) is None:
+            return None, None
+        key = request_key(self.config_section or type(self).__name__, request)
+        return key, self.cache.get(key)
+
+    def cache_store(self, key: str | None, text: str):
+        if key is not None:
+            self.cache.put(key, text)
+
+    async def acache_lookup(self, request: dict) -> tuple[str | None, str | None]:
+        """
+        ``cache_lookup`` for coroutines. The SQLite read runs on a worker
+        thread so it does not stall the other calls sharing the event loop.
+        """
+        if getattr(self, "cache", None) is None:
+            return None, None
+        return await asyncio.to_thread(self.cache_lookup, request)
+
+    async def acache_store(self, key: str | None, text: str):
+        if key is not None:
+            await asyncio.to_thread(self.cache_store, key, text)
+
+    def limiter_for(self, model: str) -> RateLimiter:
+        """The rate limiter shared by every call to ``model`` on this provider."""
+        with self._client_lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                settings = resolve_rate_limit(self.config_section, model)
+                settings.update(self.rate_limit_overrides)
+                limiter = self._limiters[model] = RateLimiter(**settings)
+            return limiter
+
+    def call_with_retry(self, request: dict, fn):
+        """Call ``fn()`` under the model's rate limit, retrying throttled calls."""
+        limiter = self.limiter_for(request.get("model"))
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        while True:
+            limiter.acquire(tokens)
+            try:
+                return fn()
+            except Exception as e:
+                delay = limiter.backoff(e, attempt)
+                if delay is None:
+                    raise
+                metrics.report(retries=1)
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall_with_retry(self, request: dict, fn):
+        """Coroutine version of ``call_with_retry``; ``fn()`` returns an awaitable."""
+        limiter = self.limiter_for(request.get("model"))
+        tokens = estimate_request_tokens(request)
+        attempt = 0
+        while True:
+            await limiter.aacquire(tokens)
+            try:
+                return await fn()
+            except Exception as e:
+                delay = limiter.backoff(e, attempt)
+                if delay is None:
+                    raise
+                metrics.report(retries=1)
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def example_messages(self, context: dict) -> list:
+        """
+        Few-shot ``body.examples`` (``{input, output}``) as alternating turns,
+        or nothing unless ``examples`` is enabled.
+
+        Raises ``ValueError`` when the examples are not in that shape.
+        """
+        if not self.examples:
+            return []
+        examples = (context.get("body") or {}).get("examples") or []
+        if not isinstance(examples, list) or not all(
+            isinstance(e, dict) and {"input", "output"} <= e.keys() for e in examples
+        ):
+            raise ValueError("body.examples must be a list of {input, output} objects")
+        messages = []
+        for example in examples:
+            messages.append({"role": "user", "content": example["input"]})
+            messages.append({"role": "assistant", "content": example["output"]})
+        return messages
+
+    @staticmethod
+    def report_usage(usage, tokens_in: str, tokens_out: str = None):
+        """
+        Attach an SDK ``usage`` object's token counts to the measured call.
+
+        ``tokens_in`` counts every prompt token, including those read from or
+        written to the provider's prompt cache, which are also reported as
+        ``cache_read_tokens`` and ``cache_write_tokens``. Without a
+        ``tokens_out`` field no completion tokens are reported.
+        """
+        if usage is None:
+            return
+        # Anthropic reports cached prompt tokens next to input_tokens; OpenAI
+        # includes them in prompt_tokens and details the cached share.
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        metrics.report(
+            tokens_in=(getattr(usage, tokens_in, 0) or 0) + read + written,
+            tokens_out=(getattr(usage, tokens_out, 0) or 0) if tokens_out else 0,
+            cache_read_tokens=read + (getattr(details, "cached_tokens", None) or 0),
+            cache_write_tokens=written,
+        )
+
+    def stream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> Iterator[str]:
+        """
+        Yield the response text as deltas while it is generated.
+
+        The default yields the whole response of ``run`` as a single delta,
+        for providers without a streaming API.
+        """
+        kwargs = {"history": history} if history else {}
+        yield self.run(context, input_text, **self._run_kwargs(kwargs))
+
+    async def astream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> AsyncIterator[str]:
+        """Async version of ``stream``; the default yields ``arun`` in one delta."""
+        kwargs = {"history": history} if history else {}
+        yield await self.arun(context, input_text, **kwargs)
+
+    def stream_text(
+        self, context: dict, input_text: str, history: list = None, out: TextIO = None
+    ) -> str:
+        """
+        Stream a response through a ``StreamSink`` to ``out`` and return its
+        text, stripped like a non-streamed reply.
+        """
+        text = StreamSink(out).consume(self.stream(context, input_text, history))
+        return text.strip()
+
+    async def astream_text(
+        self, context: dict, input_text: str, history: list = None, out: TextIO = None
+    ) -> str:
+        deltas = self.astream(context, input_text, history)
+        return (await StreamSink(out).aconsume(deltas)).strip()
+
+    @property
+    def supports_history(self) -> bool:
+        """Whether calls accept earlier turns of a conversation as ``history``."""
+        if type(self).arun is BaseLLMProvider.arun:
+            return _accepts(type(self).run, "history")
+        return _accepts(type(self).arun, "history")
+
+    def _run_kwargs(self, kwargs: dict) -> dict:
+        """The subset of ``kwargs`` this provider's ``run`` declares."""
+        return {k: v for k, v in kwargs.items() if _accepts(type(self).run, k)}
+
     @abstractmethod
-    def run(self, context: dict, input_text: str) -> str:
+    def run(
+        self,
+        context: dict,
+        input_text: str,
+        stream: bool = False,
+        history: list = None,
+        out: TextIO = None,
+    ) -> str:
         """
         Run an inference call against the provider with the given context and input.
+
+        ``history`` holds earlier turns as chat messages. With ``stream`` the
+        response is also written to ``out`` as it is generated. Providers
+        written against the original ``run(context, input_text)`` signature
+        keep working: the default ``arun`` and ``stream`` only pass the
+        keywords ``run`` declares.
         """
         pass
+
+    async def arun(self, context: dict, input_text: str, **kwargs) -> str:
+        """
+        Coroutine version of ``run``.
+
+        The default adapts a synchronous ``run`` by executing it on the event
+        loop's default executor, so third-party providers work unchanged.
+        When ``run`` cannot stream to ``out`` (it takes no ``stream`` or no
+        ``out`` argument) a streamed call writes the whole response there at
+        once. Providers with an asyncio SDK override this with a native
+        version.
+        """
+        run = type(self).run
+        streams = _accepts(run, "stream") and (
+            kwargs.get("out") is None or _accepts(run, "out")
+        )
+        if kwargs.get("stream") and not streams:
+            return await self.astream_text(
+                context, input_text, kwargs.get("history"), kwargs.get("out")
+            )
+        loop = asyncio.get_running_loop()
+        call = functools.partial(
+            self.run, context, input_text, **self._run_kwargs(kwargs)
+        )
+        return await loop.run_in_executor(None, contextvars.copy_context().run, call)
+
+
+class SDKProvider(BaseLLMProvider):
+    """
+    A provider that talks to a vendor SDK.
+
+    The SDK clients (and their HTTP connection pools) are built on first use
+    and reused for every call.
+    """
+
+    def __init__(self, api_key: str = None, cache: ResponseCache = None):
+        super().__init__(api_key, cache)
+        self._client = None
+        self._async_client = None
+
+    @property
+    def client(self):
+        """The SDK client, built on first use and reused for every call."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self.create_client()
+        return self._client
+
+    @property
+    def async_client(self):
+        """
+        The asyncio SDK client, built on first use and reused for every call,
+        or None when the provider has none.
+        """
+        if self._async_client is None:
+            with self._client_lock:
+                if self._async_client is None:
+                    self._async_client = self.create_async_client()
+        return self._async_client
+
+    @abstractmethod
+    def create_client(self):
+        """Build the SDK client."""
+
+    def create_async_client(self):
+        """
+        Build the asyncio SDK client. Providers without one keep this default
+        and the inherited ``arun``, which runs ``run`` on a worker thread.
+        """
@@ -1,42 +1,196 @@
-from .base import BaseLLMProvider
-import openai
-import os
-from cockroachdb_mcp_client.config import load_config
+import functools
+import hashlib
+import json
+from typing import AsyncIterator, Iterator, TextIO
+from .base import SDKProvider
+from cockroachdb_mcp_client.batch_api import BatchItem, BatchStatus
 
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_FINAL_STATES = {"completed", "failed", "expired", "cancelled"}
 
-class OpenAIProvider(BaseLLMProvider):
-    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
-        api_key = os.getenv("OPENAI_API_KEY") or load_config().get("openai", {}).get(
-            "api_key"
-        )
+# Ask for a final chunk carrying token usage, so streamed calls are metered.
+STREAM_OPTIONS = {"stream": True, "stream_options": {"include_usage": True}}
+
+
+class OpenAIProvider(SDKProvider):
+    api_key_env = "OPENAI_API_KEY"
+    config_section = "openai"
+    supports_batch_api = True
+
+    def create_client(self):
+        import openai
+
+        return openai.OpenAI(api_key=self.api_key, max_retries=0)
+
+    def create_async_client(self):
+        import openai
 
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY not set.")
+        return openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
 
-        openai.api_key = api_key
-        model = context.get("body", {}).get("model", "gpt-3.5-turbo")
+    def build_request(
+        self, context: dict, input_text: str, history: list = None
+    ) -> dict:
+        body = context.get("body", {})
+        model = body.get("model", "gpt-3.5-turbo")
+        system_msg = body.get("description", "You are an AI assistant.")
+        # Static parts first, so consecutive calls share a cacheable prefix.
+        prefix = [{"role": "system", "content": system_msg}]
+        prefix += self.example_messages(context)
+        request = {
+            "model": model,
+            "messages": [
+                *prefix,
+                *(history or []),
+                {"role": "user", "content": input_text},
+            ],
+            "temperature": 0.7,
+        }
+        if "max_tokens" in body:
+            request["max_tokens"] = body["max_tokens"]
+        if self.prompt_cache:
+            # OpenAI caches long prefixes automatically; the key routes calls
+            # with the same prefix to the same cache.
+            digest = hashlib.sha256(json.dumps([model, prefix]).encode())
+            request["prompt_cache_key"] = digest.hexdigest()[:32]
+        return request
 
-        system_msg = context.get("body", {}).get(
-            "description", "You are an AI assistant."
+    def _delta(self, chunk) -> str | None:
+        # With include_usage the final chunk has no choices, only usage.
+        self.report_usage(
+            getattr(chunk, "usage", None), "prompt_tokens", "completion_tokens"
         )
-        user_prompt = input_text
+        if chunk.choices:
+            return chunk.choices[0].delta.content
 
-        messages = [
-            {"role": "system", "content": system_msg},
-            {"role": "user", "content": user_prompt},
-        ]
+    def stream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> Iterator[str]:
+        request = self.build_request(context, input_text, history)
+        response = self.call_with_retry(
+            request,
+            lambda: self.client.chat.completions.create(**request, **STREAM_OPTIONS),
+        )
+        for chunk in response:
+            delta = self._delta(chunk)
+            if delta:
+                yield delta
+
+    async def astream(
+        self, context: dict, input_text: str, history: list = None
+    ) -> AsyncIterator[str]:
+        request = self.build_request(context, input_text, history)
+        response = await self.acall_with_retry(
+            request,
+            lambda: self.async_client.chat.completions.create(
+                **request, **STREAM_OPTIONS
+            ),
+        )
+        async for chunk in response:
+            delta = self._delta(chunk)
+            if delta:
+                yield delta
+
+    def run(
+        self,
+        context: dict,
+        input_text: str,
+        stream: bool = False,
+        history: list = None,
+        out: TextIO = None,
+    ) -> str:
+        if stream:
+            return self.stream_text(context, input_text, history, out)
+        request = self.build_request(context, input_text, history)
+        key, cached = self.cache_lookup(request)
+        if cached is not None:
+            return cached
+        response = self.call_with_retry(
+            request, lambda: self.client.chat.completions.create(**request)
+        )
+        self.report_usage(
+            getattr(response, "usage", None), "prompt_tokens", "completion_tokens"
+        )
+        text = response.choices[0].message.content.strip()
+        self.cache_store(key, text)
+        return text
 
+    async def arun(
+        self,
+        context: dict,
+        input_text: str,
+        stream: bool = False,
+        history: list = None,
+        out: TextIO = None,
+    ) -> str:
         if stream:
-            response = openai.ChatCompletion.create(
-                model=model, messages=messages, temperature=0.7, stream=True
+            return await self.astream_text(context, input_text, history, out)
+        request = self.build_request(context, input_text, history)
+        key, cached = await self.acache_lookup(request)
+        if cached is not None:
+            return cached
+        response = await self.acall_with_retry(
+            request, lambda: self.async_client.chat.completions.create(**request)
+        )
+        self.report_usage(
+            getattr(response, "usage", None), "prompt_tokens", "completion_tokens"
+        )
+        text = response.choices[0].message.content.strip()
+        await self.acache_store(key, text)
+        return text
+
+    def submit_batch(self, requests: list[tuple[str, dict]]) -> str:
+        lines = "".join(
+            json.dumps(
+                {"custom_id": cid, "method": "POST", "url": BATCH_ENDPOINT, "body": r}
             )
-            for chunk in response:
-                if "choices" in chunk and chunk.choices[0].delta.get("content"):
-                    print(chunk.choices[0].delta["content"], end="", flush=True)
-            print()
-            return ""
-        else:
-            response = openai.ChatCompletion.create(
-                model=model, messages=messages, temperature=0.7
+            + "\n"
+            for cid, r in requests
+        )
+        upload = self.call_with_retry(
+            {},
+            lambda: self.client.files.create(
+                file=("batch.jsonl", lines.encode()), purpose="batch"
+            ),
+        )
+        job = self.call_with_retry(
+            {},
+            lambda: self.client.batches.create(
+                input_file_id=upload.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window="24h",
+            ),
+        )
+        return job.id
+
+    def batch_status(self, job_id: str) -> BatchStatus:
+        job = self.call_with_retry({}, lambda: self.client.batches.retrieve(job_id))
+        counts = job.request_counts
+        return BatchStatus(
+            job.status in BATCH_FINAL_STATES,
+            job.status,
+            getattr(counts, "completed", 0),
+            getattr(counts, "failed", 0),
+            getattr(counts, "total", 0),
+        )
+
+    def batch_results(self, job_id: str) -> Iterator[BatchItem]:
+        job = self.call_with_retry({}, lambda: self.client.batches.retrieve(job_id))
+        for file_id in (job.output_file_id, job.error_file_id):
+            if not file_id:
+                continue
+            content = self.call_with_retry(
+                {}, functools.partial(self.client.files.content, file_id)
             )
-            return response.choices[0].message["content"].strip()
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                body = response.get("body") or {}
+                if response.get("status_code") == 200:
+                    text = body["choices"][0]["message"]["content"].strip()
+                    yield BatchItem(record["custom_id"], output=text)
+                    continue
+                error = record.get("error") or body.get("error") or {}
+                message = error.get("message") or f"HTTP {response.get('status_code')}"
+                yield BatchItem(record["custom_id"], error=message)
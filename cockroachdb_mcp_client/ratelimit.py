@@ -0,0 +1,190 @@
+import asyncio
+import email.utils
+import logging
+import math
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504, 529}
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 60.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at ``per_minute / 60`` units per second.
+
+    The bucket holds one second of burst. Reservations may overdraw it; the
+    caller is told how long to wait for the debt to be repaid, which keeps
+    large single reservations (e.g. a long prompt against a TPM limit) fair.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        """Take ``amount`` units and return the seconds to wait before using them."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+def status_of(exc: Exception) -> int | None:
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status
+
+
+def retry_after(exc: Exception) -> float | None:
+    """Seconds requested by a ``Retry-After``/``retry-after-ms`` response header."""
+    return retry_after_header(getattr(getattr(exc, "response", None), "headers", None))
+
+
+def retry_after_header(headers) -> float | None:
+    headers = headers or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            when = email.utils.parsedate_to_datetime(value)
+            return max(when.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: Exception) -> bool:
+    status = status_of(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUSES
+    # SDK connection/timeout errors carry no status code.
+    name = type(exc).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+class RateLimiter:
+    """
+    Client-side requests/min and tokens/min limiter with shared retry backoff.
+
+    One instance is shared by every concurrent call to the same provider and
+    model. A rate-limit response from any call pauses all of them until the
+    requested ``Retry-After`` (or a jittered exponential delay) has passed.
+    """
+
+    def __init__(
+        self,
+        rpm: float | None = None,
+        tpm: float | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._lock:
+            return max(wait, self._blocked_until - time.monotonic())
+
+    def acquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def backoff(self, exc: Exception, attempt: int) -> float | None:
+        """
+        Return the delay before retrying after ``exc``, or None to give up.
+
+        The delay is at least the server's ``Retry-After``; otherwise it is a
+        full-jitter exponential delay. All callers sharing this limiter are held
+        back for the same period.
+        """
+        if attempt >= self.max_retries or not is_retryable(exc):
+            return None
+        cap = min(self.max_delay, self.base_delay * 2**attempt)
+        delay = random.uniform(0, cap)
+        requested = retry_after(exc)
+        if requested is not None:
+            delay = max(delay, min(requested, self.max_delay))
+        with self._lock:
+            self.retries += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        logger.warning(
+            "Retrying after %s (attempt %d, waiting %.2fs)", exc, attempt + 1, delay
+        )
+        return delay
+
+
+# Rough characters per token by model family; Claude's tokenizer splits
+# English text a little finer than OpenAI's.
+CHARS_PER_TOKEN = {"claude": 3.5}
+DEFAULT_CHARS_PER_TOKEN = 4.0
+# Role markers and separators the API adds around each message.
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: str, model: str = None) -> int:
+    """Rough token count of ``text`` for ``model``, computed locally."""
+    ratio = DEFAULT_CHARS_PER_TOKEN
+    for prefix, value in CHARS_PER_TOKEN.items():
+        if (model or "").startswith(prefix):
+            ratio = value
+    return math.ceil(len(text) / ratio)
+
+
+def _text(content) -> str:
+    """The text of a message content string or list of content blocks."""
+    if isinstance(content, list):
+        return "".join(str(block.get("text", "")) for block in content)
+    return str(content)
+
+
+def estimate_prompt_tokens(request: dict) -> int:
+    """Rough prompt tokens of a provider request (system prompt and messages)."""
+    model = request.get("model")
+    tokens = 0
+    if request.get("system"):
+        tokens += estimate_tokens(_text(request["system"]), model) + MESSAGE_OVERHEAD
+    for message in request.get("messages", []):
+        tokens += estimate_tokens(_text(message.get("content", "")), model)
+        tokens += MESSAGE_OVERHEAD
+    return tokens
+
+
+def estimate_request_tokens(request: dict) -> int:
+    """Rough token cost of a provider request: its prompt plus ``max_tokens``."""
+    return estimate_prompt_tokens(request) + int(request.get("max_tokens", 0))
@@ -0,0 +1,93 @@
+import json
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+from cockroachdb_mcp_client.ratelimit import MESSAGE_OVERHEAD, estimate_tokens
+from cockroachdb_mcp_client.utils import atomic_write_text
+
+SESSION_DIR = Path.home() / ".local" / "share" / "cockroachdb-mcp-client" / "sessions"
+DEFAULT_HISTORY_TOKENS = 8000
+# Session names become file names, so they cannot name other directories.
+SESSION_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9._-]*")
+
+
+def session_path(name: str) -> Path:
+    """Where session ``name`` is saved; raises ``ValueError`` for unsafe names."""
+    if not SESSION_NAME.fullmatch(name) or ".." in name:
+        raise ValueError(
+            f"Invalid session name {name!r}; use letters, digits, '.', '_' and '-'"
+        )
+    return SESSION_DIR / f"{name}.json"
+
+
+@dataclass
+class Session:
+    """
+    A multi-turn conversation with one context, saved as JSON after each turn.
+
+    The full transcript is kept in ``messages``; only the most recent turns
+    that fit ``history_tokens`` are sent with the next input.
+    """
+
+    provider: str
+    context: dict
+    messages: list = field(default_factory=list)
+    history_tokens: int = DEFAULT_HISTORY_TOKENS
+    path: Optional[Path] = None
+
+    @classmethod
+    def load(cls, path: Path) -> "Session":
+        data = json.loads(path.read_text())
+        return cls(
+            data["provider"],
+            data["context"],
+            data.get("messages", []),
+            data.get("history_tokens", DEFAULT_HISTORY_TOKENS),
+            path,
+        )
+
+    def save(self):
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "provider": self.provider,
+            "context": self.context,
+            "messages": self.messages,
+            "history_tokens": self.history_tokens,
+            "updated_at": time.time(),
+        }
+        atomic_write_text(self.path, json.dumps(data, indent=2))
+
+    def _tokens(self, text: str) -> int:
+        model = (self.context.get("body") or {}).get("model")
+        return estimate_tokens(str(text), model) + MESSAGE_OVERHEAD
+
+    def history(self, input_text: str) -> list:
+        """
+        The latest whole turns that fit the token window alongside the system
+        prompt and ``input_text``, oldest first. Older turns are left out.
+        """
+        body = self.context.get("body") or {}
+        room = self.history_tokens - self._tokens(input_text)
+        room -= self._tokens(body.get("description", ""))
+        kept = 0
+        # Walk back one (user, assistant) turn at a time.
+        for start in range(len(self.messages) - 2, -1, -2):
+            turn = self.messages[start : start + 2]
+            room -= sum(self._tokens(m["content"]) for m in turn)
+            if room < 0:
+                break
+            kept = len(self.messages) - start
+        return self.messages[len(self.messages) - kept :] if kept else []
+
+    def add_turn(self, input_text: str, reply: str):
+        self.messages.append({"role": "user", "content": input_text})
+        self.messages.append({"role": "assistant", "content": reply})
+        self.save()
+
+    def reset(self):
+        self.messages = []
+        self.save()
@@ -0,0 +1,77 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable
+from cockroachdb_mcp_client import codec
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse ``i/N`` (``0 <= i < N``) into ``(i, N)``."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard {value!r} is out of range; use 0/N to {count - 1}/N")
+    return index, count
+
+
+def shard_of(value, count: int) -> int:
+    """
+    The shard an input belongs to, from a hash of its content.
+
+    The hash does not depend on the process, the host or the input's
+    position, so every shard computes the same partition independently.
+    """
+    data = json.dumps(value, sort_keys=True).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big") % count
+
+
+@dataclass
+class MergeResult:
+    """Shard outputs combined by input index."""
+
+    records: dict = field(default_factory=dict)
+    files: int = 0
+    #: Lines that are not a JSON record with an ``index``.
+    skipped: int = 0
+
+    def ordered(self) -> list:
+        return [self.records[index] for index in sorted(self.records)]
+
+    @property
+    def failed(self) -> list:
+        return sorted(i for i, r in self.records.items() if "error" in r)
+
+    def missing(self, total: int = None) -> list:
+        """Indices without a record, up to ``total`` or the highest seen."""
+        if total is None:
+            total = max(self.records, default=-1) + 1
+        return [i for i in range(total) if i not in self.records]
+
+
+def merge_outputs(paths: Iterable[Path]) -> MergeResult:
+    """
+    Read ``simulate --output-file`` JSONL files. For an input recorded more
+    than once (e.g. by a resumed run) a success wins over an error, and a
+    later record over an earlier one. Lines that are not a record with an
+    ``index`` (a truncated final line, a foreign file) are counted and skipped.
+    """
+    merged = MergeResult()
+    for path in paths:
+        merged.files += 1
+        with path.open() as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = codec.loads_json(line)
+                    index = record["index"]
+                except (ValueError, TypeError, KeyError):
+                    merged.skipped += 1
+                    continue
+                previous = merged.records.get(index)
+                if previous is None or "error" in previous or "error" not in record:
+                    merged.records[index] = record
+    return merged
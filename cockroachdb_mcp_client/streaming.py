@@ -0,0 +1,89 @@
+import sys
+import time
+from typing import AsyncIterable, Iterable, TextIO
+from cockroachdb_mcp_client import metrics
+
+# Streamed text is written out at most this often, or sooner once this many
+# characters are waiting, instead of one write and flush per token.
+FLUSH_INTERVAL = 0.05
+FLUSH_CHARS = 4096
+
+
+class StreamSink:
+    """
+    Consumes the text deltas of a streamed response.
+
+    Deltas are buffered and written to ``out`` (stdout by default) in batches,
+    the full text is assembled for the caller, and the arrival of the first
+    delta is recorded as the call's time-to-first-token.
+    """
+
+    def __init__(
+        self,
+        out: TextIO = None,
+        flush_interval: float = FLUSH_INTERVAL,
+        flush_chars: int = FLUSH_CHARS,
+    ):
+        self.out = sys.stdout if out is None else out
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.parts = []
+        self._pending = []
+        self._pending_chars = 0
+        self._flushed_at = self.started
+
+    @property
+    def text(self) -> str:
+        return "".join(self.parts)
+
+    @property
+    def ttft(self) -> float | None:
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started
+
+    def write(self, delta: str):
+        if not delta:
+            return
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            metrics.mark_first_token()
+        self.parts.append(delta)
+        self._pending.append(delta)
+        self._pending_chars += len(delta)
+        if (
+            self._pending_chars >= self.flush_chars
+            or time.perf_counter() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self.out.write("".join(self._pending))
+            self.out.flush()
+            self._pending = []
+            self._pending_chars = 0
+        self._flushed_at = time.perf_counter()
+
+    def close(self):
+        self._pending.append("\n")
+        self.flush()
+
+    def consume(self, deltas: Iterable[str]) -> str:
+        """Write every delta and return the assembled text."""
+        try:
+            for delta in deltas:
+                self.write(delta)
+        finally:
+            self.close()
+        return self.text
+
+    async def aconsume(self, deltas: AsyncIterable[str]) -> str:
+        try:
+            async for delta in deltas:
+                self.write(delta)
+        finally:
+            self.close()
+        return self.text
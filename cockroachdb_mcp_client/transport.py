@@ -0,0 +1,263 @@
+import logging
+import random
+import threading
+import time
+import requests
+from urllib3.exceptions import NewConnectionError
+from cockroachdb_mcp_client.ratelimit import RETRYABLE_STATUSES, retry_after_header
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 10.0
+DEFAULT_DEADLINE = 60.0
+DEFAULT_BREAKER_THRESHOLD = 5
+DEFAULT_BREAKER_RESET = 30.0
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Responses saying the server did not act on the request, so resending even a
+# POST cannot create a duplicate.
+NOT_PROCESSED_STATUSES = {429, 503}
+
+
+def _not_sent(exc: Exception) -> bool:
+    """True if ``exc`` happened before the request could reach the server."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = getattr(exc.args[0], "reason", None) if exc.args else None
+    return isinstance(reason, NewConnectionError)
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the server while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast once the server looks down.
+
+    After ``failure_threshold`` consecutive failures (connection errors,
+    timeouts or 5xx responses) the circuit opens and requests raise
+    ``CircuitOpenError`` immediately. After ``reset_timeout`` seconds a single
+    probe request is let through; its success closes the circuit again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        reset_timeout: float = DEFAULT_BREAKER_RESET,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether ``before_request`` would currently let a request through."""
+        state = self.state
+        return state == "closed" or (state == "half-open" and not self._probing)
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_request(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return
+        raise CircuitOpenError(
+            f"Circuit open after {self.failures} consecutive failures; "
+            f"not retrying for {self.reset_timeout:.0f}s"
+        )
+
+    def trip(self):
+        """Open the circuit immediately, e.g. when a replica refuses connections."""
+        with self._lock:
+            self.failures = max(self.failures, 1)
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._probing:
+                    logger.warning(
+                        "MCP server failing (%d consecutive errors); opening circuit",
+                        self.failures,
+                    )
+                self.opened_at = time.monotonic()
+                self._probing = False
+
+
+class Replica:
+    """One MCP server endpoint with its own circuit breaker and latency estimate."""
+
+    def __init__(self, url: str, breaker: CircuitBreaker):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        #: Exponentially weighted moving average of response time, in seconds.
+        self.latency: float | None = None
+
+    def __repr__(self):
+        return f"Replica({self.url!r}, {self.breaker.state})"
+
+    def observe(self, seconds: float):
+        self.latency = (
+            seconds if self.latency is None else 0.7 * self.latency + 0.3 * seconds
+        )
+
+
+class ReplicaSet:
+    """
+    Chooses which MCP server replica serves each request.
+
+    ``round_robin`` spreads requests evenly; ``least_latency`` prefers the
+    replica with the lowest observed response time (unmeasured replicas are
+    tried first). Replicas whose circuit is open are skipped until their
+    reset timeout passes.
+    """
+
+    STRATEGIES = ("round_robin", "least_latency")
+
+    def __init__(
+        self,
+        urls: list[str],
+        strategy: str = "round_robin",
+        breaker_threshold: int = DEFAULT_BREAKER_THRESHOLD,
+        breaker_reset: float = DEFAULT_BREAKER_RESET,
+    ):
+        if not urls:
+            raise ValueError("At least one MCP server URL is required")
+        if strategy not in self.STRATEGIES:
+            raise ValueError(
+                f"Unknown balancing strategy {strategy!r}; "
+                f"expected one of {', '.join(self.STRATEGIES)}"
+            )
+        self.replicas = [
+            Replica(url, CircuitBreaker(breaker_threshold, breaker_reset))
+            for url in urls
+        ]
+        self.strategy = strategy
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.replicas)
+
+    def __iter__(self):
+        return iter(self.replicas)
+
+    def __getitem__(self, index: int) -> Replica:
+        return self.replicas[index]
+
+    def _ordered(self) -> list[Replica]:
+        if self.strategy == "least_latency":
+            return sorted(self.replicas, key=lambda r: r.latency or 0.0)
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        return self.replicas[start:] + self.replicas[:start]
+
+    def choose(self, exclude=()) -> Replica:
+        """Return the next usable replica, or raise ``CircuitOpenError``."""
+        error = None
+        for replica in self._ordered():
+            if replica in exclude:
+                continue
+            try:
+                replica.breaker.before_request()
+                return replica
+            except CircuitOpenError as e:
+                error = e
+        raise error or CircuitOpenError("No MCP server replica is available")
+
+    def has_alternative(self, exclude) -> bool:
+        return any(r not in exclude and r.breaker.available for r in self.replicas)
+
+    def mark_unreachable(self, replica: Replica):
+        """A connection failure takes a replica out of rotation when others exist."""
+        if len(self.replicas) > 1:
+            logger.warning("MCP server %s unreachable; failing over", replica.url)
+            replica.breaker.trip()
+        else:
+            replica.breaker.record_failure()
+
+
+class RetryPolicy:
+    """
+    Decides whether and when to resend an MCP request.
+
+    Only connection errors, timeouts and retryable statuses (429, 5xx, ...)
+    are retried, with full-jitter exponential backoff that honors
+    ``Retry-After``. Non-idempotent requests are only resent when the server
+    cannot have acted on them. No retry starts after ``deadline`` seconds.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        base_delay: float = DEFAULT_BASE_DELAY,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        deadline: float | None = DEFAULT_DEADLINE,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def remaining(self, elapsed: float) -> float | None:
+        return None if self.deadline is None else self.deadline - elapsed
+
+    def retryable(
+        self,
+        method: str,
+        response: requests.Response = None,
+        exc: Exception = None,
+    ) -> bool:
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        if exc is not None:
+            return idempotent or _not_sent(exc)
+        status = response.status_code
+        if idempotent:
+            return status in RETRYABLE_STATUSES
+        return status in NOT_PROCESSED_STATUSES
+
+    def backoff(
+        self,
+        method: str,
+        attempt: int,
+        elapsed: float,
+        response: requests.Response = None,
+        exc: Exception = None,
+    ) -> float | None:
+        """Seconds to wait before the next attempt, or None to stop retrying."""
+        if attempt >= self.max_retries or not self.retryable(method, response, exc):
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+        if response is not None:
+            requested = retry_after_header(response.headers)
+            if requested is not None:
+                delay = max(delay, min(requested, self.max_delay))
+        remaining = self.remaining(elapsed)
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
@@ -1,3 +1,8 @@
+import os
+import stat
+import tempfile
+import threading
+from pathlib import Path
 from rich import print
 import typer
 
@@ -13,3 +18,43 @@ def handle_connection_error(base_url: str):
     print("  OR")
     print("  export MCP_SERVER_URL=http://localhost:8081")
     raise typer.Exit(code=1)
+
+
+_umask_lock = threading.Lock()
+_umask = None
+
+
+def _file_mode(path: Path) -> int:
+    """The mode ``path`` has, or would get from a plain ``open`` if it is new."""
+    global _umask
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        pass
+    # os.umask can only be read by setting it, so do that once per process
+    # and under a lock; export writes files from several threads.
+    with _umask_lock:
+        if _umask is None:
+            _umask = os.umask(0o022)
+            os.umask(_umask)
+    return 0o666 & ~_umask
+
+
+def atomic_write_text(path: Path, content: str):
+    """
+    Write ``content`` to ``path`` so readers never observe a partial file.
+
+    The file keeps its existing permissions, and a new file gets the usual
+    umask-based ones rather than the private mode of a temporary file.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, _file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,19 @@
+import pytest
+
+from benchmarks.mock_server import MockMCPServer
+from cockroachdb_mcp_client import client as client_module
+from cockroachdb_mcp_client import context_cache
+
+
+@pytest.fixture
+def mcp_server(monkeypatch, tmp_path_factory):
+    server = MockMCPServer().start()
+    monkeypatch.setenv("MCP_SERVER_URL", server.url)
+    monkeypatch.setattr(client_module, "_clients", {})
+    monkeypatch.setattr(
+        context_cache,
+        "DEFAULT_PATH",
+        tmp_path_factory.mktemp("cache") / "contexts.sqlite",
+    )
+    yield server
+    server.stop()
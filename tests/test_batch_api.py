@@ -0,0 +1,163 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.mock_batch_api import MockBatchAPI
+from cockroachdb_mcp_client import batch_api
+from cockroachdb_mcp_client.batch_api import BatchStatus
+from cockroachdb_mcp_client.cli import app
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def batch_server(monkeypatch):
+    server = MockBatchAPI(polls_until_done=2, failing={"boom"}).start()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{server.url}/v1")
+    monkeypatch.setenv("ANTHROPIC_BASE_URL", server.url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    yield server
+    server.stop()
+
+
+def write_files(tmp_path, inputs):
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"description": "stub"}}))
+    input_file = tmp_path / "inputs.txt"
+    input_file.write_text("\n".join(inputs) + "\n")
+    return context, input_file
+
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+def test_batch_api_returns_results_in_input_order(batch_server, tmp_path, provider):
+    inputs = [f"input {i}" for i in range(5)] + ["boom"]
+    context, input_file = write_files(tmp_path, inputs)
+    output_file = tmp_path / "out.jsonl"
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", provider, "-f", str(context),
+         "-i", str(input_file), "-o", str(output_file), "--batch-api",
+         "--poll-interval", "0.01", "--output", "jsonl"],
+    )
+
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["index"] for r in records] == list(range(6))
+    assert [r.get("output") for r in records[:5]] == [i.upper() for i in inputs[:5]]
+    assert records[5]["error"] == "Injected failure"
+    assert output_file.read_text().splitlines() == result.stdout.splitlines()
+    assert len(batch_server.jobs) == 1
+    assert not batch_api.state_path(output_file).exists()
+
+
+def test_batch_api_resumes_by_job_id(batch_server, tmp_path, monkeypatch):
+    context, input_file = write_files(tmp_path, ["a", "b", "c"])
+    output_file = tmp_path / "out.jsonl"
+    args = ["simulate", "context", "-p", "openai", "-f", str(context),
+            "-i", str(input_file), "-o", str(output_file), "--poll-interval", "0"]
+
+    # The first run is interrupted while the job is still in progress.
+    def interrupted(*args, **kwargs):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch_api, "wait", interrupted)
+    first = runner.invoke(app, args + ["--batch-api"])
+    assert first.exit_code != 0
+    (job_id,) = batch_server.jobs
+    assert batch_api.load_jobs(batch_api.state_path(output_file)) == [job_id]
+    monkeypatch.undo()
+    monkeypatch.setenv("OPENAI_BASE_URL", f"{batch_server.url}/v1")
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+
+    # --resume finds the job next to the output file instead of resubmitting.
+    second = runner.invoke(app, args + ["--batch-api", "--resume"])
+
+    assert second.exit_code == 0, second.output
+    assert len(batch_server.jobs) == 1
+    records = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [r["output"] for r in records] == ["A", "B", "C"]
+
+    # An explicit --batch-job collects the same results again.
+    third = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "openai", "-f", str(context),
+         "-i", str(input_file), "--batch-job", job_id, "--output", "jsonl"],
+    )
+    assert third.exit_code == 0
+    assert [json.loads(line)["output"] for line in third.stdout.splitlines()] == [
+        "A", "B", "C"
+    ]
+
+
+def test_wait_backs_off_between_polls(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(batch_api.time, "sleep", sleeps.append)
+
+    class Provider:
+        polls = 0
+
+        def batch_status(self, job_id):
+            self.polls += 1
+            return BatchStatus(self.polls > 5, "in_progress")
+
+    batch_api.wait(Provider(), ["job"], interval=1, max_interval=5)
+
+    assert sleeps == [1, 2, 4, 5, 5]
+
+
+def test_submitted_jobs_are_saved_before_a_later_chunk_fails(tmp_path):
+    state_file = tmp_path / "out.jsonl.jobs.json"
+
+    class Provider:
+        max_batch_requests = 2
+
+        def build_request(self, context, input_text):
+            return {"messages": [{"role": "user", "content": input_text}]}
+
+        def submit_batch(self, chunk):
+            if chunk[0][0] != "input-0":
+                raise RuntimeError("quota exceeded")
+            return "job-1"
+
+    def save(job_ids):
+        batch_api.save_jobs(state_file, "stub", job_ids)
+
+    with pytest.raises(RuntimeError):
+        batch_api.submit(Provider(), {}, enumerate("abc"), on_submit=save)
+
+    assert batch_api.load_jobs(state_file) == ["job-1"]
+
+
+def test_batch_api_rejects_options_it_cannot_honor(tmp_path):
+    context, input_file = write_files(tmp_path, ["a"])
+    args = ["simulate", "context", "-p", "openai", "-f", str(context),
+            "-i", str(input_file), "--batch-api"]
+
+    for extra in (["--metrics", "json"], ["--concurrency", "4"], ["--stream"]):
+        result = runner.invoke(app, args + extra)
+        assert result.exit_code == 1
+        assert f"cannot be combined with {extra[0]}" in result.output
+
+
+def test_batch_api_needs_a_provider_that_supports_it(tmp_path, monkeypatch):
+    from cockroachdb_mcp_client.providers import PROVIDERS
+    from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+
+    class PlainProvider(BaseLLMProvider):
+        def run(self, context, input_text, stream=False):
+            return input_text
+
+    monkeypatch.setitem(PROVIDERS, "plain", PlainProvider)
+    context, input_file = write_files(tmp_path, ["a"])
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "plain", "-f", str(context),
+         "-i", str(input_file), "--batch-api"],
+    )
+
+    assert result.exit_code == 1
+    assert "Provider plain has no batch API" in result.output
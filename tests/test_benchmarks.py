@@ -0,0 +1,30 @@
+from benchmarks.run import compare, run_benchmarks
+
+
+def test_benchmark_harness_smoke():
+    report = run_benchmarks(
+        contexts=20,
+        server_latency=0.0,
+        payload_size=256,
+        inputs=20,
+        llm_latency=0.01,
+        tokens_per_second=0.0,
+        concurrency=4,
+    )
+
+    results = {r["scenario"]: r for r in report["results"]}
+    assert set(results) == {"list", "export_all", "bulk_create", "simulate"}
+    assert all(r["exit_code"] == 0 for r in results.values())
+    assert results["export_all"]["server_requests"] == 21
+    assert results["bulk_create"]["server_requests"] == 20
+    assert report["parameters"]["contexts"] == 20
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"scenario": "list", "seconds": 1.0}]}
+    report = {"results": [{"scenario": "list", "seconds": 1.5}]}
+    assert compare(report, baseline, max_regression=0.25) == [
+        "list: 1.0s -> 1.5s (+50%)"
+    ]
+    assert report["results"][0]["change_vs_baseline"] == 0.5
+    assert compare(report, baseline, max_regression=0.6) == []
@@ -0,0 +1,159 @@
+import json
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client import metrics
+from cockroachdb_mcp_client.budget import Budget, plan_batch, price_for
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.anthropic import AnthropicProvider
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+from cockroachdb_mcp_client.ratelimit import estimate_tokens
+
+runner = CliRunner()
+
+
+class MeteredProvider(BaseLLMProvider):
+    """Reports 100 prompt and 50 completion tokens per call, like an SDK would."""
+
+    calls = 0
+    lock = threading.Lock()
+
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        with type(self).lock:
+            type(self).calls += 1
+        metrics.report(tokens_in=100, tokens_out=50)
+        return input_text.upper()
+
+
+def write_files(tmp_path, inputs, body=None):
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": body or {"model": "gpt-4o"}}))
+    input_file = tmp_path / "inputs.txt"
+    input_file.write_text("\n".join(inputs) + "\n")
+    return context, input_file
+
+
+def test_estimate_tokens_depends_on_model():
+    text = "x" * 700
+    assert estimate_tokens(text, "gpt-4o") == 175
+    assert estimate_tokens(text, "claude-3-opus-20240229") == 200
+    assert estimate_tokens("", "gpt-4o") == 0
+
+
+def test_price_prefers_longest_prefix_and_config(tmp_path, monkeypatch):
+    assert price_for("gpt-4o-mini-2024-07-18") == (0.15, 0.60)
+    assert price_for("claude-3-5-sonnet-20241022") == (3.00, 15.00)
+    assert price_for("my-model") is None
+
+    from cockroachdb_mcp_client import config as config_module
+
+    monkeypatch.setattr(
+        config_module,
+        "load_config",
+        lambda: {"pricing": {"my-model": {"input": 1, "output": 2}}},
+    )
+    assert price_for("my-model") == (1, 2)
+
+
+def test_plan_batch_is_offline_and_respects_limits(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    llm = AnthropicProvider(api_key="unused")
+    llm.rate_limit_overrides = {"rpm": 60}
+    context = {"body": {"model": "claude-3-haiku-20240307", "max_tokens": 200}}
+
+    plan = plan_batch(llm, context, ["hello world"] * 10, concurrency=10)
+
+    assert llm._client is None
+    assert plan.inputs == 10
+    assert plan.output_tokens == 2000
+    assert plan.prompt_tokens > 0
+    assert plan.cost == pytest.approx(
+        (plan.prompt_tokens * 0.25 + plan.output_tokens * 1.25) / 1_000_000
+    )
+    # 10 calls of ~5s each across 10 slots is ~5s, but 60 rpm needs 10s.
+    assert plan.seconds == pytest.approx(10)
+    assert plan.limited_by == "rpm"
+
+
+def test_anthropic_max_tokens_comes_from_context():
+    llm = AnthropicProvider(api_key="unused")
+    assert llm.build_request({}, "hi")["max_tokens"] == 1024
+    request = llm.build_request({"body": {"max_tokens": 64}}, "hi")
+    assert request["max_tokens"] == 64
+
+
+def test_budget_requires_a_known_price():
+    with pytest.raises(ValueError, match="No price known"):
+        Budget("my-model", max_cost=1.0)
+    assert not Budget("my-model", max_tokens=10).exhausted
+
+
+def test_budget_prices_prompt_cache_tokens_separately():
+    budget = Budget("claude-3-5-sonnet-20241022", max_cost=1.0)
+    budget.record(
+        {"kind": "llm", "tokens_in": 1_000_000, "tokens_out": 0,
+         "cache_read_tokens": 900_000, "cache_write_tokens": 0}
+    )
+
+    # 100k uncached tokens at $3/M plus 900k cache reads at a tenth of that.
+    assert budget.cost == pytest.approx(0.3 + 0.27)
+    assert not budget.exhausted
+
+
+def test_simulate_dry_run_does_not_call_provider(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "metered", MeteredProvider)
+    MeteredProvider.calls = 0
+    context, input_file = write_files(tmp_path, ["a" * 400] * 5)
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "metered", "-f", str(context),
+         "-i", str(input_file), "--dry-run", "--output", "json",
+         "--token-budget", "1000"],
+    )
+
+    assert result.exit_code == 0
+    assert MeteredProvider.calls == 0
+    plan = json.loads(result.stdout)
+    assert plan["inputs"] == 5
+    assert plan["prompt_tokens"] == 5 * (100 + 4)
+    assert plan["output_tokens"] == 5 * 1024
+    assert plan["within_budget"] == 0
+
+
+def test_simulate_token_budget_stops_scheduling(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "metered", MeteredProvider)
+    MeteredProvider.calls = 0
+    context, input_file = write_files(tmp_path, [f"in{i}" for i in range(20)])
+    output_file = tmp_path / "out.jsonl"
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "metered", "-f", str(context),
+         "-i", str(input_file), "-o", str(output_file), "--token-budget", "450"],
+    )
+
+    assert result.exit_code == 0
+    assert MeteredProvider.calls == 3
+    assert "Budget reached after 3 calls (450 tokens" in result.stdout
+    assert len(output_file.read_text().splitlines()) == 3
+
+
+def test_simulate_cost_budget_with_concurrency(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "metered", MeteredProvider)
+    MeteredProvider.calls = 0
+    context, input_file = write_files(tmp_path, [f"in{i}" for i in range(200)])
+
+    # gpt-4o: 100 * 2.5 + 50 * 10 = 750 USD per million calls of this size.
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "metered", "-f", str(context),
+         "-i", str(input_file), "-c", "4", "--budget", "0.0075"],
+    )
+
+    assert result.exit_code == 0
+    assert 10 <= MeteredProvider.calls <= 10 + 4
+    assert "Budget reached" in result.stdout
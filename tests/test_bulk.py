@@ -0,0 +1,60 @@
+import json
+
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+
+runner = CliRunner()
+
+
+def test_delete_many_uses_batch_endpoint_with_one_confirmation(mcp_server):
+    mcp_server.batch = True
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(250)]
+
+    result = runner.invoke(app, ["delete", "context", *ids], input="y\n")
+
+    assert result.exit_code == 0
+    assert result.output.count("Are you sure") == 1
+    assert "delete 250 contexts" in result.output
+    assert "Deleted 250, missing 0, failed 0" in result.output
+    assert not mcp_server.contexts
+    assert (
+        mcp_server.requests
+        == [("GET", "/capabilities")] + [("POST", "/contexts/batch/delete")] * 3
+    )
+
+
+def test_delete_many_falls_back_to_concurrent_requests(mcp_server, tmp_path):
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(20)]
+    ids_file = tmp_path / "ids.txt"
+    ids_file.write_text("# cleanup\n" + "\n".join(ids + ["missing-id"]) + "\n")
+
+    result = runner.invoke(
+        app, ["delete", "context", "--ids-file", str(ids_file), "-y"]
+    )
+
+    assert result.exit_code == 1
+    assert "Deleted 20, missing 1, failed 0" in result.output
+    assert not mcp_server.contexts
+    assert len(mcp_server.connections) <= 8
+
+
+def test_get_many_from_stdin(mcp_server):
+    mcp_server.batch = True
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(3)]
+
+    result = runner.invoke(
+        app, ["get", "context", "-", "--output", "jsonl"], input="\n".join(ids)
+    )
+
+    assert result.exit_code == 0
+    names = [json.loads(line)["context_name"] for line in result.stdout.splitlines()]
+    assert names == ["ctx0", "ctx1", "ctx2"]
+    assert "Fetched 3, missing 0, failed 0" in result.stderr
+
+
+def test_delete_from_stdin_requires_yes(mcp_server):
+    result = runner.invoke(app, ["delete", "context", "-"], input="abc\n")
+
+    assert result.exit_code == 1
+    assert "--yes" in result.output
+    assert mcp_server.requests == []
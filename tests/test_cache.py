@@ -0,0 +1,100 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import openai
+from typer.testing import CliRunner
+from cockroachdb_mcp_client import cache as cache_module
+from cockroachdb_mcp_client.cache import ResponseCache, request_key
+from cockroachdb_mcp_client.cli import app
+
+runner = CliRunner()
+
+
+def test_cache_ttl_expiry(tmp_path):
+    cache = ResponseCache(tmp_path / "c.sqlite", ttl=0.2)
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    time.sleep(0.3)
+    assert cache.get("k") is None
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache = ResponseCache(tmp_path / "c.sqlite", max_entries=3)
+    for key in "abc":
+        cache.put(key, key)
+        time.sleep(0.01)
+    cache.get("a")
+    cache.put("d", "d")
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in "acd"] == ["a", "c", "d"]
+
+
+def test_cache_concurrent_writers(tmp_path):
+    path = tmp_path / "c.sqlite"
+    caches = [ResponseCache(path, max_entries=50) for _ in range(4)]
+
+    def write(cache, worker):
+        for i in range(50):
+            cache.put(f"{worker}-{i}", str(i))
+
+    threads = [
+        threading.Thread(target=write, args=(c, n)) for n, c in enumerate(caches)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    count = caches[0]._connect().execute("SELECT COUNT(*) FROM responses").fetchone()
+    assert count == (50,)
+
+
+def test_request_key_is_order_independent():
+    assert request_key("openai", {"a": 1, "b": 2}) == request_key(
+        "openai", {"b": 2, "a": 1}
+    )
+    assert request_key("openai", {"a": 1}) != request_key("anthropic", {"a": 1})
+
+
+def test_simulate_cache_hits_on_rerun(tmp_path, monkeypatch):
+    calls = []
+
+    async def create(messages, **kwargs):
+        calls.append(messages[-1]["content"])
+        message = SimpleNamespace(content=messages[-1]["content"].upper())
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def fake_client(api_key, **kwargs):
+        completions = SimpleNamespace(create=create)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai, "AsyncOpenAI", fake_client)
+    monkeypatch.setattr(cache_module, "DEFAULT_CACHE_DIR", tmp_path / "cache")
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"description": "stub"}}))
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("one\ntwo\nthree\n")
+    args = [
+        "simulate",
+        "context",
+        "-p",
+        "openai",
+        "-f",
+        str(context),
+        "-i",
+        str(inputs),
+    ]
+
+    first = runner.invoke(app, args + ["--cache"])
+    second = runner.invoke(app, args + ["--cache", "-c", "3"])
+    uncached = runner.invoke(app, args + ["--no-cache"])
+
+    assert "Cache: 0 hits, 3 misses" in first.output
+    assert "Cache: 3 hits, 0 misses" in second.output
+    assert "Output: THREE" in second.output
+    assert "Cache:" not in uncached.output
+    assert len(calls) == 6
@@ -0,0 +1,33 @@
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.client import get_client
+
+runner = CliRunner()
+
+
+def test_get_client_is_shared(mcp_server):
+    assert get_client() is get_client()
+    assert get_client().base_url == mcp_server.url
+
+
+def test_client_pool_settings_from_env(mcp_server, monkeypatch):
+    monkeypatch.setenv("MCP_POOL_SIZE", "4")
+    monkeypatch.setenv("MCP_TIMEOUT", "1.5")
+    client = get_client(token="secret")
+    assert client.timeout == 1.5
+    assert client.session.get_adapter(client.base_url)._pool_maxsize == 4
+    assert client.session.headers["Authorization"] == "Bearer secret"
+
+
+def test_export_all_reuses_connection(mcp_server, tmp_path):
+    for i in range(20):
+        mcp_server.add_context(f"ctx{i}")
+
+    result = runner.invoke(
+        app, ["export", "all", "--output-dir", str(tmp_path), "--workers", "4"]
+    )
+
+    assert result.exit_code == 0
+    assert len(list(tmp_path.iterdir())) == 20
+    assert len(mcp_server.requests) == 21
+    assert len(mcp_server.connections) <= 4
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from benchmarks.codec import run_codec_benchmarks
+from cockroachdb_mcp_client import codec
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+
+runner = CliRunner()
+
+CONTEXT = {"context_name": "ctx", "body": {"system": "Be brief. ✓", "n": [1, 2.5]}}
+
+
+class EchoProvider(BaseLLMProvider):
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        return context["body"]["system"]
+
+
+def test_detects_format_from_content():
+    assert codec.detect_format('\n  {"a": 1}') == "json"
+    assert codec.detect_format(b"\xef\xbb\xbf[1]") == "json"
+    assert codec.detect_format("# comment\na: 1") == "yaml"
+    assert codec.load_document(json.dumps(CONTEXT).encode()) == CONTEXT
+    assert codec.load_document(codec.dump_yaml(CONTEXT)) == CONTEXT
+    # A YAML flow mapping looks like JSON but is still parsed.
+    assert codec.load_document("{name: x, tags: [a]}") == {"name": "x", "tags": ["a"]}
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_json_round_trips_with_either_backend(monkeypatch, fast):
+    if not fast:
+        monkeypatch.setattr(codec, "orjson", None)
+    big = {"id": 2**70, **CONTEXT}
+
+    assert codec.loads_json(codec.encode_json(CONTEXT)) == CONTEXT
+    assert codec.loads_json(codec.encode_json(big)) == big
+    # Text meant for people is unchanged from json.dumps.
+    assert codec.dumps_json(CONTEXT) == json.dumps(CONTEXT)
+    assert codec.dumps_json(CONTEXT, indent=True) == json.dumps(CONTEXT, indent=2)
+
+
+@pytest.mark.parametrize("name", ["ctx.yml", "ctx.yaml", "ctx.json", "ctx.txt"])
+def test_simulate_reads_context_whatever_its_suffix(tmp_path, monkeypatch, name):
+    monkeypatch.setitem(PROVIDERS, "echo", EchoProvider)
+    context = tmp_path / name
+    if name.endswith("json"):
+        context.write_text(json.dumps(CONTEXT))
+    else:
+        context.write_text(codec.dump_yaml(CONTEXT))
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("a\n")
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "echo", "-f", str(context), "-i", str(inputs),
+         "--output", "jsonl"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.stdout)["output"] == "Be brief. ✓"
+
+
+def test_codec_benchmark_smoke():
+    report = run_codec_benchmarks(size=20_000, repeat=1)
+
+    assert {r["case"] for r in report["results"]} == {
+        "json_load", "json_dump", "yaml_load", "yaml_dump"
+    }
+    assert set(report["backends"]) == {"json", "yaml"}
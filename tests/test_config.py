@@ -1,3 +1,5 @@
+import os
+
 from cockroachdb_mcp_client import config
 
 def test_resolve_server_env(monkeypatch):
@@ -7,3 +9,67 @@ def test_resolve_server_env(monkeypatch):
 def test_resolve_token_env(monkeypatch):
     monkeypatch.setenv("MCP_API_TOKEN", "test-token")
     assert config.resolve_token() == "test-token"
+
+def test_resolve_servers_env(monkeypatch):
+    monkeypatch.setenv("MCP_SERVER_URLS", "http://a:8081, http://b:8081/")
+    assert config.resolve_servers() == ["http://a:8081", "http://b:8081"]
+    assert config.resolve_servers("http://c:8081") == ["http://c:8081"]
+
+def write_config(tmp_path, monkeypatch, text):
+    path = tmp_path / "config.yaml"
+    path.write_text(text)
+    monkeypatch.setenv("MCP_CONFIG_FILE", str(path))
+    monkeypatch.delenv("MCP_SERVER_URL", raising=False)
+    return path
+
+def test_profiles_override_top_level(tmp_path, monkeypatch):
+    write_config(tmp_path, monkeypatch, """
+server: http://dev:8081
+http: {timeout: 5, pool_size: 4}
+profiles:
+  prod:
+    servers: [http://prod-1:8081, http://prod-2:8081]
+    http: {timeout: 10}
+""")
+    assert config.resolve_servers() == ["http://dev:8081"]
+    monkeypatch.setenv("MCP_PROFILE", "prod")
+    assert config.resolve_servers() == ["http://prod-1:8081", "http://prod-2:8081"]
+    assert config.resolve_http_options() == {"timeout": 10.0, "pool_size": 4}
+
+def test_config_file_is_parsed_once(tmp_path, monkeypatch):
+    path = write_config(tmp_path, monkeypatch, "token: first\n")
+    assert config.resolve_token() == "first"
+    path.write_text("token: second\n")
+    assert config.resolve_token() == "first"
+    config.reload_config()
+    assert config.resolve_token() == "second"
+
+def test_invalid_config_fails_at_startup(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from cockroachdb_mcp_client.cli import app
+
+    write_config(tmp_path, monkeypatch, "http: {timeuot: 5}\n")
+    result = CliRunner().invoke(app, ["list", "contexts"])
+    assert result.exit_code == 1
+    assert "timeuot" in result.output
+
+def test_profile_option_does_not_leak(tmp_path, monkeypatch):
+    from typer.testing import CliRunner
+    from cockroachdb_mcp_client.cli import app
+
+    monkeypatch.delenv("MCP_PROFILE", raising=False)
+    write_config(tmp_path, monkeypatch, """
+server: http://dev:8081
+profiles:
+  prod: {server: http://prod:8081}
+""")
+    seen = []
+    monkeypatch.setattr(
+        "cockroachdb_mcp_client.commands.list_.get_client",
+        lambda server, token: seen.append(config.resolve_server()) or 1 / 0,
+    )
+    CliRunner().invoke(app, ["--profile", "prod", "list", "contexts"])
+
+    assert seen == ["http://prod:8081"]
+    assert "MCP_PROFILE" not in os.environ
+    assert config.resolve_server() == "http://dev:8081"
@@ -0,0 +1,81 @@
+from typer.testing import CliRunner
+
+from benchmarks.mock_provider import MockProvider
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.client import get_client
+from cockroachdb_mcp_client.context_cache import ContextCache
+from cockroachdb_mcp_client.providers import PROVIDERS
+
+runner = CliRunner()
+
+
+def test_fresh_context_needs_no_round_trip(mcp_server, tmp_path):
+    context_id = mcp_server.add_context("summarizer")
+    cache = ContextCache(tmp_path / "contexts.sqlite", max_age=60)
+
+    first = cache.fetch(get_client(), context_id)
+    second = cache.fetch(get_client(), context_id)
+
+    assert first == second and first["context_name"] == "summarizer"
+    assert len(mcp_server.requests) == 1
+    assert cache.stats() == {"fresh": 1, "revalidated": 0, "fetched": 1, "stale": 0}
+
+
+def test_revalidation_uses_etag_and_picks_up_changes(mcp_server, tmp_path):
+    context_id = mcp_server.add_context("summarizer")
+    cache = ContextCache(tmp_path / "contexts.sqlite", max_age=0)
+
+    cache.fetch(get_client(), context_id)
+    cache.fetch(get_client(), context_id)
+    assert cache.stats()["revalidated"] == 1
+
+    mcp_server.contexts[context_id]["body"] = {"description": "edited"}
+    assert cache.fetch(get_client(), context_id)["body"] == {"description": "edited"}
+    assert cache.stats()["fetched"] == 2
+
+
+def test_identical_contexts_share_one_object(mcp_server, tmp_path):
+    mcp_server.etags = False
+    context_id = mcp_server.add_context("summarizer")
+    cache = ContextCache(tmp_path / "contexts.sqlite", max_age=0)
+
+    for _ in range(3):
+        cache.fetch(get_client(), context_id)
+
+    (objects,) = cache._connect().execute("SELECT COUNT(*) FROM objects").fetchone()
+    assert objects == 1
+
+
+def test_serves_stale_copy_when_server_is_down(mcp_server, tmp_path):
+    context_id = mcp_server.add_context("summarizer")
+    cache = ContextCache(tmp_path / "contexts.sqlite", max_age=0)
+    cache.fetch(get_client(), context_id)
+    mcp_server.stop()
+    get_client().session.close()  # drop the kept-alive connection too
+    get_client().retry.max_retries = 0
+
+    context = cache.fetch(get_client(), context_id)
+
+    assert context["context_name"] == "summarizer"
+    assert cache.stats()["stale"] == 1
+
+
+def test_run_by_context_id(mcp_server, monkeypatch):
+    monkeypatch.setitem(
+        PROVIDERS, "mock", type("Fast", (MockProvider,), {"latency": 0})
+    )
+    context_id = mcp_server.add_context("summarizer", model="mock")
+    args = ["run", "context", "-p", "mock", "--context-id", context_id, "-i", "hi"]
+
+    for _ in range(3):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 0
+        assert "echo: hi" in result.output
+
+    assert mcp_server.requests == [("GET", f"/contexts/{context_id}")]
+
+
+def test_run_requires_one_context_source(mcp_server, tmp_path):
+    result = runner.invoke(app, ["run", "context", "-p", "openai", "-i", "hi"])
+    assert result.exit_code == 1
+    assert "exactly one of --file or --context-id" in result.output
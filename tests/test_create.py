@@ -0,0 +1,64 @@
+import json
+
+import yaml
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+
+runner = CliRunner()
+
+
+def make_context(i: int) -> dict:
+    return {
+        "context_name": f"ctx{i}",
+        "context_version": "1.0.0",
+        "body": {"description": f"context {i}"},
+    }
+
+
+def test_create_contexts_from_directory(mcp_server, tmp_path):
+    for i in range(10):
+        (tmp_path / f"ctx{i}.yaml").write_text(yaml.dump(make_context(i)))
+    (tmp_path / "ctx10.json").write_text(json.dumps(make_context(10)))
+    (tmp_path / "notes.txt").write_text("ignored")
+
+    result = runner.invoke(app, ["create", "contexts", str(tmp_path), "-c", "4"])
+
+    assert result.exit_code == 0
+    assert "Created 11, failed 0, skipped 0" in result.output
+    names = {c["context_name"] for c in mcp_server.contexts.values()}
+    assert names == {f"ctx{i}" for i in range(11)}
+    assert len(mcp_server.connections) <= 4
+
+
+def test_create_contexts_from_glob(mcp_server, tmp_path):
+    for i in range(3):
+        (tmp_path / f"ctx{i}.json").write_text(json.dumps(make_context(i)))
+
+    result = runner.invoke(app, ["create", "contexts", str(tmp_path / "ctx[01].json")])
+
+    assert result.exit_code == 0
+    assert {c["context_name"] for c in mcp_server.contexts.values()} == {"ctx0", "ctx1"}
+
+
+def test_create_contexts_jsonl_resumes_from_checkpoint(mcp_server, tmp_path):
+    source = tmp_path / "contexts.jsonl"
+    lines = [json.dumps(make_context(i)) for i in range(5)]
+    source.write_text("\n".join(lines[:2] + ["{not json"] + lines[2:]) + "\n")
+    checkpoint = tmp_path / "checkpoint.txt"
+
+    first = runner.invoke(
+        app, ["create", "contexts", str(source), "--checkpoint", str(checkpoint)]
+    )
+
+    assert first.exit_code == 1
+    assert "Created 5, failed 1, skipped 0" in first.output
+    assert len(checkpoint.read_text().splitlines()) == 5
+
+    source.write_text("\n".join(lines[:2] + [json.dumps(make_context(9))] + lines[2:]))
+    second = runner.invoke(
+        app, ["create", "contexts", str(source), "--checkpoint", str(checkpoint)]
+    )
+
+    assert second.exit_code == 0
+    assert "Created 1, failed 0, skipped 5" in second.output
+    assert len(mcp_server.contexts) == 6
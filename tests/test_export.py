@@ -0,0 +1,82 @@
+import json
+import os
+import stat
+
+from typer.testing import CliRunner
+from cockroachdb_mcp_client import utils
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.commands.export import MANIFEST_NAME
+
+runner = CliRunner()
+
+
+def export_all(tmp_path, *args):
+    return runner.invoke(
+        app,
+        ["export", "all", "--output-dir", str(tmp_path), "--output", "json", *args],
+    )
+
+
+def test_export_all_parallel(mcp_server, tmp_path):
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(30)]
+
+    result = export_all(tmp_path, "--workers", "8")
+
+    assert result.exit_code == 0
+    files = {p.name for p in tmp_path.iterdir()}
+    assert files == {f"ctx{i}-{ids[i][:8]}.json" for i in range(30)}
+    exported = json.loads((tmp_path / f"ctx0-{ids[0][:8]}.json").read_text())
+    assert exported["context_name"] == "ctx0"
+    assert "id" not in exported and "created_at" not in exported
+
+
+def test_export_all_incremental_only_moves_delta(mcp_server, tmp_path):
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(5)]
+    assert export_all(tmp_path, "--incremental").exit_code == 0
+    manifest = json.loads((tmp_path / MANIFEST_NAME).read_text())["contexts"]
+    assert set(manifest) == set(ids)
+
+    unchanged = tmp_path / f"ctx0-{ids[0][:8]}.json"
+    mtime = unchanged.stat().st_mtime_ns
+    mcp_server.contexts[ids[1]]["body"] = {"description": "edited"}
+    mcp_server.contexts[ids[1]]["created_at"] = "2030-01-01T00:00:00+00:00"
+    mcp_server.requests.clear()
+
+    result = export_all(tmp_path, "--incremental")
+
+    assert result.exit_code == 0
+    assert "Exported 1, unchanged 4, failed 0" in result.output
+    assert unchanged.stat().st_mtime_ns == mtime
+    assert mcp_server.requests == [("GET", "/contexts"), ("GET", f"/contexts/{ids[1]}")]
+    edited = json.loads((tmp_path / f"ctx1-{ids[1][:8]}.json").read_text())
+    assert edited["body"] == {"description": "edited"}
+
+
+def test_exported_files_get_default_permissions(mcp_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "_umask", None)
+    mcp_server.add_context("ctx0")
+    umask = os.umask(0o022)
+    try:
+        assert export_all(tmp_path, "--incremental").exit_code == 0
+    finally:
+        os.umask(umask)
+
+    modes = {p.name: stat.S_IMODE(p.stat().st_mode) for p in tmp_path.iterdir()}
+    assert set(modes.values()) == {0o644}
+
+    manifest = tmp_path / MANIFEST_NAME
+    manifest.chmod(0o640)
+    assert export_all(tmp_path, "--incremental").exit_code == 0
+    assert stat.S_IMODE(manifest.stat().st_mode) == 0o640
+
+
+def test_incremental_export_rewrites_on_format_change(mcp_server, tmp_path):
+    context_id = mcp_server.add_context("ctx0")
+    args = ["export", "all", "--output-dir", str(tmp_path), "--incremental"]
+    assert runner.invoke(app, args + ["--output", "yaml"]).exit_code == 0
+
+    result = runner.invoke(app, args + ["--output", "json"])
+
+    assert "Exported 1, unchanged 0, failed 0" in result.output
+    exported = json.loads((tmp_path / f"ctx0-{context_id[:8]}.json").read_text())
+    assert exported["context_name"] == "ctx0"
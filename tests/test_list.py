@@ -0,0 +1,83 @@
+import json
+
+import yaml
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.client import get_client
+
+runner = CliRunner()
+
+
+def list_contexts(*args):
+    return runner.invoke(app, ["list", "contexts", *args])
+
+
+def test_iter_contexts_follows_cursor(mcp_server):
+    ids = [mcp_server.add_context(f"ctx{i}") for i in range(25)]
+
+    contexts = list(get_client().iter_contexts(page_size=10))
+
+    assert [c["id"] for c in contexts] == ids
+    assert mcp_server.requests == [("GET", "/contexts")] * 3
+
+
+def test_iter_contexts_without_server_pagination(mcp_server):
+    mcp_server.paginate = False
+    for i in range(25):
+        mcp_server.add_context(f"ctx{i}")
+
+    assert len(list(get_client().iter_contexts(page_size=10))) == 25
+    assert len(mcp_server.requests) == 1
+
+
+def test_list_json_and_yaml_are_complete_documents(mcp_server):
+    for i in range(12):
+        mcp_server.add_context(f"ctx{i}")
+
+    as_json = json.loads(list_contexts("--page-size", "5").stdout)
+    as_yaml = yaml.safe_load(list_contexts("--output", "yaml").stdout)
+
+    assert [c["context_name"] for c in as_json["contexts"]] == [
+        f"ctx{i}" for i in range(12)
+    ]
+    assert as_yaml == as_json
+
+
+def test_list_empty_registry(mcp_server):
+    assert json.loads(list_contexts().stdout) == {"contexts": []}
+
+
+def test_list_limit_stops_paging(mcp_server):
+    for i in range(50):
+        mcp_server.add_context(f"ctx{i}")
+
+    result = list_contexts("--output", "jsonl", "--limit", "3", "--page-size", "10")
+
+    assert result.exit_code == 0
+    assert len(result.stdout.splitlines()) == 3
+    assert len(mcp_server.requests) == 1
+
+
+def test_list_filter_and_fields(mcp_server):
+    for name in ("summarizer", "summary-v2", "translator"):
+        mcp_server.add_context(name)
+
+    result = list_contexts(
+        "--output", "jsonl", "--filter", "name=summ*", "--fields", "context_name"
+    )
+
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"context_name": "summarizer"},
+        {"context_name": "summary-v2"},
+    ]
+
+
+def test_list_table(mcp_server):
+    context_id = mcp_server.add_context("summarizer")
+
+    lines = list_contexts(
+        "--output", "table", "--fields", "id,name"
+    ).stdout.splitlines()
+
+    assert lines[0].split() == ["id", "context_name"]
+    assert lines[1].split() == [context_id, "summarizer"]
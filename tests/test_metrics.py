@@ -0,0 +1,113 @@
+import json
+from types import SimpleNamespace
+
+import openai
+import pytest
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.metrics import MetricsRecorder, http_label, percentile
+
+runner = CliRunner()
+
+
+def test_percentile_interpolates():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 50.5
+    assert percentile(values, 0.99) == 99.01
+    assert percentile([], 0.5) == 0.0
+
+
+def test_http_label_collapses_ids():
+    path = "/contexts/6f1c2d3e-1111-2222-3333-444455556666"
+    assert http_label("GET", path) == "GET /contexts/{id}"
+    assert http_label("GET", "/contexts?limit=10") == "GET /contexts"
+
+
+def test_recorder_counts_errors_and_prometheus():
+    recorder = MetricsRecorder()
+    with recorder.measure("llm", "m") as call:
+        call["tokens_in"] += 10
+    try:
+        with recorder.measure("llm", "m"):
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    (row,) = recorder.summary()
+    assert (row["calls"], row["errors"], row["tokens_in"]) == (2, 1, 10)
+    text = recorder.to_prometheus()
+    assert 'mcp_client_call_latency_seconds_count{kind="llm",name="m"} 2' in text
+    assert 'mcp_client_call_errors_total{kind="llm",name="m"} 1' in text
+
+
+def fake_openai(monkeypatch, tmp_path):
+    async def create(messages, **kwargs):
+        message = SimpleNamespace(content="ok")
+        usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+
+    def fake_client(api_key, **kwargs):
+        completions = SimpleNamespace(create=create)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai, "AsyncOpenAI", fake_client)
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"model": "gpt-test"}}))
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("a\nb\nc\nd\n")
+    return context, inputs
+
+
+def test_simulate_metrics_report(tmp_path, monkeypatch):
+    context, inputs = fake_openai(monkeypatch, tmp_path)
+    prom = tmp_path / "metrics.prom"
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "openai", "-f", str(context), "-i",
+         str(inputs), "-c", "2", "--metrics", "json", "--metrics-file", str(prom)],
+    )
+
+    assert result.exit_code == 0
+    (row,) = json.loads(result.output[result.output.rindex("[\n"):])
+    assert row["name"] == "gpt-test"
+    assert (row["calls"], row["tokens_in"], row["tokens_out"]) == (4, 48, 12)
+    assert row["p50"] <= row["p95"] <= row["p99"]
+    assert 'mcp_client_tokens_out_total{kind="llm",name="gpt-test"} 12' in prom.read_text()
+
+
+@pytest.mark.parametrize(
+    "output, report", [("jsonl", "json"), ("json", "table"), ("json", "json")]
+)
+def test_simulate_metrics_keep_stdout_parseable(tmp_path, monkeypatch, output, report):
+    context, inputs = fake_openai(monkeypatch, tmp_path)
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "openai", "-f", str(context), "-i",
+         str(inputs), "--output", output, "--metrics", report],
+    )
+
+    assert result.exit_code == 0, result.output
+    if output == "json":
+        records = json.loads(result.stdout)
+    else:
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["output"] for r in records] == ["ok"] * 4
+    assert ("Call metrics" if report == "table" else "gpt-test") in result.stderr
+
+
+def test_export_all_http_metrics(mcp_server, tmp_path):
+    for i in range(3):
+        mcp_server.add_context(f"ctx{i}")
+
+    result = runner.invoke(
+        app,
+        ["export", "all", "-o", str(tmp_path / "out"), "--metrics", "json"],
+    )
+
+    assert result.exit_code == 0
+    rows = json.loads(result.output[result.output.rindex("[\n"):])
+    counts = {row["name"]: row["calls"] for row in rows}
+    assert counts == {"GET /contexts": 1, "GET /contexts/{id}": 3}
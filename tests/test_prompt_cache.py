@@ -0,0 +1,107 @@
+import json
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers.anthropic import AnthropicProvider
+from cockroachdb_mcp_client.providers.openai import OpenAIProvider
+
+runner = CliRunner()
+
+CONTEXT = {
+    "body": {
+        "model": "claude-3-5-sonnet-20241022",
+        "description": "Long instructions " * 200,
+        "examples": [
+            {"input": "2+2", "output": "4"},
+            {"input": "3+3", "output": "6"},
+        ],
+    }
+}
+
+
+class CachingAnthropic:
+    """Writes the prompt prefix to the cache on the first call, reads it after."""
+
+    calls = 0
+
+    def __init__(self, api_key, **kwargs):
+        self.messages = SimpleNamespace(create=self.create)
+
+    async def create(self, messages, system, **kwargs):
+        assert system[0]["cache_control"] == {"type": "ephemeral"}
+        first = type(self).calls == 0
+        type(self).calls += 1
+        usage = SimpleNamespace(
+            input_tokens=5,
+            output_tokens=2,
+            cache_creation_input_tokens=900 if first else 0,
+            cache_read_input_tokens=0 if first else 900,
+        )
+        return SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=usage)
+
+
+def test_examples_are_opt_in_and_validated():
+    llm = OpenAIProvider(api_key="unused")
+    assert len(llm.build_request(CONTEXT, "a")["messages"]) == 2
+
+    llm.examples = True
+    assert len(llm.build_request(CONTEXT, "a")["messages"]) == 6
+    with pytest.raises(ValueError, match="body.examples"):
+        llm.build_request({"body": {"examples": ["hi"]}}, "a")
+
+
+def test_anthropic_marks_static_prefix_cacheable():
+    llm = AnthropicProvider(api_key="unused")
+    llm.examples = True
+    plain = llm.build_request(CONTEXT, "5+5")
+    assert isinstance(plain["system"], str)
+    assert [m["content"] for m in plain["messages"]] == ["2+2", "4", "3+3", "6", "5+5"]
+
+    llm.prompt_cache = True
+    request = llm.build_request(CONTEXT, "5+5", history=[])
+
+    assert request["system"][0]["cache_control"] == {"type": "ephemeral"}
+    last_example = request["messages"][3]["content"]
+    assert last_example == [
+        {"type": "text", "text": "6", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert request["messages"][-1] == {"role": "user", "content": "5+5"}
+    # The context itself is left untouched.
+    assert CONTEXT["body"]["examples"][-1]["output"] == "6"
+
+
+def test_openai_prompt_cache_key_follows_the_prefix():
+    llm = OpenAIProvider(api_key="unused")
+    assert "prompt_cache_key" not in llm.build_request(CONTEXT, "a")
+
+    llm.prompt_cache = True
+    key = llm.build_request(CONTEXT, "a")["prompt_cache_key"]
+    assert llm.build_request(CONTEXT, "b")["prompt_cache_key"] == key
+    other = {"body": {**CONTEXT["body"], "description": "Different"}}
+    assert llm.build_request(other, "a")["prompt_cache_key"] != key
+
+
+def test_simulate_reports_prompt_cache_tokens(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", CachingAnthropic)
+    CachingAnthropic.calls = 0
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps(CONTEXT))
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("a\nb\nc\n")
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "anthropic", "-f", str(context),
+         "-i", str(inputs), "--prompt-cache", "--metrics", "json"],
+    )
+
+    assert result.exit_code == 0
+    assert "Prompt cache: 1800 tokens read, 900 written" in result.stdout
+    (row,) = json.loads(result.stdout[result.stdout.rindex("[\n"):])
+    assert (row["cache_read_tokens"], row["cache_write_tokens"]) == (1800, 900)
+    assert row["tokens_in"] == 3 * 905
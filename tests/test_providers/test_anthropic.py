@@ -0,0 +1,90 @@
+import io
+import json
+from types import SimpleNamespace
+
+import anthropic
+import pytest
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.metrics import MetricsRecorder
+from cockroachdb_mcp_client.providers.anthropic import AnthropicProvider
+
+runner = CliRunner()
+
+
+class FakeAnthropic:
+    instances = 0
+
+    def __init__(self, api_key, **kwargs):
+        type(self).instances += 1
+        self.messages = SimpleNamespace(create=self.create)
+
+    def create(self, messages, **kwargs):
+        text = messages[-1]["content"].upper()
+        return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+class FakeAsyncAnthropic(FakeAnthropic):
+    async def create(self, messages, **kwargs):
+        return FakeAnthropic.create(self, messages, **kwargs)
+
+
+def test_anthropic_missing_key(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+    with pytest.raises(RuntimeError):
+        AnthropicProvider().run({}, "test")
+
+
+def test_anthropic_builds_one_client_per_batch(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(anthropic, "Anthropic", FakeAnthropic)
+    monkeypatch.setattr(anthropic, "AsyncAnthropic", FakeAsyncAnthropic)
+    FakeAnthropic.instances = FakeAsyncAnthropic.instances = 0
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"description": "stub"}}))
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text("\n".join(f"input {i}" for i in range(10)))
+
+    result = runner.invoke(
+        app,
+        [
+            "simulate",
+            "context",
+            "-p",
+            "anthropic",
+            "-f",
+            str(context),
+            "-i",
+            str(inputs),
+            "--concurrency",
+            "4",
+        ],
+    )
+
+    assert result.exit_code == 0
+    assert "INPUT 9" in result.output
+    assert FakeAsyncAnthropic.instances == 1
+    assert FakeAnthropic.instances == 0
+
+
+def test_anthropic_stream_counts_output_tokens_once():
+    usage = SimpleNamespace(input_tokens=10, output_tokens=1)
+    events = [
+        SimpleNamespace(type="message_start", message=SimpleNamespace(usage=usage)),
+        SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text=" hi")),
+        SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(text="! ")),
+        # message_delta carries the cumulative output token count.
+        SimpleNamespace(type="message_delta", usage=SimpleNamespace(output_tokens=5)),
+    ]
+    llm = AnthropicProvider(api_key="test-key")
+    llm._client = SimpleNamespace(
+        messages=SimpleNamespace(create=lambda **kwargs: iter(events))
+    )
+    recorder = MetricsRecorder()
+
+    with recorder.measure("llm", "claude-test"):
+        text = llm.run({"body": {}}, "hi", stream=True, out=io.StringIO())
+
+    (row,) = recorder.summary()
+    assert text == "hi!"
+    assert (row["tokens_in"], row["tokens_out"]) == (10, 5)
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+
+from cockroachdb_mcp_client.cache import ResponseCache
+from cockroachdb_mcp_client.providers.base import SDKProvider
+
+
+class SyncOnlyProvider(SDKProvider):
+    def create_client(self):
+        return object()
+
+    def run(self, context: dict, input_text: str, **kwargs) -> str:
+        return f"{input_text} via {type(self.client).__name__}"
+
+
+def test_sdk_provider_requires_create_client():
+    class Incomplete(SDKProvider):
+        def run(self, context, input_text, **kwargs):
+            return ""
+
+    with pytest.raises(TypeError, match="create_client"):
+        Incomplete()
+
+
+def test_provider_without_async_sdk_runs_on_a_thread():
+    llm = SyncOnlyProvider(api_key="unused")
+
+    assert llm.async_client is None
+    assert asyncio.run(llm.arun({}, "hi")) == "hi via object"
+    assert not llm.supports_batch_api
+
+
+def test_async_cache_io_runs_off_the_event_loop(tmp_path):
+    llm = SyncOnlyProvider(api_key="unused")
+    llm.cache = ResponseCache(tmp_path / "c.sqlite")
+    threads = []
+    get = llm.cache.get
+
+    def recording_get(key):
+        threads.append(threading.get_ident())
+        return get(key)
+
+    llm.cache.get = recording_get
+
+    async def lookup_and_store():
+        key, cached = await llm.acache_lookup({"q": 1})
+        assert cached is None
+        await llm.acache_store(key, "answer")
+        return (await llm.acache_lookup({"q": 1}))[1], threading.get_ident()
+
+    cached, loop_thread = asyncio.run(lookup_and_store())
+
+    assert cached == "answer"
+    assert threads and loop_thread not in threads
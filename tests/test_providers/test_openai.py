@@ -1,7 +1,31 @@
+from types import SimpleNamespace
+
 from cockroachdb_mcp_client.providers.openai import OpenAIProvider
+import openai
 import pytest
 
+
 def test_openai_missing_key(monkeypatch):
     monkeypatch.delenv("OPENAI_API_KEY", raising=False)
     with pytest.raises(RuntimeError):
         OpenAIProvider().run({}, "test")
+
+
+def test_openai_reuses_client(monkeypatch):
+    created = []
+
+    def create(messages, **kwargs):
+        message = SimpleNamespace(content=f" {messages[-1]['content']} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    def fake_client(api_key, **kwargs):
+        created.append(api_key)
+        completions = SimpleNamespace(create=create)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai, "OpenAI", fake_client)
+    provider = OpenAIProvider()
+
+    assert [provider.run({}, f"q{i}") for i in range(3)] == ["q0", "q1", "q2"]
+    assert created == ["test-key"]
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from cockroachdb_mcp_client import config as config_module
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+from cockroachdb_mcp_client.ratelimit import (
+    RateLimiter,
+    TokenBucket,
+    is_retryable,
+    retry_after,
+)
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class FlakyProvider(BaseLLMProvider):
+    config_section = "flaky"
+
+    def __init__(self, failures: int, status: int = 429):
+        super().__init__()
+        self.failures = failures
+        self.status = status
+        self.calls = []
+
+    def run(self, context, input_text, stream=False):
+        raise NotImplementedError
+
+    async def arun(self, context, input_text, stream=False):
+        request = {"model": "m", "messages": [{"content": input_text}]}
+
+        async def call():
+            self.calls.append(time.monotonic())
+            if self.failures:
+                self.failures -= 1
+                raise APIError(self.status, {"retry-after": "0.2"})
+            return input_text
+
+        return await self.acall_with_retry(request, call)
+
+
+def test_token_bucket_paces_requests():
+    bucket = TokenBucket(per_minute=600)
+    assert [bucket.reserve() for _ in range(10)] == [0.0] * 10
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+
+
+def test_retry_after_and_retryable_statuses():
+    assert retry_after(APIError(429, {"retry-after": "3"})) == 3.0
+    assert retry_after(APIError(429, {"retry-after-ms": "250"})) == 0.25
+    assert retry_after(APIError(429)) is None
+    assert is_retryable(APIError(429)) and is_retryable(APIError(529))
+    assert not is_retryable(APIError(400))
+    assert is_retryable(type("APIConnectionError", (Exception,), {})())
+
+
+def test_backoff_honors_retry_after_and_gives_up():
+    limiter = RateLimiter(max_retries=2, base_delay=0.01)
+    assert limiter.backoff(APIError(429, {"retry-after": "0.5"}), 0) >= 0.5
+    assert limiter.backoff(APIError(400), 0) is None
+    assert limiter.backoff(APIError(503), 2) is None
+    assert limiter.retries == 1
+
+
+def test_throttled_call_pauses_all_workers():
+    provider = FlakyProvider(failures=1)
+    provider.rate_limit_overrides = {"base_delay": 0.01}
+
+    async def batch():
+        return await asyncio.gather(*(provider.arun({}, f"in{i}") for i in range(5)))
+
+    assert asyncio.run(batch()) == [f"in{i}" for i in range(5)]
+    first_failure = provider.calls[0]
+    # Every call that started after the 429 waited out the shared Retry-After.
+    later = [t for t in provider.calls[1:] if t - first_failure > 0.01]
+    assert later and all(t - first_failure >= 0.19 for t in later)
+    assert provider.limiter_for("m").retries == 1
+
+
+def test_non_retryable_errors_are_raised():
+    provider = FlakyProvider(failures=1, status=400)
+    with pytest.raises(APIError):
+        asyncio.run(provider.arun({}, "x"))
+    assert len(provider.calls) == 1
+
+
+def test_rate_limits_from_config(monkeypatch):
+    config = {"rate_limits": {"flaky": {"default": {"rpm": 60}, "m": {"tpm": 1000}}}}
+    monkeypatch.setattr(config_module, "load_config", lambda: config)
+    provider = FlakyProvider(0)
+    provider.rate_limit_overrides = {"max_retries": 1}
+
+    limiter = provider.limiter_for("m")
+
+    assert limiter.requests.rate == 1.0
+    assert limiter.tokens.rate == pytest.approx(1000 / 60)
+    assert limiter.max_retries == 1
+    assert provider.limiter_for("other").tokens is None
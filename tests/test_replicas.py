@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.client import MCPClient
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def replicas(mcp_server, monkeypatch):
+    servers = [mcp_server, mcp_server.replica().start(), mcp_server.replica().start()]
+    monkeypatch.setenv("MCP_SERVER_URLS", ",".join(s.url for s in servers))
+    yield servers
+    for server in servers[1:]:
+        server.stop()
+
+
+def test_round_robin_spreads_bulk_reads(replicas, tmp_path):
+    for i in range(30):
+        replicas[0].add_context(f"ctx{i}")
+
+    result = runner.invoke(
+        app, ["export", "all", "-o", str(tmp_path), "--output", "json"]
+    )
+
+    assert result.exit_code == 0
+    assert len(list(tmp_path.iterdir())) == 30
+    for server in replicas:
+        gets = [r for r in server.requests if r[1].startswith("/contexts/")]
+        assert len(gets) == 10
+
+
+def test_failover_when_a_replica_is_down(replicas):
+    replicas[0].add_context("summarizer")
+    replicas[1].stop()
+
+    for _ in range(3):
+        result = runner.invoke(app, ["list", "contexts", "--output", "jsonl"])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout)["context_name"] == "summarizer"
+
+    assert len(replicas[0].requests) + len(replicas[2].requests) == 3
+
+
+def test_least_latency_prefers_fast_replica(mcp_server):
+    slow = mcp_server.replica(latency=0.05).start()
+    try:
+        client = MCPClient([slow.url, mcp_server.url], balance="least_latency")
+        for _ in range(20):
+            assert client.get("/contexts").status_code == 200
+        assert len(mcp_server.requests) > 15
+    finally:
+        slow.stop()
+
+
+def test_all_replicas_down_reports_connection_error(replicas):
+    for server in replicas:
+        server.stop()
+
+    result = runner.invoke(app, ["list", "contexts"])
+
+    assert result.exit_code == 1
+    assert "Failed to connect to MCP server" in result.output
@@ -0,0 +1,125 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client import session as session_module
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+from cockroachdb_mcp_client.session import Session
+
+runner = CliRunner()
+
+
+class EchoProvider(BaseLLMProvider):
+    """Replies with the number of earlier messages it was sent."""
+
+    instances = 0
+    histories = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        type(self).instances += 1
+
+    def run(self, context, input_text, stream=False, history=None):
+        type(self).histories.append(list(history or []))
+        return f"{input_text}:{len(history or [])}"
+
+
+class NoHistoryProvider(BaseLLMProvider):
+    def run(self, context, input_text, stream=False):
+        return input_text.upper()
+
+
+@pytest.fixture
+def echo(monkeypatch, tmp_path):
+    monkeypatch.setitem(PROVIDERS, "echo", EchoProvider)
+    monkeypatch.setattr(session_module, "SESSION_DIR", tmp_path / "sessions")
+    EchoProvider.instances = 0
+    EchoProvider.histories = []
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"model": "gpt-4o"}}))
+    return context
+
+
+def test_history_keeps_latest_turns_within_window():
+    session = Session("echo", {"body": {}}, history_tokens=40)
+    for i in range(5):
+        session.add_turn(f"question {i} " + "x" * 40, f"answer {i}")
+
+    history = session.history("next")
+
+    assert [m["role"] for m in history] == ["user", "assistant"]
+    assert history[1]["content"] == "answer 4"
+    assert len(session.messages) == 10
+
+
+def test_repl_reuses_provider_and_sends_history(echo):
+    result = runner.invoke(
+        app,
+        ["run", "context", "-p", "echo", "-f", str(echo)],
+        input="hello\nagain\n/reset\nfresh\n/exit\nignored\n",
+    )
+
+    assert result.exit_code == 0
+    assert EchoProvider.instances == 1
+    assert "hello:0" in result.stdout
+    assert "again:2" in result.stdout
+    assert "fresh:0" in result.stdout
+    assert "ignored" not in result.stdout
+
+
+def test_repl_with_provider_without_history(echo, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "plain", NoHistoryProvider)
+
+    result = runner.invoke(
+        app,
+        ["run", "context", "-p", "plain", "-f", str(echo)],
+        input="hello\nagain\n/exit\n",
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "does not accept conversation history" in result.stdout
+    assert "HELLO" in result.stdout
+    assert "AGAIN" in result.stdout
+    assert "Request failed" not in result.stdout
+
+
+def test_session_is_saved_and_resumed(echo):
+    first = runner.invoke(
+        app,
+        ["run", "context", "-p", "echo", "-f", str(echo), "--session", "s1",
+         "-i", "one"],
+    )
+    assert first.exit_code == 0
+    saved = json.loads((session_module.SESSION_DIR / "s1.json").read_text())
+    assert saved["provider"] == "echo"
+    assert len(saved["messages"]) == 2
+
+    # Provider and context come from the saved session.
+    second = runner.invoke(app, ["run", "context", "--session", "s1", "-i", "two"])
+
+    assert second.exit_code == 0
+    assert "two:2" in second.stdout
+    assert EchoProvider.histories[-1][0] == {"role": "user", "content": "one"}
+
+
+def test_new_session_needs_a_context(echo):
+    result = runner.invoke(app, ["run", "context", "-p", "echo", "--session", "new"])
+
+    assert result.exit_code == 1
+    assert "exactly one of --file or --context-id" in result.stdout
+
+
+def test_session_names_cannot_escape_the_session_dir():
+    assert session_module.session_path("daily-2024.v1").parent == (
+        session_module.SESSION_DIR
+    )
+    for name in ("../../x", "a/b", "..", ".hidden", ""):
+        with pytest.raises(ValueError, match="Invalid session name"):
+            session_module.session_path(name)
+
+    result = CliRunner().invoke(app, ["run", "context", "--session", "../../x"])
+    assert result.exit_code == 1
+    assert "Invalid session name" in result.output
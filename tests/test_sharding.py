@@ -0,0 +1,110 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+from cockroachdb_mcp_client.sharding import parse_shard, shard_of
+
+runner = CliRunner()
+
+
+class UpperProvider(BaseLLMProvider):
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        if input_text == "boom":
+            raise RuntimeError("stub failure")
+        return input_text.upper()
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for bad in ("4/4", "-1/4", "1/0", "1", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_partition_inputs_evenly():
+    inputs = [f"prompt {i}" for i in range(4000)]
+    sizes = [0] * 4
+    for value in inputs:
+        sizes[shard_of(value, 4)] += 1
+
+    assert sum(sizes) == 4000
+    assert all(800 < size < 1200 for size in sizes)
+    assert shard_of({"input": "x"}, 7) == shard_of({"input": "x"}, 7)
+
+
+def test_sharded_runs_merge_in_input_order(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "upper", UpperProvider)
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {}}))
+    inputs = [f"input {i}" for i in range(30)] + ["boom"]
+    input_file = tmp_path / "inputs.txt"
+    input_file.write_text("\n".join(inputs) + "\n")
+
+    outputs = []
+    for i in range(3):
+        out = tmp_path / f"shard{i}.jsonl"
+        result = runner.invoke(
+            app,
+            ["simulate", "context", "-p", "upper", "-f", str(context),
+             "-i", str(input_file), "-o", str(out), "--shard", f"{i}/3",
+             "--output", "jsonl"],
+        )
+        assert result.exit_code == 0
+        outputs.append(out)
+    counts = [len(out.read_text().splitlines()) for out in outputs]
+    assert sum(counts) == len(inputs) and all(counts)
+
+    # Drop one shard's last record to simulate a crashed host.
+    lines = outputs[0].read_text().splitlines()
+    lost = json.loads(lines[-1])["index"]
+    outputs[0].write_text("\n".join(lines[:-1]) + "\n")
+    merged = tmp_path / "merged.jsonl"
+
+    result = runner.invoke(
+        app,
+        ["simulate", "merge", *map(str, outputs), "-i", str(input_file),
+         "-o", str(merged)],
+    )
+
+    assert result.exit_code == 1
+    assert "30 results from 3 files: 1 failed, 1 missing" in result.stderr
+    assert f"Missing inputs: {lost}" in result.stderr
+    records = [json.loads(line) for line in merged.read_text().splitlines()]
+    assert [r["index"] for r in records] == sorted(set(range(31)) - {lost})
+    assert all(r["output"] == r["input"].upper() for r in records if "output" in r)
+
+    # Resuming on the merged file re-runs only the missing and failed inputs.
+    monkeypatch.setattr(UpperProvider, "run", lambda self, c, i, stream=False: "ok")
+    rerun = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "upper", "-f", str(context),
+         "-i", str(input_file), "-o", str(merged), "--resume", "--output", "jsonl"],
+    )
+    assert rerun.exit_code == 0
+    rerun_indices = [json.loads(line)["index"] for line in rerun.stdout.splitlines()]
+    assert rerun_indices == sorted([lost, 30])
+
+    final = runner.invoke(app, ["simulate", "merge", str(merged)])
+    assert final.exit_code == 0
+    assert len(final.stdout.splitlines()) == 31
+
+
+def test_merge_skips_records_without_an_index(tmp_path):
+    shard = tmp_path / "shard.jsonl"
+    shard.write_text(
+        '{"index": 0, "input": "a", "output": "A"}\n'
+        '{"input": "b", "output": "B"}\n'
+        '["not", "a", "record"]\n'
+        '{"index": 1, "input": "c", "output": "C"}\n'
+        '{"index": 2, "inp'
+    )
+
+    result = runner.invoke(app, ["simulate", "merge", str(shard)])
+
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line)["index"] for line in result.stdout.splitlines()] == [0, 1]
+    assert "Skipped 3 lines" in result.stderr
@@ -0,0 +1,152 @@
+import asyncio
+import json
+import random
+import threading
+import time
+
+from typer.testing import CliRunner
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+
+runner = CliRunner()
+
+
+class StubProvider(BaseLLMProvider):
+    lock = threading.Lock()
+    in_flight = 0
+    max_in_flight = 0
+
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        cls = type(self)
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            time.sleep(random.uniform(0.005, 0.02))
+            if input_text == "boom":
+                raise RuntimeError("stub failure")
+            return input_text.upper()
+        finally:
+            with cls.lock:
+                cls.in_flight -= 1
+
+
+class AsyncStubProvider(BaseLLMProvider):
+    in_flight = 0
+    max_in_flight = 0
+    threads = set()
+
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        raise AssertionError("batch should use the native coroutine")
+
+    async def arun(self, context: dict, input_text: str, stream: bool = False) -> str:
+        cls = type(self)
+        cls.threads.add(threading.get_ident())
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        await asyncio.sleep(0.05)
+        cls.in_flight -= 1
+        return input_text[::-1]
+
+
+def write_files(tmp_path, inputs):
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"description": "stub"}}))
+    input_file = tmp_path / "inputs.json"
+    input_file.write_text(json.dumps(inputs))
+    return context, input_file
+
+
+def test_simulate_concurrency_preserves_order(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "stub", StubProvider)
+    StubProvider.max_in_flight = 0
+    inputs = [f"input {i}" for i in range(40)]
+    context, input_file = write_files(tmp_path, inputs)
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "stub", "-f", str(context), "-i", str(input_file),
+         "--output", "json", "--concurrency", "8"],
+    )
+
+    assert result.exit_code == 0
+    outputs = json.loads(result.output[result.output.index("[\n"):])
+    assert [r["input"] for r in outputs] == inputs
+    assert [r["output"] for r in outputs] == [i.upper() for i in inputs]
+    assert 1 < StubProvider.max_in_flight <= 8
+
+
+def test_simulate_concurrency_reports_failures(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "stub", StubProvider)
+    context, input_file = write_files(tmp_path, ["a", "boom", "c"])
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "stub", "-f", str(context), "-i", str(input_file),
+         "--concurrency", "3"],
+    )
+
+    assert result.exit_code == 0
+    assert "Failed on input 2" in result.output
+    assert result.output.index("Input 1:") < result.output.index("Input 3:")
+    assert "Output: C" in result.output
+
+
+def test_simulate_drives_native_arun_from_one_loop(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "async-stub", AsyncStubProvider)
+    inputs = [f"input {i}" for i in range(200)]
+    context, input_file = write_files(tmp_path, inputs)
+
+    started = time.perf_counter()
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "async-stub", "-f", str(context),
+         "-i", str(input_file), "--output", "json", "--concurrency", "100"],
+    )
+
+    assert result.exit_code == 0
+    assert time.perf_counter() - started < 2
+    outputs = json.loads(result.output[result.output.index("[\n"):])
+    assert [r["output"] for r in outputs] == [i[::-1] for i in inputs]
+    assert AsyncStubProvider.max_in_flight == 100
+    assert len(AsyncStubProvider.threads) == 1
+
+
+def test_simulate_jsonl_output_file_and_resume(tmp_path, monkeypatch):
+    monkeypatch.setitem(PROVIDERS, "stub", StubProvider)
+    context, _ = write_files(tmp_path, [])
+    input_file = tmp_path / "inputs.jsonl"
+    inputs = ["a", "boom", {"input": "c"}, "d"]
+    input_file.write_text("\n".join(json.dumps(i) for i in inputs) + "\n")
+    output_file = tmp_path / "results.jsonl"
+    args = ["simulate", "context", "-p", "stub", "-f", str(context),
+            "-i", str(input_file), "-o", str(output_file)]
+
+    first = runner.invoke(app, args + ["-c", "2"])
+
+    assert first.exit_code == 0
+    records = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert [r["index"] for r in records] == [0, 1, 2, 3]
+    assert records[1]["error"] == "stub failure"
+    assert records[2] == {"index": 2, "input": "c", "output": "C"}
+
+    # The stub now succeeds on every input; only the failed one is retried.
+    monkeypatch.setattr(StubProvider, "run", lambda self, c, i, stream=False: "fixed")
+    second = runner.invoke(app, args + ["--resume", "--output", "jsonl"])
+
+    assert second.exit_code == 0
+    assert "Resuming: 3 inputs already completed" in second.output
+    assert '{"index": 1, "input": "boom", "output": "fixed"}' in second.output
+    records = [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert len(records) == 5 and records[-1]["output"] == "fixed"
+
+
+def test_iter_inputs_is_lazy(tmp_path):
+    from cockroachdb_mcp_client.commands.simulate import iter_inputs
+
+    input_file = tmp_path / "inputs.txt"
+    input_file.write_text("first\n\nsecond\n")
+    lines = iter_inputs(input_file)
+    assert next(lines) == "first"
+    assert list(lines) == ["second"]
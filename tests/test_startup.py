@@ -0,0 +1,49 @@
+import re
+import subprocess
+import sys
+
+# Generous ceiling for the cumulative import time of the CLI entry point. The
+# eager-import layout took over two seconds; the lazy one takes well under 0.2s.
+MAX_CLI_IMPORT_SECONDS = 0.75
+
+HEAVY_MODULES = ("openai", "anthropic", "yaml", "cockroachdb_mcp_client.providers")
+
+
+def python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+
+
+def loaded_modules(code: str) -> set:
+    result = python("-c", f"import sys\n{code}\nprint('\\n'.join(sys.modules))")
+    return set(result.stdout.split())
+
+
+def test_version_does_not_import_heavy_modules():
+    modules = loaded_modules(
+        "from cockroachdb_mcp_client.cli import app\n"
+        "try:\n    app(['--version'])\nexcept SystemExit:\n    pass"
+    )
+    assert not modules & set(HEAVY_MODULES)
+    assert not any(m.startswith("cockroachdb_mcp_client.commands.") for m in modules)
+
+
+def test_list_command_loads_only_its_module():
+    modules = loaded_modules(
+        "from cockroachdb_mcp_client.cli import app\n"
+        "import typer\n"
+        "typer.main.get_command(app).get_command(None, 'list')"
+    )
+    assert "cockroachdb_mcp_client.commands.list_" in modules
+    assert "cockroachdb_mcp_client.commands.simulate" not in modules
+    assert not modules & {"openai", "anthropic"}
+
+
+def test_cli_import_time_budget():
+    stderr = python(
+        "-X", "importtime", "-c", "import cockroachdb_mcp_client.cli"
+    ).stderr
+    match = re.search(r"\|\s*(\d+)\s*\|\s*cockroachdb_mcp_client\.cli$", stderr, re.M)
+    assert match, stderr[-2000:]
+    assert int(match.group(1)) / 1e6 < MAX_CLI_IMPORT_SECONDS
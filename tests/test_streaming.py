@@ -0,0 +1,168 @@
+import io
+import json
+from types import SimpleNamespace
+
+import openai
+import pytest
+from typer.testing import CliRunner
+
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.metrics import MetricsRecorder
+from cockroachdb_mcp_client.providers import PROVIDERS
+from cockroachdb_mcp_client.providers.base import BaseLLMProvider
+from cockroachdb_mcp_client.streaming import StreamSink
+
+runner = CliRunner()
+
+
+class CountingWriter(io.StringIO):
+    writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+
+def chunk(text=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=text))] if text else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def fake_openai(monkeypatch):
+    async def create(messages, stream=False, stream_options=None, **kwargs):
+        assert stream and stream_options == {"include_usage": True}
+        words = messages[-1]["content"].split()
+        usage = SimpleNamespace(prompt_tokens=7, completion_tokens=len(words))
+        return FakeStream([chunk(w + " ") for w in words] + [chunk(usage=usage)])
+
+    def fake_client(api_key, **kwargs):
+        completions = SimpleNamespace(create=create)
+        return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(openai, "AsyncOpenAI", fake_client)
+
+
+class LegacyProvider(BaseLLMProvider):
+    """A third-party provider written against the original ``run`` signature."""
+
+    def run(self, context: dict, input_text: str) -> str:
+        return input_text.upper()
+
+
+class LegacyStreamingProvider(BaseLLMProvider):
+    def run(self, context: dict, input_text: str, stream: bool = False) -> str:
+        return input_text.upper()
+
+
+def write_files(tmp_path, inputs):
+    context = tmp_path / "ctx.json"
+    context.write_text(json.dumps({"body": {"model": "gpt-test"}}))
+    input_file = tmp_path / "inputs.txt"
+    input_file.write_text("\n".join(inputs) + "\n")
+    return context, input_file
+
+
+def test_sink_buffers_writes_and_records_ttft():
+    out = CountingWriter()
+    recorder = MetricsRecorder()
+
+    with recorder.measure("llm", "m"):
+        sink = StreamSink(out, flush_interval=60)
+        text = sink.consume(f"t{i} " for i in range(1000))
+
+    assert text == "".join(f"t{i} " for i in range(1000))
+    assert out.getvalue() == text + "\n"
+    assert out.writes < 10
+    assert sink.ttft is not None
+    (call,) = recorder.calls
+    assert call["ttft"] <= call["latency"]
+
+
+def test_simulate_stream_collects_json_output(tmp_path, monkeypatch):
+    fake_openai(monkeypatch)
+    context, input_file = write_files(tmp_path, ["hello big world", "second one"])
+
+    metrics_file = tmp_path / "metrics.prom"
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "openai", "-f", str(context),
+         "-i", str(input_file), "--stream", "--output", "json",
+         "--metrics-file", str(metrics_file)],
+    )
+
+    assert result.exit_code == 0
+    assert "hello big world" in result.stderr
+    outputs = json.loads(result.stdout)
+    assert [r["output"] for r in outputs] == ["hello big world", "second one"]
+    metrics = metrics_file.read_text()
+    assert 'mcp_client_tokens_in_total{kind="llm",name="gpt-test"} 14' in metrics
+    assert 'mcp_client_tokens_out_total{kind="llm",name="gpt-test"} 5' in metrics
+
+
+def test_simulate_stream_jsonl_keeps_stdout_clean(tmp_path, monkeypatch):
+    fake_openai(monkeypatch)
+    context, input_file = write_files(tmp_path, ["a b", "c"])
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "openai", "-f", str(context),
+         "-i", str(input_file), "--stream", "--output", "jsonl"],
+    )
+
+    assert result.exit_code == 0
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["output"] for r in records] == ["a b", "c"]
+    assert "Input 1:" in result.stderr
+
+
+@pytest.mark.parametrize("provider", [LegacyProvider, LegacyStreamingProvider])
+def test_simulate_stream_with_legacy_run_signature(tmp_path, monkeypatch, provider):
+    monkeypatch.setitem(PROVIDERS, "legacy", provider)
+    context, input_file = write_files(tmp_path, ["a b", "c"])
+
+    result = runner.invoke(
+        app,
+        ["simulate", "context", "-p", "legacy", "-f", str(context),
+         "-i", str(input_file), "--stream", "--output", "jsonl"],
+    )
+
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [r["output"] for r in records] == ["A B", "C"]
+    assert "A B" in result.stderr
+
+
+def test_simulate_stream_ignores_configured_concurrency(tmp_path, monkeypatch):
+    fake_openai(monkeypatch)
+    config = tmp_path / "config.yaml"
+    config.write_text("defaults: {concurrency: 4}\n")
+    monkeypatch.setenv("MCP_CONFIG_FILE", str(config))
+    context, input_file = write_files(tmp_path, ["a b", "c"])
+    args = ["simulate", "context", "-p", "openai", "-f", str(context),
+            "-i", str(input_file), "--stream", "--output", "jsonl"]
+
+    result = runner.invoke(app, args)
+
+    assert result.exit_code == 0, result.output
+    assert len(result.stdout.splitlines()) == 2
+
+    result = runner.invoke(app, args + ["--concurrency", "2"])
+
+    assert result.exit_code == 1
+    assert "--stream cannot be combined with --concurrency" in result.output
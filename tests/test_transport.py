@@ -0,0 +1,112 @@
+import time
+
+import pytest
+import requests
+from typer.testing import CliRunner
+
+from benchmarks.mock_server import MockMCPServer
+from cockroachdb_mcp_client.cli import app
+from cockroachdb_mcp_client.client import MCPClient
+from cockroachdb_mcp_client.transport import CircuitOpenError
+
+runner = CliRunner()
+
+
+def fast_client(url: str, **kwargs) -> MCPClient:
+    client = MCPClient(url, **kwargs)
+    client.retry.base_delay = 0.01
+    return client
+
+
+def test_retries_retryable_status_then_succeeds(mcp_server):
+    context_id = mcp_server.add_context("summarizer")
+    mcp_server.faults = [503, 502]
+
+    response = fast_client(mcp_server.url).get(f"/contexts/{context_id}")
+
+    assert response.status_code == 200
+    assert len(mcp_server.requests) == 3
+
+
+def test_client_errors_are_not_retried(mcp_server):
+    mcp_server.faults = [400]
+
+    response = fast_client(mcp_server.url).get("/contexts")
+
+    assert response.status_code == 400
+    assert len(mcp_server.requests) == 1
+
+
+def test_post_only_resent_when_server_did_not_act(mcp_server):
+    client = fast_client(mcp_server.url)
+
+    mcp_server.faults = [500]
+    assert client.post("/contexts", json={"context_name": "a"}).status_code == 500
+    assert len(mcp_server.requests) == 1
+
+    mcp_server.faults = [503]
+    assert client.post("/contexts", json={"context_name": "b"}).status_code == 200
+    assert len(mcp_server.requests) == 3
+
+
+def test_deadline_caps_hung_requests():
+    server = MockMCPServer(latency=2).start()
+    try:
+        client = fast_client(server.url, timeout=30, deadline=0.3)
+        started = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            client.get("/contexts")
+        assert time.monotonic() - started < 1.5
+    finally:
+        server.stop()
+
+
+def test_circuit_breaker_fails_fast(mcp_server):
+    client = fast_client(mcp_server.url, max_retries=0, breaker_threshold=3)
+    mcp_server.faults = [500] * 3
+    for _ in range(3):
+        assert client.get("/contexts").status_code == 500
+
+    with pytest.raises(CircuitOpenError):
+        client.get("/contexts")
+    assert len(mcp_server.requests) == 3
+
+    client.replicas[0].breaker.reset_timeout = 0
+    assert client.get("/contexts").status_code == 200
+    assert client.replicas[0].breaker.state == "closed"
+
+
+def test_breaker_probe_settles_on_other_request_errors(mcp_server, monkeypatch):
+    client = fast_client(mcp_server.url, max_retries=0, breaker_threshold=1)
+    mcp_server.faults = [500]
+    assert client.get("/contexts").status_code == 500
+    client.replicas[0].breaker.reset_timeout = 0
+
+    def redirect_loop(*args, **kwargs):
+        raise requests.TooManyRedirects("loop")
+
+    with monkeypatch.context() as m:
+        m.setattr(client.session, "request", redirect_loop)
+        with pytest.raises(requests.TooManyRedirects):
+            client.get("/contexts")
+
+    assert client.get("/contexts").status_code == 200
+    assert client.replicas[0].breaker.state == "closed"
+
+
+def test_export_context_not_found(mcp_server, tmp_path):
+    result = runner.invoke(
+        app, ["export", "context", "missing", "--file", str(tmp_path / "out.yaml")]
+    )
+
+    assert result.exit_code == 0
+    assert "not found" in result.output
+    assert len(mcp_server.requests) == 1
+
+
+def test_delete_not_found_exits_cleanly(mcp_server):
+    result = runner.invoke(app, ["delete", "context", "missing", "-y"])
+
+    assert result.exit_code == 1
+    assert "not found" in result.output
+    assert "Unexpected error" not in result.output